@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：为post_matches表添加image_score字段，并为已有帖子的图片补算感知哈希（image_hashes / post_image_hashes表）
+"""
+
+import os
+import sys
+import sqlite3
+import io
+
+# 设置UTF-8编码环境变量
+os.environ["PYTHONIOENCODING"] = "utf-8"
+
+# 配置标准输出为UTF-8
+if sys.platform == "win32":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+def get_db_connection(db_path='lostandfound.db'):
+    """获取数据库连接"""
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+    except Exception as e:
+        print(f"❌ 数据库连接失败: {e}")
+        sys.exit(1)
+
+def check_column_exists(conn, table_name, column_name):
+    """检查列是否存在"""
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    columns = [row[1] for row in cursor.fetchall()]
+    return column_name in columns
+
+def add_image_score_column(conn):
+    """为post_matches表添加image_score字段（表不存在时由init_db创建，无需迁移）"""
+    print("\n=== 数据库迁移：添加image_score字段 ===\n")
+
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='post_matches'")
+        if cursor.fetchone() is None:
+            print("ℹ️  post_matches 表尚未创建，跳过")
+        elif check_column_exists(conn, 'post_matches', 'image_score'):
+            print("ℹ️  image_score 字段已存在，跳过创建")
+        else:
+            cursor.execute("""
+                ALTER TABLE post_matches
+                ADD COLUMN image_score FLOAT
+            """)
+            print("✅ 成功添加 image_score 字段到 post_matches 表")
+
+        conn.commit()
+
+    except Exception as e:
+        print(f"\n❌ 迁移失败: {e}")
+        conn.rollback()
+        sys.exit(1)
+
+def build_image_hashes():
+    """创建image_hashes / post_image_hashes表并为有图片的已有帖子补算感知哈希"""
+    print("\n=== 补算图片感知哈希 ===\n")
+
+    from sqlmodel import Session
+    from app.database import engine, init_db
+    from app.services.image_hash import ImageHashService
+
+    init_db()
+    with Session(engine) as session:
+        processed = ImageHashService.backfill(session)
+    print(f"✅ 已为 {processed} 个帖子计算图片哈希")
+
+def main():
+    """主函数"""
+    print("开始数据库迁移...")
+
+    # 连接数据库
+    conn = get_db_connection()
+
+    try:
+        add_image_score_column(conn)
+    finally:
+        conn.close()
+
+    try:
+        build_image_hashes()
+
+        print("\n✅ 所有迁移任务已完成")
+        print("\n后续步骤：")
+        print("1. 重启后端服务以应用更改")
+        print("2. 为两个帖子上传同一物品的照片，验证匹配页面中图片相似的帖子排名靠前")
+
+    except Exception as e:
+        print(f"\n❌ 数据库迁移过程中发生错误: {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
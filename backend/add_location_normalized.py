@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：为posts表添加location_normalized字段，并建立地点三元组索引（location_trigrams表）
+"""
+
+import os
+import sys
+import sqlite3
+import io
+
+# 设置UTF-8编码环境变量
+os.environ["PYTHONIOENCODING"] = "utf-8"
+
+# 配置标准输出为UTF-8
+if sys.platform == "win32":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+def get_db_connection(db_path='lostandfound.db'):
+    """获取数据库连接"""
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+    except Exception as e:
+        print(f"❌ 数据库连接失败: {e}")
+        sys.exit(1)
+
+def check_column_exists(conn, table_name, column_name):
+    """检查列是否存在"""
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    columns = [row[1] for row in cursor.fetchall()]
+    return column_name in columns
+
+def add_location_normalized_column(conn):
+    """为posts表添加location_normalized字段"""
+    print("\n=== 数据库迁移：添加location_normalized字段 ===\n")
+
+    cursor = conn.cursor()
+
+    try:
+        if check_column_exists(conn, 'posts', 'location_normalized'):
+            print("ℹ️  location_normalized 字段已存在，跳过创建")
+        else:
+            cursor.execute("""
+                ALTER TABLE posts
+                ADD COLUMN location_normalized VARCHAR(200)
+            """)
+            print("✅ 成功添加 location_normalized 字段到 posts 表")
+
+        conn.commit()
+
+    except Exception as e:
+        print(f"\n❌ 迁移失败: {e}")
+        conn.rollback()
+        sys.exit(1)
+
+def build_location_index():
+    """创建location_trigrams表并为已有帖子补算归一化地点与三元组"""
+    print("\n=== 建立地点三元组索引 ===\n")
+
+    from sqlmodel import Session
+    from app.database import engine, init_db
+    from app.services.location_index import LocationIndexService
+
+    init_db()
+    with Session(engine) as session:
+        processed = LocationIndexService.backfill(session)
+    print(f"✅ 已为 {processed} 个帖子建立地点索引")
+
+def main():
+    """主函数"""
+    print("开始数据库迁移...")
+
+    # 连接数据库
+    conn = get_db_connection()
+
+    try:
+        add_location_normalized_column(conn)
+    finally:
+        conn.close()
+
+    try:
+        build_location_index()
+
+        print("\n✅ 所有迁移任务已完成")
+        print("\n后续步骤：")
+        print("1. 重启后端服务以应用更改")
+        print("2. 打开失物/招领帖子的匹配页面，验证地点相似的帖子排名靠前")
+
+    except Exception as e:
+        print(f"\n❌ 数据库迁移过程中发生错误: {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
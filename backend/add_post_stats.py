@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：为posts表添加comment_count、claim_count、pending_claim_count计数字段，并按已有的评论和认领记录回填
+"""
+
+import os
+import sys
+import sqlite3
+import io
+
+# 设置UTF-8编码环境变量
+os.environ["PYTHONIOENCODING"] = "utf-8"
+
+# 配置标准输出为UTF-8
+if sys.platform == "win32":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+COUNTER_COLUMNS = ["comment_count", "claim_count", "pending_claim_count"]
+
+def get_db_connection(db_path='lostandfound.db'):
+    """获取数据库连接"""
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+    except Exception as e:
+        print(f"❌ 数据库连接失败: {e}")
+        sys.exit(1)
+
+def check_column_exists(conn, table_name, column_name):
+    """检查列是否存在"""
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    columns = [row[1] for row in cursor.fetchall()]
+    return column_name in columns
+
+def add_counter_columns(conn):
+    """为posts表添加计数字段"""
+    print("\n=== 数据库迁移：添加帖子计数字段 ===\n")
+
+    cursor = conn.cursor()
+
+    try:
+        for column in COUNTER_COLUMNS:
+            if check_column_exists(conn, 'posts', column):
+                print(f"ℹ️  {column} 字段已存在，跳过创建")
+                continue
+            cursor.execute(f"""
+                ALTER TABLE posts
+                ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0
+            """)
+            print(f"✅ 成功添加 {column} 字段到 posts 表")
+
+        conn.commit()
+
+    except Exception as e:
+        print(f"\n❌ 迁移失败: {e}")
+        conn.rollback()
+        sys.exit(1)
+
+def backfill_counters():
+    """按comments / claims表回填计数"""
+    print("\n=== 回填评论数与认领数 ===\n")
+
+    from sqlmodel import Session
+    from app.database import engine
+    from app.services.post_stats import PostStatsService
+
+    with Session(engine) as session:
+        repaired = PostStatsService.recount(session)
+    print(f"✅ 已更新 {repaired} 个帖子的计数")
+
+def main():
+    """主函数"""
+    print("开始数据库迁移...")
+
+    # 连接数据库
+    conn = get_db_connection()
+
+    try:
+        add_counter_columns(conn)
+    finally:
+        conn.close()
+
+    try:
+        backfill_counters()
+
+        print("\n✅ 所有迁移任务已完成")
+        print("\n后续步骤：")
+        print("1. 重启后端服务以应用更改")
+        print("2. 计数偏离时可调用 POST /api/admin/posts/recount 重算")
+
+    except Exception as e:
+        print(f"\n❌ 数据库迁移过程中发生错误: {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
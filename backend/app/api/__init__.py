@@ -1,8 +1,10 @@
 from fastapi import APIRouter
 
 # Import subrouters
-from . import auth, users, categories, posts, upload, claims, ratings, notifications
+from . import auth, users, categories, posts, upload, claims, ratings, notifications, alerts
 from .admin import posts as admin_posts
+from .admin import metrics as admin_metrics
+from .admin import matches as admin_matches
 
 # Aggregate API router
 router = APIRouter()
@@ -18,6 +20,9 @@ router.include_router(upload.router, prefix="/upload", tags=["Upload"])
 router.include_router(claims.router, prefix="/claims", tags=["Claims"])
 router.include_router(ratings.router, prefix="/ratings", tags=["Ratings"])
 router.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
+router.include_router(alerts.router, prefix="/alerts", tags=["Alerts"])
 
 # Admin routes
 router.include_router(admin_posts.router, prefix="/admin", tags=["Admin"])
+router.include_router(admin_metrics.router, prefix="/admin", tags=["Admin"])
+router.include_router(admin_matches.router, prefix="/admin", tags=["Admin"])
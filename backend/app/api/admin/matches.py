@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlmodel import Session, select
+from typing import List
+
+from app.database import get_session
+from app.models.user import User
+from app.models.match_job import RematchJob
+from app.schemas.match_job import RematchRequest, RematchJobRead
+from app.core.deps import get_current_admin_user
+from app.services.bulk_rematch import BulkRematchService
+
+router = APIRouter()
+
+
+def _job_read(job: RematchJob) -> RematchJobRead:
+    return RematchJobRead.model_validate({
+        **RematchJobRead.model_validate(job).model_dump(),
+        **BulkRematchService.progress(job)
+    })
+
+
+@router.post("/matches/rematch", response_model=RematchJobRead, status_code=status.HTTP_202_ACCEPTED)
+def admin_start_rematch(
+    request: RematchRequest,
+    current_admin: User = Depends(get_current_admin_user),
+    session: Session = Depends(get_session)
+):
+    """
+    为所有开放的失物/招领帖子重新计算匹配（调整权重或分词器后使用），结果写入 post_matches
+    任务在后台用进程池执行，通过 GET /admin/matches/rematch/{job_id} 查看进度
+    需要管理员权限
+    """
+    active = BulkRematchService.get_active_job(session)
+    if active:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Rematch job {active.id} is already running"
+        )
+    
+    job = BulkRematchService.start(
+        session,
+        requested_by=current_admin.id,
+        workers=request.workers,
+        limit_per_post=request.limit_per_post,
+        time_range_days=request.time_range_days
+    )
+    return _job_read(job)
+
+
+@router.get("/matches/rematch", response_model=List[RematchJobRead])
+def admin_list_rematch_jobs(
+    limit: int = Query(10, ge=1, le=50),
+    current_admin: User = Depends(get_current_admin_user),
+    session: Session = Depends(get_session)
+):
+    """
+    最近的重新匹配任务
+    需要管理员权限
+    """
+    jobs = session.exec(select(RematchJob).order_by(RematchJob.id.desc()).limit(limit)).all()
+    return [_job_read(job) for job in jobs]
+
+
+@router.get("/matches/rematch/{job_id}", response_model=RematchJobRead)
+def admin_get_rematch_job(
+    job_id: int,
+    current_admin: User = Depends(get_current_admin_user),
+    session: Session = Depends(get_session)
+):
+    """
+    重新匹配任务的进度（已处理帖子数、百分比、吞吐量、预计剩余时间）
+    需要管理员权限
+    """
+    job = session.get(RematchJob, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Rematch job not found"
+        )
+    return _job_read(job)
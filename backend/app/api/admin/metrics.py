@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends
+
+from app.models.user import User
+from app.core.deps import get_current_admin_user
+from app.services.match_cache import get_match_cache
+from app.services.ann_index import get_semantic_index
+from app.services.post_counts import get_post_count_cache
+
+router = APIRouter()
+
+
+@router.get("/metrics/match-cache", response_model=dict)
+def admin_match_cache_metrics(
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """
+    智能匹配结果缓存的命中/未命中统计
+    需要管理员权限
+    """
+    match_cache = get_match_cache()
+    if match_cache is None:
+        return {"enabled": False}
+    
+    return {"enabled": True, **match_cache.stats()}
+
+
+@router.get("/metrics/post-count-cache", response_model=dict)
+def admin_post_count_cache_metrics(
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """
+    帖子列表总数缓存的命中/未命中统计
+    需要管理员权限
+    """
+    return get_post_count_cache().stats()
+
+
+@router.get("/metrics/semantic-index", response_model=dict)
+def admin_semantic_index_metrics(
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """
+    语义匹配ANN索引的规模、簇数与同步水位
+    需要管理员权限
+    """
+    return get_semantic_index().stats()
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session, select, func
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from app.database import get_session
@@ -8,6 +9,19 @@ from app.models.user import User
 from app.models.post import Post
 from app.schemas.post import PostRead, PostUpdate
 from app.core.deps import get_current_admin_user
+from app.core.pagination import paginate
+from app.services.post_fields import PostFieldsService
+from app.services.post_stats import PostStatsService
+from app.services.post_index import PostIndexService
+from app.services.post_features import PostFeatureService
+from app.services.duplicate_detection import DuplicateDetectionService
+from app.services.location_index import LocationIndexService
+from app.services.embedding import EmbeddingService
+from app.services.image_hash import ImageHashService
+from app.services.post_search import PostSearchService
+from app.services.match_cache import invalidate_matches
+from app.services.post_counts import PostCounterService, invalidate_post_counts
+from app.services.post_match_service import PostMatchService
 
 router = APIRouter()
 
@@ -16,6 +30,7 @@ router = APIRouter()
 def admin_list_posts(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor（游标分页，忽略 skip）"),
     current_admin: User = Depends(get_current_admin_user),
     session: Session = Depends(get_session)
 ):
@@ -24,25 +39,64 @@ def admin_list_posts(
     需要管理员权限
     """
     # 获取所有帖子（不过滤状态）
-    statement = select(Post).order_by(Post.created_at.desc())
+    statement = PostFieldsService.select_rows(None)
     
     # 获取总数
     count_statement = select(func.count()).select_from(Post)
     total = session.exec(count_statement).one()
     
-    # 获取分页数据
-    statement = statement.offset(skip).limit(limit)
-    posts = session.exec(statement).all()
+    # 获取分页数据（按 created_at、id 倒序），直接查询 Core 行，作者、分类、评论按本页外键批量加载
+    posts, next_cursor = paginate(session, statement, Post, cursor, limit, skip)
     
     # 返回数据
+    return ORJSONResponse(content={
+        "data": PostFieldsService.serialize_rows(session, posts, None),
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": next_cursor
+    })
+
+
+@router.get("/posts/duplicates", response_model=dict)
+def admin_list_duplicate_clusters(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_admin: User = Depends(get_current_admin_user),
+    session: Session = Depends(get_session)
+):
+    """
+    管理员查看近似重复帖子簇（原始帖子及被标记为其重复的帖子）
+    需要管理员权限
+    """
+    clusters, total = DuplicateDetectionService.list_clusters(session, skip=skip, limit=limit)
+    
     return {
-        "data": [PostRead.model_validate(post).model_dump(mode='json') for post in posts],
+        "data": clusters,
         "total": total,
         "skip": skip,
         "limit": limit
     }
 
 
+@router.post("/posts/recount", response_model=dict)
+def admin_recount_post_stats(
+    current_admin: User = Depends(get_current_admin_user),
+    session: Session = Depends(get_session)
+):
+    """
+    按评论和认领记录重算所有帖子的 comment_count / claim_count / pending_claim_count
+    需要管理员权限
+    """
+    started = datetime.utcnow()
+    repaired = PostStatsService.recount(session)
+    
+    return {
+        "repaired_posts": repaired,
+        "elapsed_seconds": round((datetime.utcnow() - started).total_seconds(), 3)
+    }
+
+
 @router.delete("/posts/{post_id}")
 def admin_delete_post(
     post_id: int,
@@ -64,10 +118,17 @@ def admin_delete_post(
     
     # 永久删除（或者软删除）
     # 这里使用软删除
+    previous_key = PostCounterService.key(post)
     post.status = "deleted"
     post.updated_at = datetime.utcnow()
     session.add(post)
+    PostCounterService.sync_post(session, post, previous_key)
+    PostIndexService.sync_post(session, post)
+    EmbeddingService.touch(session, post)
+    PostMatchService.invalidate(session, post_id)
     session.commit()
+    invalidate_matches(post_id)
+    invalidate_post_counts()
     
     return {
         "message": "Post deleted successfully",
@@ -97,12 +158,34 @@ def admin_update_post(
     
     # 更新所有可能的字段
     update_data = post_update.model_dump(exclude_unset=True)
+    previous_key = PostCounterService.key(post)
     for field, value in update_data.items():
         setattr(post, field, value)
     
     post.updated_at = datetime.utcnow()
     session.add(post)
+    PostCounterService.sync_post(session, post, previous_key)
+    if "title" in update_data or "content" in update_data:
+        PostFeatureService.refresh(session, post)
+        PostSearchService.sync_post(session, post)
+    if post.item_type in ["lost", "found"]:
+        if "title" in update_data or "content" in update_data or "item_type" in update_data:
+            EmbeddingService.refresh(session, post)
+        elif "status" in update_data or "is_claimed" in update_data:
+            EmbeddingService.touch(session, post)
+    if "location" in update_data:
+        LocationIndexService.sync_post(session, post)
+    if ("images" in update_data or "item_type" in update_data) and post.item_type in ["lost", "found"]:
+        ImageHashService.sync_post(session, post)
+    if (
+        "title" in update_data or "content" in update_data or "item_type" in update_data
+    ) and post.item_type in ["lost", "found"]:
+        DuplicateDetectionService.sync_post(session, post)
+    PostIndexService.sync_post(session, post)
+    PostMatchService.invalidate(session, post.id)
     session.commit()
+    invalidate_matches(post.id)
+    invalidate_post_counts()
     session.refresh(post)
     
     return post
@@ -0,0 +1,96 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel import Session, select
+from typing import List
+from app.database import get_session
+from app.models.user import User
+from app.models.category import Category
+from app.models.alert import SavedAlert
+from app.schemas.alert import AlertCreate, AlertRead
+from app.schemas.post import PostRead
+from app.services.alert_service import AlertService, MAX_ACTIVE_ALERTS_PER_USER
+from app.core.deps import get_current_user
+
+router = APIRouter()
+
+def _get_own_alert(session: Session, alert_id: int, current_user: User) -> SavedAlert:
+    alert = session.get(SavedAlert, alert_id)
+    if not alert or alert.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alert not found"
+        )
+    return alert
+
+@router.post("/", response_model=AlertRead)
+def create_alert(
+    alert_in: AlertCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """保存物品提醒：之后发布的帖子满足全部条件时通知当前用户"""
+    if not AlertService.keyword_terms(alert_in.keywords):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Keywords must contain at least one searchable word"
+        )
+
+    if alert_in.start_time and alert_in.end_time and alert_in.start_time > alert_in.end_time:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="start_time must be earlier than end_time"
+        )
+
+    if alert_in.category_id and not session.get(Category, alert_in.category_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found"
+        )
+
+    if AlertService.count_active_alerts(session, current_user.id) >= MAX_ACTIVE_ALERTS_PER_USER:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"You can have at most {MAX_ACTIVE_ALERTS_PER_USER} active alerts"
+        )
+
+    alert = SavedAlert(**alert_in.model_dump(), user_id=current_user.id)
+    session.add(alert)
+    session.flush()
+    AlertService.index_alert(session, alert)
+    session.commit()
+    session.refresh(alert)
+    return alert
+
+@router.get("/", response_model=List[AlertRead])
+def list_my_alerts(
+    include_inactive: bool = False,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """当前用户的物品提醒"""
+    statement = select(SavedAlert).where(SavedAlert.user_id == current_user.id)
+    if not include_inactive:
+        statement = statement.where(SavedAlert.is_active == True)
+    return session.exec(statement.order_by(SavedAlert.created_at.desc())).all()
+
+@router.delete("/{alert_id}")
+def delete_alert(
+    alert_id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """停用物品提醒（保留命中历史）"""
+    alert = _get_own_alert(session, alert_id, current_user)
+    AlertService.deactivate(session, alert)
+    session.commit()
+    return {"message": "Alert deleted successfully"}
+
+@router.get("/{alert_id}/matches", response_model=List[PostRead])
+def get_alert_matches(
+    alert_id: int,
+    limit: int = 50,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """提醒命中过的帖子"""
+    alert = _get_own_alert(session, alert_id, current_user)
+    return AlertService.matched_posts(session, alert, limit=min(max(limit, 1), 100))
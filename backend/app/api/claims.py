@@ -13,6 +13,12 @@ from app.models.claim_status_log import ClaimStatusLog
 from app.schemas.claim import ClaimCreate, ClaimRead, ClaimApprove, ClaimReject
 from app.api.auth import get_current_user
 from app.services.notification_service import NotificationService
+from app.services.post_index import PostIndexService
+from app.services.embedding import EmbeddingService
+from app.services.match_cache import invalidate_matches
+from app.services.post_counts import PostCounterService, invalidate_post_counts
+from app.services.post_stats import PostStatsService
+from app.services.post_match_service import PostMatchService
 
 router = APIRouter()
 
@@ -54,6 +60,7 @@ async def create_claim(
         message=claim.message
     )
     session.add(db_claim)
+    PostStatsService.adjust(session, claim.post_id, claims=1, pending_claims=1)
     session.commit()
     session.refresh(db_claim)
     
@@ -186,6 +193,7 @@ async def approve_claim(
         claim.confirmed_at = datetime.utcnow()
         claim.updated_at = datetime.utcnow()
 
+        previous_key = PostCounterService.key(post)
         post.is_claimed = True
         # 使用已存在的状态集合: published/draft/deleted；保持published并用is_claimed标识
         # 如果需要展示解决状态，请在前端根据is_claimed渲染。
@@ -193,6 +201,12 @@ async def approve_claim(
 
         session.add(claim)
         session.add(post)
+        PostStatsService.adjust(session, post.id, pending_claims=-1)
+        PostCounterService.sync_post(session, post, previous_key)
+        # 已认领的帖子不再参与智能匹配
+        PostIndexService.sync_post(session, post)
+        EmbeddingService.touch(session, post)
+        PostMatchService.invalidate(session, post.id)
 
         log = ClaimStatusLog(
             claim_id=claim.id,
@@ -212,6 +226,10 @@ async def approve_claim(
         # 事务会自动回滚，抛出通用错误
         raise HTTPException(status_code=500, detail="Failed to approve claim due to server error")
 
+    # 已认领的帖子不再出现在匹配结果中
+    invalidate_matches(claim.post_id)
+    invalidate_post_counts()
+
     # 重新加载claim和post，确保关系已就绪（避免懒加载导致的None属性访问）
     claim = session.exec(
         select(Claim)
@@ -261,6 +279,7 @@ async def reject_claim(
         claim.owner_reply = reject.owner_reply
         claim.updated_at = datetime.utcnow()
         session.add(claim)
+        PostStatsService.adjust(session, post.id, pending_claims=-1)
 
         log = ClaimStatusLog(
             claim_id=claim.id,
@@ -311,6 +330,7 @@ def cancel_claim(
         claim.status = "cancelled"
         claim.updated_at = datetime.utcnow()
         session.add(claim)
+        PostStatsService.adjust(session, claim.post_id, claims=-1, pending_claims=-1)
 
         log = ClaimStatusLog(
             claim_id=claim.id,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Response, WebSocket, WebSocketDisconnect
 from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime
@@ -8,6 +8,7 @@ from app.database import get_session
 from app.api.auth import get_current_user
 from app.models.notification import Notification, NotificationStatus, NotificationType, NotificationSettings
 from app.models.user import User
+from app.core.pagination import paginate, NEXT_CURSOR_HEADER
 
 router = APIRouter()
 
@@ -57,21 +58,23 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int):
 
 @router.get("/", response_model=List[Notification])
 async def get_notifications(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    """获取用户通知列表"""
+    """获取用户通知列表（给出cursor时按游标分页，下一页游标在 X-Next-Cursor 响应头中）"""
     query = select(Notification).where(Notification.user_id == current_user.id)
     
     if status:
         query = query.where(Notification.status == status)
     
-    query = query.offset(skip).limit(limit).order_by(Notification.created_at.desc())
-    
-    notifications = session.exec(query).all()
+    notifications, next_cursor = paginate(session, query, Notification, cursor, limit, skip)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return notifications
 
 @router.get("/unread-count")
@@ -175,7 +178,7 @@ async def update_notification_settings(
     return settings
 
 # 通知创建工具函数
-async def create_notification(
+def save_notification(
     session: Session,
     user_id: int,
     title: str,
@@ -185,8 +188,8 @@ async def create_notification(
     related_claim_id: Optional[int] = None,
     related_comment_id: Optional[int] = None,
     extra_data: Optional[dict] = None
-):
-    """创建通知并发送实时推送"""
+) -> Notification:
+    """创建通知并提交，不发送实时推送（供在线程中执行的后台任务使用，推送由调用方在事件循环中完成）"""
     notification = Notification(
         user_id=user_id,
         title=title,
@@ -201,9 +204,11 @@ async def create_notification(
     session.add(notification)
     session.commit()
     session.refresh(notification)
-    
-    # 通过WebSocket发送实时通知
-    await manager.send_personal_message({
+    return notification
+
+def notification_message(notification: Notification) -> dict:
+    """通知的WebSocket推送消息"""
+    return {
         "type": "notification",
         "data": {
             "id": notification.id,
@@ -212,6 +217,33 @@ async def create_notification(
             "type": notification.type,
             "created_at": notification.created_at.isoformat()
         }
-    }, user_id)
+    }
+
+async def create_notification(
+    session: Session,
+    user_id: int,
+    title: str,
+    content: str,
+    notification_type: NotificationType,
+    related_post_id: Optional[int] = None,
+    related_claim_id: Optional[int] = None,
+    related_comment_id: Optional[int] = None,
+    extra_data: Optional[dict] = None
+):
+    """创建通知并发送实时推送"""
+    notification = save_notification(
+        session=session,
+        user_id=user_id,
+        title=title,
+        content=content,
+        notification_type=notification_type,
+        related_post_id=related_post_id,
+        related_claim_id=related_claim_id,
+        related_comment_id=related_comment_id,
+        extra_data=extra_data
+    )
+    
+    # 通过WebSocket发送实时通知
+    await manager.send_personal_message(notification_message(notification), user_id)
     
     return notification
\ No newline at end of file
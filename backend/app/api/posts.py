@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session, select, or_, and_, func
-from typing import List, Optional
-from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from datetime import datetime
 from app.database import get_session
 from app.models.user import User
 from app.models.post import Post
@@ -10,15 +10,30 @@ from app.models.comment import Comment
 from app.models.notification import Notification
 from app.schemas.post import PostCreate, PostRead, PostUpdate
 from app.schemas.comment import CommentCreate, CommentRead
+from app.schemas.match_job import MatchJobRead
 from app.core.deps import get_current_user
 from app.services.notification_service import NotificationService
-from app.services.text_similarity import TextSimilarityService
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import Levenshtein
+from app.services.post_index import PostIndexService
+from app.services.post_features import PostFeatureService
+from app.services.match_job_service import MatchJobService
+from app.services.duplicate_detection import DuplicateDetectionService
+from app.services.location_index import LocationIndexService
+from app.services.embedding import EmbeddingService
+from app.services.image_hash import ImageHashService
+from app.services.post_search import PostSearchService
+from app.services.post_fields import PostFieldsService
+from app.services.post_stats import PostStatsService
+from app.services.post_counts import PostCounterService, get_post_count_cache, invalidate_post_counts
+from app.core.pagination import paginate
+from app.services.match_ranking import MatchRankingService, MIN_MATCH_SCORE
+from app.services.match_cache import get_match_cache, invalidate_matches
+from app.services.post_match_service import PostMatchService
+from app.services.matching_engines import MatchingEngine, get_matching_engine
 import numpy as np
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Post endpoints
 @router.post("/", response_model=PostRead)
@@ -27,6 +42,13 @@ async def create_post(
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
+    # Near-duplicate check via the LSH buckets: a re-posted item is flagged as a duplicate
+    # of the existing cluster (collapsed in match results, still matched and percolated)
+    signature, duplicates = [], []
+    if post.item_type in ["lost", "found"]:
+        signature = DuplicateDetectionService.compute_signature(f"{post.title} {post.content}")
+        duplicates = DuplicateDetectionService.find_duplicates(session, signature, post.item_type)
+    
     db_post = Post(
         title=post.title,
         content=post.content,
@@ -39,70 +61,27 @@ async def create_post(
         author_id=current_user.id
     )
     session.add(db_post)
-    session.commit()
-    session.refresh(db_post)
+    session.flush()
+    PostFeatureService.refresh(session, db_post)
+    PostIndexService.sync_post(session, db_post)
+    LocationIndexService.sync_post(session, db_post)
+    PostSearchService.sync_post(session, db_post)
+    PostCounterService.sync_post(session, db_post)
     
-    # Smart matching: Find potential matches and notify relevant users
     if db_post.item_type in ["lost", "found"]:
-        # Determine target type (lost <-> found)
-        target_type = "found" if db_post.item_type == "lost" else "lost"
-        
-        # Build query for matching posts
-        match_query = select(Post).where(
-            and_(
-                Post.status.in_(["published", "active"]),
-                Post.item_type == target_type,
-                Post.is_claimed == False,
-                Post.id != db_post.id
-            )
-        )
-        
-        # Filter by category if available
-        if db_post.category_id:
-            match_query = match_query.where(Post.category_id == db_post.category_id)
-        
-        # Filter by location if available
-        if db_post.location:
-            location_pattern = f"%{db_post.location}%"
-            match_query = match_query.where(Post.location.like(location_pattern))
-        
-        # Filter by time range (7 days) if available
-        if db_post.item_time:
-            time_start = db_post.item_time - timedelta(days=7)
-            time_end = db_post.item_time + timedelta(days=7)
-            match_query = match_query.where(
-                and_(
-                    Post.item_time.isnot(None),
-                    Post.item_time >= time_start,
-                    Post.item_time <= time_end
-                )
-            )
-        
-        # Get potential matches
-        match_query = match_query.order_by(Post.created_at.desc()).limit(10)
-        potential_matches = list(session.exec(match_query).all())
-        
-        # Calculate similarity scores and notify if high match found
-        if potential_matches:
-            new_post_text = f"{db_post.title} {db_post.content}"
-            
-            for match_post in potential_matches:
-                match_text = f"{match_post.title} {match_post.content}"
-                similarity_score = TextSimilarityService.calculate_combined_similarity(
-                    new_post_text,
-                    match_text
-                )
-                
-                # Notify if similarity is above threshold (0.3 = 30%)
-                if similarity_score > 0.3:
-                    # Notify the author of the matching post
-                    await NotificationService.create_matching_notification(
-                        session=session,
-                        user_id=match_post.author_id,
-                        new_post=db_post,
-                        matched_post=match_post,
-                        similarity_score=similarity_score
-                    )
+        EmbeddingService.refresh(session, db_post)
+        ImageHashService.sync_post(session, db_post)
+        record = DuplicateDetectionService.register(session, db_post, signature, duplicates)
+        if record.duplicate_of_id:
+            logger.info(f"[DEDUP] Post {db_post.id} flagged as duplicate of post {record.duplicate_of_id} "
+                        f"(similarity {record.similarity})")
+        # Smart matching (scoring + notifications) runs in the background worker;
+        # the job is committed together with the post so it can't get lost
+        MatchJobService.enqueue(session, db_post.id)
+    
+    session.commit()
+    invalidate_post_counts()
+    session.refresh(db_post)
     
     return db_post
 
@@ -113,10 +92,25 @@ def list_posts(
     item_type: Optional[str] = Query(None, description="Filter by item_type: lost, found, general"),
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     is_claimed: Optional[bool] = Query(None, description="Filter by claimed status"),
-    search: Optional[str] = Query(None, description="Search in title and content"),
+    search: Optional[str] = Query(None, description="Search in title and content (ordered by relevance)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (keyset pagination, skip is ignored; not allowed with search)"),
+    include_total: bool = Query(True, description="Set to false to skip computing total"),
+    total_mode: str = Query("exact", alias="total", pattern="^(exact|approx)$",
+                            description="approx: estimate total from the maintained post counters"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (PostRead fields, thumbnail, comment_count) or summary"),
     session: Session = Depends(get_session)
 ):
-    statement = select(Post).where(Post.status.in_(["published", "active"]))
+    # 游标按 (created_at, id) 定位，无法表示按相关度排序的搜索结果中的位置
+    if search and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor cannot be combined with search; use skip/limit to page search results"
+        )
+
+    selected_fields = PostFieldsService.parse(fields)
+    # 只查询 fields 所选的列（Core 行，不构造 ORM 实体），所选的关系按本页外键批量加载，查询次数与每页条数无关
+    statement = PostFieldsService.select_rows(selected_fields).where(Post.status.in_(["published", "active"]))
+    relevance = []
     
     # 筛选条件
     if item_type:
@@ -126,24 +120,35 @@ def list_posts(
     if is_claimed is not None:
         statement = statement.where(Post.is_claimed == is_claimed)
     if search:
-        search_pattern = f"%{search}%"
-        statement = statement.where(
-            (Post.title.like(search_pattern)) | (Post.content.like(search_pattern))
-        )
-    
-    # 获取总数
-    count_statement = select(func.count()).select_from(statement.subquery())
-    total = session.exec(count_statement).one()
-    
-    # 获取分页数据
-    statement = statement.offset(skip).limit(limit).order_by(Post.created_at.desc())
-    posts = session.exec(statement).all()
+        # 全文索引（SQLite FTS5 / PostgreSQL pg_trgm），结果按相关度排序
+        statement, relevance = PostSearchService.apply(session, statement, search)
+    
+    # 获取总数：approx 由 post_counters 求和（搜索条件无法估算，仍取精确值），精确值按筛选条件缓存
+    total, total_approximate = None, False
+    if include_total:
+        if total_mode == "approx" and not search:
+            total = PostCounterService.estimate(session, item_type, category_id, is_claimed)
+            total_approximate = True
+        else:
+            count_cache = get_post_count_cache()
+            count_key = count_cache.make_key(item_type, category_id, is_claimed, search)
+            total = count_cache.count(session, count_key, statement)
+    
+    # 获取分页数据：搜索结果按相关度排序，只支持 skip/limit（不返回游标），其余按 (created_at, id) 游标分页
+    next_cursor = None
+    if search:
+        statement = statement.offset(skip).limit(limit).order_by(*relevance, Post.created_at.desc(), Post.id.desc())
+        posts = session.exec(statement).all()
+    else:
+        posts, next_cursor = paginate(session, statement, Post, cursor, limit, skip)
     
     # 返回JSON响应，包含总数
-    return JSONResponse(
+    return ORJSONResponse(
         content={
-            "data": [PostRead.model_validate(post).model_dump(mode='json') for post in posts],
-            "total": total
+            "data": PostFieldsService.serialize_rows(session, posts, selected_fields),
+            "total": total,
+            "total_approximate": total_approximate,
+            "next_cursor": next_cursor
         }
     )
 
@@ -181,12 +186,34 @@ def update_post(
     
     # 更新所有可能的字段
     update_data = post_update.model_dump(exclude_unset=True)
+    previous_key = PostCounterService.key(post)
     for field, value in update_data.items():
         setattr(post, field, value)
     
     post.updated_at = datetime.utcnow()
     session.add(post)
+    PostCounterService.sync_post(session, post, previous_key)
+    if "title" in update_data or "content" in update_data:
+        PostFeatureService.refresh(session, post)
+        PostSearchService.sync_post(session, post)
+    if post.item_type in ["lost", "found"]:
+        if "title" in update_data or "content" in update_data or "item_type" in update_data:
+            EmbeddingService.refresh(session, post)
+        elif "status" in update_data or "is_claimed" in update_data:
+            EmbeddingService.touch(session, post)
+    if "location" in update_data:
+        LocationIndexService.sync_post(session, post)
+    if ("images" in update_data or "item_type" in update_data) and post.item_type in ["lost", "found"]:
+        ImageHashService.sync_post(session, post)
+    if (
+        "title" in update_data or "content" in update_data or "item_type" in update_data
+    ) and post.item_type in ["lost", "found"]:
+        DuplicateDetectionService.sync_post(session, post)
+    PostIndexService.sync_post(session, post)
+    PostMatchService.invalidate(session, post.id)
     session.commit()
+    invalidate_matches(post.id)
+    invalidate_post_counts()
     session.refresh(post)
     return post
 
@@ -206,13 +233,49 @@ def delete_post(
         )
     
     # Soft delete by changing status
+    previous_key = PostCounterService.key(post)
     post.status = "deleted"
     post.updated_at = datetime.utcnow()
     session.add(post)
+    PostCounterService.sync_post(session, post, previous_key)
+    PostIndexService.sync_post(session, post)
+    EmbeddingService.touch(session, post)
+    PostMatchService.invalidate(session, post.id)
     session.commit()
+    invalidate_matches(post.id)
+    invalidate_post_counts()
     
     return {"message": "Post deleted successfully"}
 
+@router.get("/{post_id}/match-job", response_model=MatchJobRead)
+def get_post_match_job(
+    post_id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Status of the latest background smart-matching job for a post (author or admin only)"""
+    post = session.get(Post, post_id)
+    if not post:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found"
+        )
+    
+    if post.author_id != current_user.id and not getattr(current_user, 'is_admin', False):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to view this post's match job"
+        )
+    
+    job = MatchJobService.get_latest_job(session, post_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No match job for this post"
+        )
+    
+    return job
+
 # Comment endpoints
 @router.post("/{post_id}/comments", response_model=CommentRead)
 async def create_comment(
@@ -238,6 +301,7 @@ async def create_comment(
         author_id=current_user.id
     )
     session.add(db_comment)
+    PostStatsService.adjust(session, post_id, comments=1)
     session.commit()
     session.refresh(db_comment)
     
@@ -272,6 +336,7 @@ def delete_comment(
         )
     
     session.delete(comment)
+    PostStatsService.adjust(session, comment.post_id, comments=-1)
     session.commit()
     
     return {"message": "Comment deleted successfully"}
@@ -282,7 +347,10 @@ def get_matching_posts(
     post_id: int,
     limit: int = Query(10, ge=1, le=50),
     time_range_days: int = Query(7, ge=1, le=30, description="Time range in days for matching"),
-    session: Session = Depends(get_session)
+    mode: str = Query("topk", pattern="^(topk|rerank|semantic)$", description="topk: best matches among all open posts; rerank: re-score the top 100 text hits; semantic: re-score the nearest posts in the embedding index"),
+    engine: Optional[str] = Query(None, description="Matching engine for mode=rerank and fallbacks: tfidf, bm25 or simple (default: MATCHING_ENGINE)"),
+    session: Session = Depends(get_session),
+    background_tasks: BackgroundTasks = None
 ):
     """
     Advanced matching algorithm using TF-IDF and multi-dimensional scoring.
@@ -292,7 +360,22 @@ def get_matching_posts(
     - Category Match: 20%
     - Location Proximity: 15%
     - Time Proximity: 15%
+    
+    mode=topk ranks every open post by the combined score with early termination; its results are
+    materialized in post_matches and served from there while fresh.
+    mode=rerank only re-scores the 100 best text matches of the selected matching engine
+    (tfidf, bm25 or the cheaper simple engine).
+    mode=semantic re-scores the nearest neighbours from the hashed-embedding ANN index,
+    using the larger of embedding and TF-IDF similarity as the text score (catches paraphrases).
     """
+    try:
+        matching_engine = get_matching_engine(engine)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
     # 1) Get original post
     statement = select(Post).where(Post.id == post_id, Post.status == "published")
     original_post = session.exec(statement).first()
@@ -307,55 +390,135 @@ def get_matching_posts(
     if original_post.item_type not in ["lost", "found"]:
         return []
     
-    # Determine target type (lost <-> found)
-    target_type = "found" if original_post.item_type == "lost" else "lost"
-    
-    # 3) Get all potential candidates (broader search)
-    statement = select(Post).where(
-        and_(
-            Post.status.in_(["published", "active"]),
-            Post.item_type == target_type,
-            Post.is_claimed == False,
-            Post.id != post_id
-        )
+    # 3) Serve from the match cache when nothing relevant changed since it was computed
+    #    (rerank results depend on the engine, so it is part of the key)
+    cache_mode = f"{mode}-{matching_engine.name}" if mode == "rerank" else mode
+    match_cache = get_match_cache()
+    if match_cache is not None:
+        cached_ids = match_cache.get(post_id, limit, time_range_days, cache_mode)
+        if cached_ids is not None:
+            # Re-check the candidate conditions: invalidations made by other worker processes
+            # only reach this cache through the shared tier, so an entry may list posts that
+            # were deleted, rejected or claimed since it was stored
+            posts_by_id = {
+                post.id: post
+                for post in session.exec(
+                    select(Post).where(Post.id.in_(cached_ids), MatchRankingService.candidate_filter(original_post))
+                ).all()
+            } if cached_ids else {}
+            return [posts_by_id[cached_id] for cached_id in cached_ids if cached_id in posts_by_id]
+        generation = match_cache.generation()
+    
+    result_posts, cacheable = _rank_matching_posts(
+        session, original_post, limit, time_range_days, mode, matching_engine, background_tasks
     )
     
-    # Get all candidates for scoring (up to 100)
-    statement = statement.order_by(Post.created_at.desc()).limit(100)
-    candidates = list(session.exec(statement).all())
+    if match_cache is not None and cacheable:
+        match_cache.set(post_id, limit, time_range_days, cache_mode, [post.id for post in result_posts], generation)
+    
+    return result_posts
+
+def _store_matches(bind, post_id: int, ranked_ids: List[Tuple[float, int]], limit: int, time_range_days: int, computed_at: datetime):
+    """
+    Background task: write freshly ranked matches back to post_matches in a session of its own,
+    after the response, so the read request itself never writes. A failed write only costs a
+    recomputation later.
+    """
+    with Session(bind) as session:
+        try:
+            original_post = session.get(Post, post_id)
+            if original_post is None:
+                return
+            candidates = {
+                post.id: post
+                for post in session.exec(select(Post).where(Post.id.in_([post_id for _, post_id in ranked_ids]))).all()
+            } if ranked_ids else {}
+            ranked = [(score, candidates[candidate_id]) for score, candidate_id in ranked_ids if candidate_id in candidates]
+            PostMatchService.store(session, original_post, ranked, limit, time_range_days, computed_at)
+            session.commit()
+        except Exception:
+            session.rollback()
+            logger.warning(f"[MATCHES] Could not materialize matches for post {post_id}", exc_info=True)
+
+def _rank_matching_posts(
+    session: Session,
+    original_post: Post,
+    limit: int,
+    time_range_days: int,
+    mode: str,
+    engine: MatchingEngine,
+    background_tasks: Optional[BackgroundTasks] = None
+) -> Tuple[List[Post], bool]:
+    """
+    Rank matches for a lost/found post; the flag is False when a degraded fallback path was used.
+    Fresh topk rankings are materialized through background_tasks (skipped when not given).
+    """
+    post_id = original_post.id
+    degraded = False
+    
+    if mode == "topk":
+        try:
+            # Materialized results in post_matches: a single indexed range read when still fresh
+            ranked = PostMatchService.get_fresh(session, original_post, limit, time_range_days)
+            if ranked is None:
+                computed_at = datetime.utcnow()
+                ranked = MatchRankingService.top_k(session, original_post, limit=limit, time_range_days=time_range_days)
+                if background_tasks is not None:
+                    background_tasks.add_task(
+                        _store_matches, session.get_bind(), original_post.id,
+                        [(score, post.id) for score, post in ranked], limit, time_range_days, computed_at
+                    )
+            return [post for score, post in ranked], True
+        except Exception:
+            logger.exception(f"[MATCHES] Top-k retrieval failed for post {post_id}, falling back to rerank")
+            degraded = True
+    
+    if mode == "semantic":
+        try:
+            ranked = MatchRankingService.semantic_rank(session, original_post, limit=limit, time_range_days=time_range_days)
+            return [post for score, post in ranked], True
+        except Exception:
+            logger.exception(f"[MATCHES] Semantic retrieval failed for post {post_id}, falling back to rerank")
+            degraded = True
+    
+    # Retrieve candidates and text similarities (0-1) with the selected matching engine.
+    #    If it fails, fall back to the simple engine, which does not read the inverted index.
+    try:
+        matches = engine.search(session, original_post, limit=100)
+    except Exception:
+        logger.exception(f"[MATCHES] {engine.name} engine failed for post {post_id}, falling back to simple")
+        matches = get_matching_engine("simple").search(session, original_post, limit=100)
+        degraded = True
+    
+    if not matches:
+        return [], not degraded
+    candidates = [post for post, _ in matches]
+    text_similarities = np.array([similarity for _, similarity in matches])
+    
+    # Collapse near-duplicate clusters: keep only the best-ranked post of each cluster
+    canonical = DuplicateDetectionService.canonical_ids(session, [post.id for post in candidates])
+    seen_clusters = set()
+    keep = []
+    for idx, post in enumerate(candidates):
+        if canonical[post.id] not in seen_clusters:
+            seen_clusters.add(canonical[post.id])
+            keep.append(idx)
+    candidates = [candidates[idx] for idx in keep]
+    text_similarities = np.asarray(text_similarities)[keep]
     
     if not candidates:
-        return []
+        return [], not degraded
     
-    # 4) Calculate multi-dimensional scores
-    scored_posts = []
+    # Location similarity = trigram overlap looked up in the location index
+    location_similarities = LocationIndexService.similarities(
+        session, original_post.location_normalized, post_ids=[post.id for post in candidates]
+    ) if original_post.location_normalized else {}
     
-    # Prepare TF-IDF vectorizer
-    all_texts = [f"{original_post.title} {original_post.content}"]
-    all_texts.extend([f"{post.title} {post.content}" for post in candidates])
+    # Image similarity = perceptual-hash distance between the photos (only when both posts have photos)
+    image_similarities = ImageHashService.similarities(session, original_post, [post.id for post in candidates])
     
-    try:
-        # Use TF-IDF for text similarity
-        vectorizer = TfidfVectorizer(
-            max_features=100,
-            ngram_range=(1, 2),  # Use both unigrams and bigrams
-            stop_words=None  # We'll keep all words for Chinese text
-        )
-        tfidf_matrix = vectorizer.fit_transform(all_texts)
-        
-        # Calculate cosine similarity between original and all candidates
-        original_vector = tfidf_matrix[0:1]
-        candidate_vectors = tfidf_matrix[1:]
-        text_similarities = cosine_similarity(original_vector, candidate_vectors).flatten()
-    except:
-        # Fallback to simple similarity if TF-IDF fails
-        text_similarities = []
-        original_text = all_texts[0]
-        for post in candidates:
-            match_text = f"{post.title} {post.content}"
-            sim = TextSimilarityService.calculate_combined_similarity(original_text, match_text)
-            text_similarities.append(sim)
-        text_similarities = np.array(text_similarities)
+    # Calculate multi-dimensional scores
+    scored_posts = []
     
     # Calculate scores for each candidate
     for idx, post in enumerate(candidates):
@@ -363,73 +526,52 @@ def get_matching_posts(
         text_score = float(text_similarities[idx]) * 100  # Convert to 0-100 scale
         
         # b) Category Match Score (20% weight)
-        category_score = 100 if (original_post.category_id and 
-                                 original_post.category_id == post.category_id) else 0
+        category_score = MatchRankingService.category_score(original_post, post)
         
         # c) Location Proximity Score (15% weight)
-        location_score = 0
-        if original_post.location and post.location:
-            try:
-                # Use Levenshtein distance for string similarity
-                distance = Levenshtein.distance(original_post.location.lower(), 
-                                               post.location.lower())
-                max_len = max(len(original_post.location), len(post.location))
-                location_score = (1 - distance / max_len) * 100 if max_len > 0 else 0
-            except:
-                # Fallback to simple containment check
-                if original_post.location.lower() in post.location.lower() or \
-                   post.location.lower() in original_post.location.lower():
-                    location_score = 50
+        location_score = location_similarities.get(post.id, 0.0) * 100
         
         # d) Time Proximity Score (15% weight)
-        time_score = 0
-        if original_post.item_time and post.item_time:
-            # For lost->found: found time should be after lost time
-            # For found->lost: lost time should be before found time
-            time_diff = abs((post.item_time - original_post.item_time).days)
+        # Linear decay: 100 points for same day, 0 points for time_range_days+ days
+        time_score = MatchRankingService.time_score(original_post, post, time_range_days)
             
-            if original_post.item_type == "lost" and post.item_time < original_post.item_time:
-                # Found before lost - invalid
-                time_score = 0
-            elif original_post.item_type == "found" and post.item_time > original_post.item_time:
-                # Lost after found - invalid  
-                time_score = 0
-            else:
-                # Linear decay: 100 points for same day, 0 points for 7+ days
-                time_score = max(0, (1 - time_diff / time_range_days) * 100)
+        # e) Image Similarity Score (blended in at 15% when both posts have photos)
+        image_score = image_similarities[post.id] * 100 if post.id in image_similarities else None
         
         # Calculate weighted final score
-        final_score = (text_score * 0.50 + 
-                      category_score * 0.20 + 
-                      location_score * 0.15 + 
-                      time_score * 0.15)
+        final_score = MatchRankingService.final_score(
+            text_score, category_score, location_score, time_score, image_score
+        )
         
         scored_posts.append((final_score, post))
     
-    # 5) Sort by score and filter
+    # Sort by score and filter
     scored_posts.sort(key=lambda x: x[0], reverse=True)
     
     # Only return posts with score > 10 (minimum threshold)
-    result_posts = [post for score, post in scored_posts if score > 10][:limit]
+    result_posts = [post for score, post in scored_posts if score > MIN_MATCH_SCORE][:limit]
     
-    return result_posts
+    return result_posts, not degraded
 
 @router.get("/search/advanced", response_model=List[PostRead])
 def advanced_search(
     item_type: Optional[str] = Query(None, description="lost or found"),
     category_id: Optional[int] = Query(None),
     location: Optional[str] = Query(None),
+    search: Optional[str] = Query(None, description="Search in title and content (ordered by relevance)"),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
     is_claimed: bool = Query(False),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (PostRead fields, thumbnail, comment_count) or summary"),
     session: Session = Depends(get_session)
 ):
     """
     高级搜索功能
-    支持多条件组合搜索
+    支持多条件组合搜索；给出 fields 时只返回所选字段
     """
+    selected_fields = PostFieldsService.parse(fields)
     statement = select(Post).where(Post.status.in_(["published", "active"]))
     
     if item_type:
@@ -450,8 +592,14 @@ def advanced_search(
     
     statement = statement.where(Post.is_claimed == is_claimed)
     
-    statement = statement.offset(skip).limit(limit).order_by(Post.created_at.desc())
-    posts = session.exec(statement).all()
+    relevance = []
+    if search:
+        statement, relevance = PostSearchService.apply(session, statement, search)
+    
+    statement = statement.offset(skip).limit(limit).order_by(*relevance, Post.created_at.desc())
+    posts = session.exec(PostFieldsService.apply(statement, selected_fields)).all()
     
+    if selected_fields is not None:
+        return ORJSONResponse(content=PostFieldsService.serialize(session, posts, selected_fields))
     return posts
 
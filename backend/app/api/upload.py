@@ -7,6 +7,7 @@ from pathlib import Path
 from app.core.deps import get_current_user, get_current_admin_user
 from app.database import get_session
 from app.models.user import User
+from app.services.image_hash import ImageHashService
 
 router = APIRouter()
 
@@ -31,7 +32,8 @@ def validate_image(file: UploadFile) -> None:
 @router.post("/upload", response_model=dict)
 async def upload_image(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
 ):
     """上传单张图片"""
     validate_image(file)
@@ -55,6 +57,11 @@ async def upload_image(
     
     # 返回文件URL（相对路径）
     file_url = f"/uploads/images/{unique_filename}"
+    
+    # 计算感知哈希，发帖时用于图片相似度匹配
+    ImageHashService.store_upload(session, file_url, content, current_user.id)
+    session.commit()
+    
     return {
         "filename": unique_filename,
         "url": file_url,
@@ -64,7 +71,8 @@ async def upload_image(
 @router.post("/upload-multiple", response_model=dict)
 async def upload_multiple_images(
     files: List[UploadFile] = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
 ):
     """上传多张图片"""
     if len(files) > 9:
@@ -97,11 +105,14 @@ async def upload_multiple_images(
         
         # 添加到已上传列表
         file_url = f"/uploads/images/{unique_filename}"
+        ImageHashService.store_upload(session, file_url, content, current_user.id)
         uploaded_files.append({
             "filename": unique_filename,
             "url": file_url
         })
     
+    session.commit()
+    
     return {
         "files": uploaded_files,
         "count": len(uploaded_files),
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from fastapi.responses import JSONResponse
 from sqlmodel import Session, select, func
 from typing import List, Optional
@@ -13,6 +13,8 @@ from app.schemas.post import PostRead
 from app.schemas.rating import RatingRead
 from app.api.auth import get_current_user
 from app.core.deps import get_current_admin_user
+from app.core.pagination import paginate, NEXT_CURSOR_HEADER
+from app.core.eager_loading import eager_options
 
 router = APIRouter()
 
@@ -146,11 +148,13 @@ def get_user_public_info(
 @router.get("/{user_id}/posts", response_model=List[PostRead])
 def get_user_posts(
     user_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     session: Session = Depends(get_session)
 ):
-    """获取用户发布的帖子列表"""
+    """获取用户发布的帖子列表（给出cursor时按游标分页，下一页游标在 X-Next-Cursor 响应头中）"""
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(
@@ -161,19 +165,23 @@ def get_user_posts(
     statement = select(Post).where(
         Post.author_id == user_id,
         Post.status == "published"
-    ).offset(skip).limit(limit).order_by(Post.created_at.desc())
+    ).options(*eager_options(Post, PostRead))
     
-    posts = session.exec(statement).all()
+    posts, next_cursor = paginate(session, statement, Post, cursor, limit, skip)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return posts
 
 @router.get("/{user_id}/ratings", response_model=List[RatingRead])
 def get_user_ratings(
     user_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     session: Session = Depends(get_session)
 ):
-    """获取用户收到的评价列表"""
+    """获取用户收到的评价列表（给出cursor时按游标分页，下一页游标在 X-Next-Cursor 响应头中）"""
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(
@@ -183,8 +191,10 @@ def get_user_ratings(
     
     statement = select(Rating).where(
         Rating.ratee_id == user_id
-    ).offset(skip).limit(limit).order_by(Rating.created_at.desc())
+    )
     
-    ratings = session.exec(statement).all()
+    ratings, next_cursor = paginate(session, statement, Rating, cursor, limit, skip)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return ratings
 
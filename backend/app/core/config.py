@@ -1,9 +1,17 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # Database (sync SQLite for SQLModel Session)
     DATABASE_URL: str = "sqlite:///./lostandfound.db"
+    # Engine profile (app/core/db_profiles.py): "dev", "prod-sqlite" (WAL, synchronous=NORMAL,
+    # mmap, larger page cache) or "prod-postgres" (connection pool sizing). SQL statement
+    # logging is off unless SQL_ECHO is set. DB_POOL_SIZE / DB_MAX_OVERFLOW override the
+    # profile's pool sizing for non-SQLite databases.
+    DB_PROFILE: str = "dev"
+    SQL_ECHO: bool = False
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -21,6 +29,41 @@ class Settings(BaseSettings):
     # App
     PROJECT_NAME: str = "Lost & Found Platform"
     
+    # Chinese tokenizer for matching: "mm" (dictionary max-match) or "char" (single characters).
+    # Run rebuild_post_index.py after changing it.
+    CHINESE_SEGMENTER: str = "mm"
+    
+    # Smart matching background worker
+    MATCH_WORKER_ENABLED: bool = True
+    MATCH_WORKER_POLL_SECONDS: float = 2.0
+    
+    # Match result cache for /posts/{post_id}/matches. MATCH_CACHE_SQLITE_PATH enables a
+    # SQLite file shared by all worker processes (empty = in-process cache only).
+    MATCH_CACHE_ENABLED: bool = True
+    MATCH_CACHE_MAX_ENTRIES: int = 2048
+    MATCH_CACHE_TTL_SECONDS: float = 300.0
+    MATCH_CACHE_SQLITE_PATH: str = ""
+    
+    # Cached totals for GET /posts/ (keyed by the filter set, cleared on post writes in this
+    # process; the TTL bounds staleness from writes made by other worker processes).
+    POST_COUNT_CACHE_MAX_ENTRIES: int = 1024
+    POST_COUNT_CACHE_TTL_SECONDS: float = 30.0
+    
+    # Materialized match results (post_matches) older than this are recomputed on read even
+    # if no invalidation hit them (covers new posts that did not reach the other post's top-k).
+    MATCH_TABLE_MAX_AGE_SECONDS: int = 3600
+    
+    # Default text matching engine for mode=rerank and the degraded fallback paths:
+    # "tfidf", "bm25" or "simple" (cheapest; no inverted index reads). Requests may
+    # override it with the engine query parameter.
+    MATCHING_ENGINE: str = "tfidf"
+    
+    # Semantic matching (mode=semantic): ANN index over hashed embeddings, persisted to this
+    # file (relative to the backend directory; empty = rebuilt in memory on first use).
+    # SEMANTIC_NPROBE = clusters scanned per query (higher = more accurate, slower).
+    SEMANTIC_INDEX_PATH: str = "semantic_index.npz"
+    SEMANTIC_NPROBE: int = 16
+    
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,80 @@
+"""
+按响应模型预加载关联对象
+PostRead 等响应模型嵌套了 author、category、comments（以及评论的 author），直接对查询结果 model_validate
+会逐行懒加载这些关系，一页100条帖子就是300多次查询。eager_options(Post, PostRead) 按响应模型中出现的关系字段
+生成加载选项：多对一关系用 joinedload 并入主查询，集合关系用 selectinload 一次批量查询，嵌套模型递归处理，
+因此一页列表的查询次数是固定的，与每页条数无关。count_queries 统计一段代码执行的SQL条数，用于核对
+"""
+from typing import List, Type, Union, get_args
+from contextlib import contextmanager
+from functools import lru_cache
+
+from pydantic import BaseModel
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def nested_schema(annotation) -> Union[Type[BaseModel], None]:
+    """字段类型（可能是 Optional[...] / List[...]）中的响应模型"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        schema = nested_schema(arg)
+        if schema is not None:
+            return schema
+    return None
+
+
+def _loaders(model, schema: Type[BaseModel], parent=None) -> list:
+    relationships = inspect(model).relationships
+    options = []
+    for name, field in schema.model_fields.items():
+        relationship = relationships.get(name)
+        nested = nested_schema(field.annotation)
+        if relationship is None or nested is None:
+            continue
+        attribute = getattr(model, name)
+        if parent is None:
+            loader = selectinload(attribute) if relationship.uselist else joinedload(attribute)
+        else:
+            loader = parent.selectinload(attribute) if relationship.uselist else parent.joinedload(attribute)
+        options.append(loader)
+        options.extend(_loaders(relationship.mapper.class_, nested, loader))
+    return options
+
+
+@lru_cache(maxsize=512)
+def eager_options(model, schema: Type[BaseModel]) -> tuple:
+    """序列化为 schema 时需要的全部关系加载选项，用法：statement.options(*eager_options(Post, PostRead))"""
+    return tuple(_loaders(model, schema))
+
+
+class QueryCounter:
+    """count_queries 的结果：执行的SQL条数与语句"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine):
+    """
+    统计代码块内在 engine 上执行的SQL条数：
+        with count_queries(engine) as queries:
+            ...
+        print(queries.count)
+    """
+    counter = QueryCounter()
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
@@ -0,0 +1,60 @@
+"""
+游标（keyset）分页
+列表按 (created_at, id) 倒序排列，游标是上一页最后一条记录的 (created_at, id) 的不透明编码；
+下一页用 WHERE (created_at, id) < 游标 加复合索引 (…, created_at, id) 直接定位，
+翻到多深每页的开销都相同，翻页期间新发布的记录也不会让后面的页重复或漏掉记录。
+与原有的 skip/limit 参数并存：给出 cursor 时忽略 skip
+"""
+from typing import List, Optional, Tuple
+from datetime import datetime
+import base64
+import json
+
+from fastapi import HTTPException, status
+from sqlmodel import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"  # 返回列表（而非对象）的接口通过响应头给出下一页游标
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解析游标，格式不正确时返回400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def keyset_order(model) -> list:
+    """游标分页要求的排序：created_at、id 均倒序"""
+    return [model.created_at.desc(), model.id.desc()]
+
+
+def apply_cursor(statement, model, cursor: Optional[str], skip: int = 0):
+    """按 (created_at, id) 倒序排列，并从游标之后（或跳过skip条）开始"""
+    statement = statement.order_by(*keyset_order(model))
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        return statement.where(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id)
+        ))
+    return statement.offset(skip)
+
+
+def paginate(session, statement, model, cursor: Optional[str], limit: int, skip: int = 0) -> Tuple[List, Optional[str]]:
+    """执行分页查询，多取一条判断是否还有下一页，返回 (本页记录, 下一页游标)"""
+    rows = list(session.exec(apply_cursor(statement, model, cursor, skip).limit(limit + 1)).all())
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
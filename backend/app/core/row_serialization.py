@@ -0,0 +1,102 @@
+"""
+按响应模型直接从 Core 行构造响应字典
+热点列表接口不再走 ORM 实体 -> pydantic 模型 -> model_dump 的三次对象图遍历：
+主查询只选出响应模型需要的列，关系（多对一、一对多，可嵌套）按外键各用一次 IN 查询批量取出，
+结果直接组装为字典交给 ORJSONResponse（datetime 由 orjson 序列化，格式与 pydantic 的 JSON 输出一致）。
+输出的字段与顺序与 schema.model_validate(obj).model_dump(mode='json') 相同
+"""
+from typing import Dict, List, NamedTuple, Optional, Tuple, Type
+from functools import lru_cache
+
+from pydantic import BaseModel
+from sqlalchemy import inspect, select
+from sqlmodel import Session
+
+from app.core.eager_loading import nested_schema
+
+
+class _Relation(NamedTuple):
+    name: str
+    model: type
+    schema: Type[BaseModel]
+    uselist: bool
+    local_key: str   # 本表上的关联列（多对一为外键，一对多为主键）
+    remote_key: str  # 关联表上的对应列
+
+
+class _Plan(NamedTuple):
+    fields: Tuple[str, ...]        # 输出字段（按 schema 顺序）
+    columns: Tuple[str, ...]       # 需要查询的列：输出的列字段 + 关系用到的本表关联列
+    relations: Dict[str, _Relation]
+
+
+@lru_cache(maxsize=512)
+def _plan(model, schema: Type[BaseModel]) -> _Plan:
+    mapper = inspect(model)
+    column_names = set(mapper.column_attrs.keys())
+    fields, columns, relations = [], [], {}
+    for name, field in schema.model_fields.items():
+        relationship = mapper.relationships.get(name)
+        nested = nested_schema(field.annotation)
+        if relationship is not None and nested is not None:
+            local, remote = relationship.local_remote_pairs[0]
+            relations[name] = _Relation(
+                name, relationship.mapper.class_, nested, relationship.uselist, local.key, remote.key
+            )
+            fields.append(name)
+            if local.key not in columns:
+                columns.append(local.key)
+        elif name in column_names:
+            fields.append(name)
+            if name not in columns:
+                columns.append(name)
+    return _Plan(tuple(fields), tuple(columns), relations)
+
+
+def row_select(model, schema: Type[BaseModel], extra: Tuple[str, ...] = ()):
+    """
+    只选出序列化为 schema 所需列的查询（extra 为额外需要的列，如排序、游标用到的列）；
+    使用 SQLAlchemy 的 select，session.exec 总是返回行（SQLModel 的单列 select 会返回标量）
+    """
+    names = list(_plan(model, schema).columns)
+    names.extend(name for name in extra if name not in names)
+    return select(*(getattr(model, name) for name in names))
+
+
+def _load_related(session: Session, relation: _Relation, keys: set) -> Dict[object, list]:
+    """关联表中 remote_key 属于 keys 的记录 -> {remote_key值: [字典]}"""
+    if not keys:
+        return {}
+    primary_key = inspect(relation.model).primary_key[0]
+    rows = session.exec(
+        row_select(relation.model, relation.schema, (relation.remote_key,))
+        .where(getattr(relation.model, relation.remote_key).in_(keys))
+        .order_by(primary_key)
+    ).all()
+    grouped: Dict[object, list] = {}
+    for row, item in zip(rows, rows_to_dicts(session, relation.model, relation.schema, rows)):
+        grouped.setdefault(row._mapping[relation.remote_key], []).append(item)
+    return grouped
+
+
+def rows_to_dicts(session: Session, model, schema: Type[BaseModel], rows: list) -> List[dict]:
+    """row_select 查询出的行 -> 响应字典列表，关系按外键批量加载（每个关系一次查询，与行数无关）"""
+    plan = _plan(model, schema)
+    related = {
+        name: _load_related(session, relation, {row._mapping[relation.local_key] for row in rows} - {None})
+        for name, relation in plan.relations.items()
+    }
+
+    result = []
+    for row in rows:
+        values = row._mapping
+        item = {}
+        for name in plan.fields:
+            relation: Optional[_Relation] = plan.relations.get(name)
+            if relation is None:
+                item[name] = values[name]
+                continue
+            children = related[name].get(values[relation.local_key], [])
+            item[name] = children if relation.uselist else (children[0] if children else None)
+        result.append(item)
+    return result
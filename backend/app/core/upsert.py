@@ -0,0 +1,30 @@
+"""
+计数表的原子增量写入
+按主键 INSERT ... ON CONFLICT DO UPDATE SET col = col + delta，一条语句完成"不存在则插入、存在则累加"。
+先查询再插入的写法在两个并发事务同时引入同一个新键时，后提交的一方会因主键冲突失败
+"""
+from typing import List, Type
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, SQLModel
+
+_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def increment(session: Session, model: Type[SQLModel], keys: List[dict], column: str, delta: int):
+    """给 keys（主键列 -> 值）对应的行的 column 加上 delta，不存在的行以 delta 为初始值插入（不提交事务）"""
+    if not keys or not delta:
+        return
+    dialect = session.get_bind().dialect.name
+    if dialect not in _INSERTS:
+        raise NotImplementedError(f"Atomic upsert is not supported on {dialect}")
+
+    table = model.__table__
+    statement = _INSERTS[dialect](table).values([{**key, column: delta} for key in keys])
+    session.exec(statement.on_conflict_do_update(
+        index_elements=[pk.name for pk in table.primary_key.columns],
+        set_={column: table.c[column] + delta}
+    ))
@@ -1,11 +1,22 @@
 from sqlmodel import SQLModel, create_engine, Session
 from app.core.config import settings
+from app.core.db_profiles import get_profile, engine_options, apply_sqlite_pragmas
 import os
 
 # Import all models to register them with SQLModel metadata
 from app.models import User, Post, Comment, Notification, Category, Claim, Rating
 from app.models.claim_status_log import ClaimStatusLog
 from app.models.notification import NotificationSettings
+from app.models.post_index import PostTerm, TermStat, CorpusStat
+from app.models.match_job import MatchJob, RematchJob
+from app.models.post_match import PostMatch, PostMatchState
+from app.models.post_feature import PostTextFeature
+from app.models.post_signature import PostSignature, LshBucket
+from app.models.location_index import LocationTrigram
+from app.models.alert import SavedAlert, AlertTerm, AlertMatch
+from app.models.post_embedding import PostEmbedding
+from app.models.image_hash import ImageHash, PostImageHash
+from app.models.post_counter import PostCounter
 
 # Prefer env var DATABASE_URL; fallback to local SQLite
 DATABASE_URL = os.getenv("DATABASE_URL") or getattr(settings, "DATABASE_URL", "sqlite:///./lostandfound.db")
@@ -19,17 +30,27 @@ if DATABASE_URL.startswith("sqlite:///"):
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
         abs_path = os.path.abspath(os.path.join(base_dir, path_part))
         DATABASE_URL = f"sqlite:///{abs_path}"
-    engine = create_engine(
+
+# Engine options and SQLite pragmas come from the DB_PROFILE engine profile
+db_profile = get_profile(settings.DB_PROFILE)
+engine = create_engine(
+    DATABASE_URL,
+    **engine_options(
+        db_profile,
         DATABASE_URL,
-        echo=True,
-        connect_args={"check_same_thread": False}
+        echo=settings.SQL_ECHO,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW
     )
-else:
-    # Use sync engine for non-sqlite
-    engine = create_engine(DATABASE_URL, echo=True)
+)
+apply_sqlite_pragmas(engine, db_profile)
 
 def init_db():
     SQLModel.metadata.create_all(engine)
+    # create_all skips tables that already exist; add indexes introduced since then
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
 def get_session() -> Session:
     with Session(engine) as session:
@@ -1,10 +1,22 @@
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import router as api_router
-from app.database import init_db
+from sqlmodel import Session
+from app.database import init_db, engine
+from app.core.config import settings
+from app.services.post_index import PostIndexService
+from app.services.match_job_service import MatchJobService
+from app.services.embedding import EmbeddingService
+from app.services.ann_index import maintenance_loop as semantic_index_maintenance
+from app.services.post_search import PostSearchService
+from app.services.post_counts import PostCounterService
+from app.core.pagination import NEXT_CURSOR_HEADER
 
-app = FastAPI()
+# orjson 序列化响应（比标准库 json 快数倍，原生支持 datetime）
+app = FastAPI(default_response_class=ORJSONResponse)
 
 origins = [
     "http://localhost:5173",
@@ -17,11 +29,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     init_db()
+    with Session(engine) as session:
+        PostIndexService.ensure_built(session)
+        PostSearchService.ensure_built(session)
+        PostCounterService.ensure_built(session)
+        EmbeddingService.backfill(session)
+    # 启动时加载并同步语义索引（之后由后台任务定期写回磁盘，查询路径不写盘）
+    app.state.semantic_index = asyncio.create_task(semantic_index_maintenance())
+    if settings.MATCH_WORKER_ENABLED:
+        app.state.match_worker = asyncio.create_task(
+            MatchJobService.worker_loop(settings.MATCH_WORKER_POLL_SECONDS)
+        )
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    for name in ("match_worker", "semantic_index"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
 
 app.include_router(api_router, prefix="/api")
 
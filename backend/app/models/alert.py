@@ -0,0 +1,49 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import Index
+
+class SavedAlert(SQLModel, table=True):
+    __tablename__ = "saved_alerts"
+    """用户保存的物品提醒（反向查询）：新发布的帖子满足条件时通知用户"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id")
+    keywords: str = Field(max_length=200)  # 关键词，帖子需包含全部关键词
+    item_type: str = Field(default="found", max_length=20)  # 要提醒的帖子类型：found（找失物）/ lost（找失主）
+    category_id: Optional[int] = Field(default=None, foreign_key="categories.id")  # 限定分类
+    location: Optional[str] = Field(default=None, max_length=200)  # 限定地点（按三元组相似度匹配）
+    start_time: Optional[datetime] = Field(default=None)  # 时间窗口：帖子的物品时间（无则发帖时间）须在窗口内
+    end_time: Optional[datetime] = Field(default=None)
+    term_count: int = Field(default=0)  # 反向索引中的条件词项数，帖子需命中全部
+    is_active: bool = Field(default=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_notified_at: Optional[datetime] = Field(default=None)
+
+    __table_args__ = (
+        Index("ix_saved_alert_user_id", "user_id"),
+    )
+
+class AlertTerm(SQLModel, table=True):
+    __tablename__ = "alert_terms"
+    """提醒的反向索引：条件词项 -> 提醒（关键词，以及 cat:<分类id> 伪词项）"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    term: str = Field(max_length=100)
+    alert_id: int = Field(foreign_key="saved_alerts.id")
+    item_type: str = Field(max_length=20)  # 与提醒的 item_type 相同，查询时按新帖子类型过滤
+
+    __table_args__ = (
+        Index("ix_alert_term_term_item_type", "term", "item_type"),
+        Index("ix_alert_term_alert_id", "alert_id"),
+    )
+
+class AlertMatch(SQLModel, table=True):
+    __tablename__ = "alert_matches"
+    """提醒命中记录，同一提醒对同一帖子只通知一次"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    alert_id: int = Field(foreign_key="saved_alerts.id")
+    post_id: int = Field(foreign_key="posts.id")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_alert_match_alert_id_post_id", "alert_id", "post_id", unique=True),
+    )
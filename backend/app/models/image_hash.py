@@ -0,0 +1,24 @@
+from sqlmodel import SQLModel, Field, Column
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import BigInteger, Index
+
+class ImageHash(SQLModel, table=True):
+    __tablename__ = "image_hashes"
+    """上传图片的感知哈希（64位dHash，按有符号整数存储），上传时计算一次"""
+    url: str = Field(primary_key=True, max_length=300)  # /uploads/images/<文件名>
+    dhash: int = Field(sa_column=Column(BigInteger, nullable=False))
+    uploaded_by: Optional[int] = Field(default=None, foreign_key="users.id")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class PostImageHash(SQLModel, table=True):
+    __tablename__ = "post_image_hashes"
+    """帖子图片哈希索引：失物/招领帖子的每张图片 -> 感知哈希，发帖及修改图片时维护"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    post_id: int = Field(foreign_key="posts.id")
+    item_type: str = Field(max_length=20)
+    dhash: int = Field(sa_column=Column(BigInteger, nullable=False))
+
+    __table_args__ = (
+        Index("ix_post_image_hash_post_id", "post_id"),
+    )
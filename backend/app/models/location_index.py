@@ -0,0 +1,15 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from sqlalchemy import Index
+
+class LocationTrigram(SQLModel, table=True):
+    __tablename__ = "location_trigrams"
+    """地点三元组索引：归一化地点的字符3-gram -> 帖子"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    trigram: str = Field(max_length=10)
+    post_id: int = Field(foreign_key="posts.id")
+
+    __table_args__ = (
+        Index("ix_location_trigram_trigram", "trigram"),
+        Index("ix_location_trigram_post_id", "post_id"),
+    )
@@ -0,0 +1,62 @@
+from sqlmodel import SQLModel, Field, Column, JSON
+from typing import Optional, Dict, Any
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import Index
+
+class MatchJobStatus(str, Enum):
+    """匹配任务状态枚举"""
+    PENDING = "pending"  # 等待执行（含等待重试）
+    RUNNING = "running"  # 执行中
+    COMPLETED = "completed"  # 已完成
+    FAILED = "failed"  # 重试耗尽后失败
+
+class MatchJob(SQLModel, table=True):
+    __tablename__ = "match_jobs"
+    """智能匹配后台任务（持久化队列）"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    post_id: int = Field(foreign_key="posts.id")
+
+    status: str = Field(default=MatchJobStatus.PENDING, max_length=20)
+    attempts: int = Field(default=0)  # 已尝试次数
+    max_attempts: int = Field(default=3)  # 最大尝试次数
+    last_error: Optional[str] = Field(default=None, max_length=500)
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))  # 执行结果摘要
+
+    # 时间戳
+    run_after: datetime = Field(default_factory=datetime.utcnow)  # 最早可执行时间（重试退避）
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+
+    __table_args__ = (
+        Index("ix_match_job_status_run_after", "status", "run_after"),
+        Index("ix_match_job_post_id", "post_id"),
+    )
+
+class RematchJob(SQLModel, table=True):
+    __tablename__ = "rematch_jobs"
+    """管理员触发的全量重新匹配任务：用进程池为所有开放的失物/招领帖子重新计算匹配并写入 post_matches"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    requested_by: Optional[int] = Field(default=None, foreign_key="users.id")
+
+    status: str = Field(default=MatchJobStatus.PENDING, max_length=20)
+    workers: int = Field(default=1)  # 进程池大小
+    limit_per_post: int = Field(default=10)  # 每个帖子保存的匹配数
+    time_range_days: int = Field(default=7)  # 时间得分的范围（天）
+
+    # 进度
+    total_posts: int = Field(default=0)
+    processed_posts: int = Field(default=0)
+    written_matches: int = Field(default=0)
+    last_error: Optional[str] = Field(default=None, max_length=500)
+
+    # 时间戳
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = Field(default=None)
+    updated_at: Optional[datetime] = Field(default=None)  # 心跳：每写入一批结果更新一次
+    finished_at: Optional[datetime] = Field(default=None)
+
+    __table_args__ = (
+        Index("ix_rematch_job_status", "status"),
+    )
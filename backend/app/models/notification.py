@@ -2,6 +2,7 @@ from sqlmodel import SQLModel, Field, Relationship, Column, JSON
 from typing import Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
+from sqlalchemy import Index
 
 class NotificationType(str, Enum):
     """通知类型枚举"""
@@ -12,6 +13,7 @@ class NotificationType(str, Enum):
     NEW_COMMENT = "new_comment"  # 新评论
     SYSTEM_ANNOUNCEMENT = "system_announcement"  # 系统公告
     MESSAGE_RECEIVED = "message_received"  # 收到私信
+    ALERT_MATCHED = "alert_matched"  # 物品提醒命中新帖子
 
 class NotificationStatus(str, Enum):
     """通知状态枚举"""
@@ -51,6 +53,10 @@ class Notification(SQLModel, table=True):
     related_claim: Optional["Claim"] = Relationship()
     related_comment: Optional["Comment"] = Relationship()
 
+    __table_args__ = (
+        Index("ix_notification_user_created_at", "user_id", "created_at", "id"),  # 游标分页
+    )
+
 class NotificationSettings(SQLModel, table=True):
     """用户通知设置模型"""
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -13,11 +13,17 @@ class Post(SQLModel, table=True):
     # 失物招领专属字段
     item_type: str = Field(default="general", max_length=20)  # lost, found, general(普通帖子)
     location: Optional[str] = Field(default=None, max_length=200)  # 丢失/拾取地点
+    location_normalized: Optional[str] = Field(default=None, max_length=200)  # 归一化后的地点（用于三元组匹配）
     item_time: Optional[datetime] = Field(default=None)  # 丢失/拾取时间
     contact_info: Optional[str] = Field(default=None, max_length=200)  # 联系方式（电话、微信等）
     images: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))  # 图片URL列表
     is_claimed: bool = Field(default=False)  # 是否已认领/归还
     
+    # 计数（随评论、认领的写操作在同一事务中增减，可由管理员接口全量重算）
+    comment_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})  # 评论数
+    claim_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})  # 认领请求数（不含已取消的）
+    pending_claim_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})  # 待处理的认领请求数
+    
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default=None)
     
@@ -36,6 +42,8 @@ class Post(SQLModel, table=True):
         Index("ix_post_item_type", "item_type"),
         Index("ix_post_is_claimed", "is_claimed"),
         Index("ix_post_category_id", "category_id"),
-        Index("ix_post_created_at", "created_at"),
+        Index("ix_post_created_at_id", "created_at", "id"),  # 游标分页 (created_at, id)
+        Index("ix_post_author_status_created_at", "author_id", "status", "created_at", "id"),
+        Index("ix_post_item_type_item_time", "item_type", "item_time"),
     )
 
@@ -0,0 +1,10 @@
+from sqlmodel import SQLModel, Field
+
+class PostCounter(SQLModel, table=True):
+    __tablename__ = "post_counters"
+    """帖子计数：每个 (状态, 物品类型, 分类, 是否认领) 组合的帖子数，发帖/编辑/删除/认领时增量维护，用于估算列表总数"""
+    status: str = Field(primary_key=True, max_length=20)
+    item_type: str = Field(primary_key=True, max_length=20)
+    category_id: int = Field(default=0, primary_key=True)  # 0 表示未分类
+    is_claimed: bool = Field(default=False, primary_key=True)
+    count: int = Field(default=0)
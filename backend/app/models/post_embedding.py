@@ -0,0 +1,15 @@
+from sqlmodel import SQLModel, Field, Column, LargeBinary
+from datetime import datetime
+from sqlalchemy import Index
+
+class PostEmbedding(SQLModel, table=True):
+    __tablename__ = "post_embeddings"
+    """帖子语义向量：字符n-gram + 同义词表的哈希向量（float16字节），供语义匹配的ANN索引使用"""
+    post_id: int = Field(foreign_key="posts.id", primary_key=True)
+    item_type: str = Field(max_length=20)  # lost / found，ANN索引按类型分开
+    vector: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)  # 各进程按该时间增量同步ANN索引
+
+    __table_args__ = (
+        Index("ix_post_embedding_updated_at", "updated_at"),
+    )
@@ -0,0 +1,12 @@
+from sqlmodel import SQLModel, Field, Column, JSON
+from typing import List, Dict
+from datetime import datetime
+
+class PostTextFeature(SQLModel, table=True):
+    __tablename__ = "post_text_features"
+    """帖子文本特征：发帖/编辑时预先计算的分词结果与词频，匹配时直接复用"""
+    post_id: int = Field(foreign_key="posts.id", primary_key=True)
+    tokens: List[str] = Field(default_factory=list, sa_column=Column(JSON))  # 标题+内容的有序token
+    term_freqs: Dict[str, int] = Field(default_factory=dict, sa_column=Column(JSON))  # token词频
+    token_count: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
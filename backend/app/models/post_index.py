@@ -0,0 +1,29 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from sqlalchemy import Index
+
+class PostTerm(SQLModel, table=True):
+    __tablename__ = "post_terms"
+    """倒排索引条目：词项 -> 开放的失物/招领帖子（posting list）"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    term: str = Field(max_length=100)  # 词项
+    post_id: int = Field(foreign_key="posts.id")
+    item_type: str = Field(max_length=20)  # lost / found，检索时按目标类型过滤
+    weight: float = Field(default=0.0)  # 归一化后的词项权重
+
+    __table_args__ = (
+        Index("ix_post_term_term_item_type_weight", "term", "item_type", "weight"),
+        Index("ix_post_term_post_id", "post_id"),
+    )
+
+class TermStat(SQLModel, table=True):
+    __tablename__ = "term_stats"
+    """语料统计：词项的文档频率（仅统计开放的失物/招领帖子）"""
+    term: str = Field(primary_key=True, max_length=100)
+    doc_freq: int = Field(default=0)
+
+class CorpusStat(SQLModel, table=True):
+    __tablename__ = "corpus_stats"
+    """语料统计：全局计数（如 doc_count）"""
+    key: str = Field(primary_key=True, max_length=50)
+    value: int = Field(default=0)
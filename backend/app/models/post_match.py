@@ -0,0 +1,31 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import Index
+
+class PostMatch(SQLModel, table=True):
+    __tablename__ = "post_matches"
+    """预先计算的匹配结果：帖子 -> 候选帖子，含各分项得分（均为0-100）与综合得分"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    post_id: int = Field(foreign_key="posts.id")
+    candidate_id: int = Field(foreign_key="posts.id", index=True)  # 候选帖子变化时反查受影响的结果
+    text_score: float = Field(default=0)
+    category_score: float = Field(default=0)
+    location_score: float = Field(default=0)
+    time_score: float = Field(default=0)
+    image_score: Optional[float] = Field(default=None)  # 任一方没有图片时为空
+    score: float = Field(default=0)  # 加权综合得分
+    job_id: Optional[int] = Field(default=None, foreign_key="rematch_jobs.id")  # 计算该结果的重新匹配任务
+    computed_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_post_match_post_id_score", "post_id", "score"),
+    )
+
+class PostMatchState(SQLModel, table=True):
+    __tablename__ = "post_match_states"
+    """帖子匹配结果的物化状态：存在且未过期时 post_matches 中该帖子的结果可直接返回（没有匹配时也记录）"""
+    post_id: int = Field(foreign_key="posts.id", primary_key=True)
+    candidate_limit: int  # 计算时保留的候选数
+    time_range_days: int
+    computed_at: datetime = Field(default_factory=datetime.utcnow)
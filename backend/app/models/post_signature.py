@@ -0,0 +1,30 @@
+from sqlmodel import SQLModel, Field, Column, JSON
+from typing import Optional, List
+from datetime import datetime
+from sqlalchemy import Index
+
+class PostSignature(SQLModel, table=True):
+    __tablename__ = "post_signatures"
+    """帖子MinHash签名，用于近似重复检测"""
+    post_id: int = Field(foreign_key="posts.id", primary_key=True)
+    signature: List[int] = Field(default_factory=list, sa_column=Column(JSON))  # MinHash签名
+    duplicate_of_id: Optional[int] = Field(default=None, foreign_key="posts.id")  # 被判定为哪个帖子的重复
+    similarity: Optional[float] = Field(default=None)  # 与 duplicate_of_id 帖子的估计Jaccard相似度
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_post_signature_duplicate_of_id", "duplicate_of_id"),
+    )
+
+class LshBucket(SQLModel, table=True):
+    __tablename__ = "lsh_buckets"
+    """LSH分桶索引：签名按band切分后的桶 -> 帖子"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    band: int  # band序号
+    bucket: int  # band内签名的哈希值
+    post_id: int = Field(foreign_key="posts.id")
+
+    __table_args__ = (
+        Index("ix_lsh_bucket_band_bucket", "band", "bucket"),
+        Index("ix_lsh_bucket_post_id", "post_id"),
+    )
@@ -1,6 +1,7 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import Index
 
 class Rating(SQLModel, table=True):
     """评价模型 - 认领成功后的双方评价"""
@@ -30,3 +31,7 @@ class Rating(SQLModel, table=True):
         back_populates="ratings_received",
         sa_relationship_kwargs={"foreign_keys": "[Rating.ratee_id]"}
     )
+
+    __table_args__ = (
+        Index("ix_rating_ratee_created_at", "ratee_id", "created_at", "id"),  # 游标分页
+    )
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+class AlertBase(BaseModel):
+    keywords: str = Field(min_length=1, max_length=200)
+    item_type: str = Field(default="found", pattern="^(lost|found)$")  # 要提醒的帖子类型
+    category_id: Optional[int] = None
+    location: Optional[str] = Field(default=None, max_length=200)
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+class AlertCreate(AlertBase):
+    pass
+
+class AlertRead(AlertBase):
+    id: int
+    user_id: int
+    is_active: bool
+    created_at: datetime
+    last_notified_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
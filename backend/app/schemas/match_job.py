@@ -0,0 +1,46 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+class MatchJobRead(BaseModel):
+    id: int
+    post_id: int
+    status: str
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    run_after: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class RematchRequest(BaseModel):
+    workers: Optional[int] = Field(default=None, ge=1, le=32)  # 默认使用全部CPU核
+    limit_per_post: int = Field(default=10, ge=1, le=50)
+    time_range_days: int = Field(default=7, ge=1, le=30)
+
+class RematchJobRead(BaseModel):
+    id: int
+    status: str
+    workers: int
+    limit_per_post: int
+    time_range_days: int
+    total_posts: int
+    processed_posts: int
+    written_matches: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # 由 BulkRematchService.progress 计算
+    percent: float = 0.0
+    elapsed_seconds: float = 0.0
+    throughput_posts_per_second: float = 0.0
+    eta_seconds: Optional[float] = None
+
+    class Config:
+        from_attributes = True
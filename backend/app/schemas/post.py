@@ -22,6 +22,9 @@ class PostRead(PostBase):
     status: str
     images: Optional[List[str]] = None
     is_claimed: bool
+    comment_count: int = 0
+    claim_count: int = 0
+    pending_claim_count: int = 0
     created_at: datetime
     updated_at: Optional[datetime]
     author_id: int
@@ -32,6 +35,25 @@ class PostRead(PostBase):
     class Config:
         from_attributes = True
 
+class PostSummary(BaseModel):
+    """列表精简视图（fields=summary）：首张图片作缩略图，评论、认领只给数量"""
+    id: int
+    title: str
+    item_type: str
+    status: str
+    is_claimed: bool
+    location: Optional[str] = None
+    item_time: Optional[datetime] = None
+    category_id: Optional[int] = None
+    author_id: int
+    created_at: datetime
+    thumbnail: Optional[str] = None
+    comment_count: int = 0
+    claim_count: int = 0
+    
+    class Config:
+        from_attributes = True
+
 class PostUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
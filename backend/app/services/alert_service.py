@@ -0,0 +1,150 @@
+"""
+物品提醒服务（percolator）
+用户保存的提醒按条件词项（关键词分词结果，以及 cat:<分类id> 伪词项）写入反向索引 alert_terms。
+新帖子只需用自身的词项查一次反向索引：命中全部条件词项的提醒才会继续检查地点和时间窗口，
+开销与可能匹配的提醒数量成正比，而不是与提醒总数或帖子总数成正比
+"""
+from typing import List, Set
+from collections import Counter
+from datetime import datetime
+
+from sqlmodel import Session, select, delete, func
+
+from app.models.post import Post
+from app.models.alert import SavedAlert, AlertTerm, AlertMatch
+from app.models.notification import Notification
+from app.services.text_similarity import TextSimilarityService
+from app.services.post_features import PostFeatureService
+from app.services.location_index import LocationIndexService, LOCATION_MATCH_THRESHOLD
+from app.services.notification_service import NotificationService
+
+MAX_ACTIVE_ALERTS_PER_USER = 20
+
+
+class AlertService:
+    """提醒的反向索引维护与新帖子匹配"""
+
+    @staticmethod
+    def category_term(category_id: int) -> str:
+        return f"cat:{category_id}"
+
+    @staticmethod
+    def keyword_terms(keywords: str) -> Set[str]:
+        """关键词分词（去停用词），与帖子文本特征使用相同的分词器"""
+        return {
+            token for token in TextSimilarityService.simple_tokenize(keywords)
+            if token not in TextSimilarityService.STOPWORDS
+        }
+
+    @staticmethod
+    def alert_terms(alert: SavedAlert) -> Set[str]:
+        terms = AlertService.keyword_terms(alert.keywords)
+        if alert.category_id:
+            terms.add(AlertService.category_term(alert.category_id))
+        return terms
+
+    @staticmethod
+    def post_terms(session: Session, post: Post) -> Set[str]:
+        terms = set(PostFeatureService.get(session, post).tokens)
+        if post.category_id:
+            terms.add(AlertService.category_term(post.category_id))
+        return terms
+
+    @staticmethod
+    def count_active_alerts(session: Session, user_id: int) -> int:
+        return session.exec(
+            select(func.count()).select_from(SavedAlert).where(
+                SavedAlert.user_id == user_id, SavedAlert.is_active == True
+            )
+        ).one()
+
+    @staticmethod
+    def index_alert(session: Session, alert: SavedAlert):
+        """写入提醒的反向索引（不提交事务），提醒需已flush获得id"""
+        terms = AlertService.alert_terms(alert)
+        alert.term_count = len(terms)
+        session.add(alert)
+        session.exec(delete(AlertTerm).where(AlertTerm.alert_id == alert.id))
+        session.add_all([
+            AlertTerm(term=term, alert_id=alert.id, item_type=alert.item_type)
+            for term in terms
+        ])
+
+    @staticmethod
+    def deactivate(session: Session, alert: SavedAlert):
+        """停用提醒并移出反向索引（不提交事务）"""
+        alert.is_active = False
+        session.add(alert)
+        session.exec(delete(AlertTerm).where(AlertTerm.alert_id == alert.id))
+
+    @staticmethod
+    def percolate(session: Session, post: Post) -> List[SavedAlert]:
+        """返回新帖子命中的提醒（已排除帖子作者自己的提醒和已通知过的提醒）"""
+        if post.item_type not in ("lost", "found"):
+            return []
+        terms = AlertService.post_terms(session, post)
+        if not terms:
+            return []
+
+        hit_counts = Counter(dict(session.exec(
+            select(AlertTerm.alert_id, func.count())
+            .where(AlertTerm.term.in_(list(terms)), AlertTerm.item_type == post.item_type)
+            .group_by(AlertTerm.alert_id)
+        ).all()))
+        if not hit_counts:
+            return []
+
+        candidates = session.exec(
+            select(SavedAlert).where(
+                SavedAlert.id.in_(list(hit_counts.keys())),
+                SavedAlert.is_active == True,
+                SavedAlert.user_id != post.author_id
+            )
+        ).all()
+
+        already_matched = set(session.exec(
+            select(AlertMatch.alert_id).where(
+                AlertMatch.post_id == post.id,
+                AlertMatch.alert_id.in_([alert.id for alert in candidates])
+            )
+        ).all()) if candidates else set()
+
+        post_time = post.item_time or post.created_at
+        matched = []
+        for alert in candidates:
+            # 必须命中全部条件词项
+            if alert.id in already_matched or hit_counts[alert.id] < alert.term_count:
+                continue
+            if alert.start_time and post_time < alert.start_time:
+                continue
+            if alert.end_time and post_time > alert.end_time:
+                continue
+            if alert.location and (
+                LocationIndexService.similarity(alert.location, post.location_normalized) < LOCATION_MATCH_THRESHOLD
+            ):
+                continue
+            matched.append(alert)
+        return matched
+
+    @staticmethod
+    def notify_matches(session: Session, post: Post) -> List[Notification]:
+        """对新帖子执行一次percolate并通知命中提醒的用户，返回创建的通知（实时推送由调用方发送）"""
+        notifications = []
+        for alert in AlertService.percolate(session, post):
+            alert.last_notified_at = datetime.utcnow()
+            session.add(alert)
+            session.add(AlertMatch(alert_id=alert.id, post_id=post.id))
+            # create_notification 会提交事务，命中记录与通知一起落库
+            notifications.append(NotificationService.create_alert_match_notification(session, alert, post))
+        return notifications
+
+    @staticmethod
+    def matched_posts(session: Session, alert: SavedAlert, limit: int = 50) -> List[Post]:
+        """提醒历史命中的帖子（最新在前）"""
+        return list(session.exec(
+            select(Post)
+            .join(AlertMatch, AlertMatch.post_id == Post.id)
+            .where(AlertMatch.alert_id == alert.id, Post.status.in_(["published", "active"]))
+            .order_by(AlertMatch.created_at.desc())
+            .limit(limit)
+        ).all())
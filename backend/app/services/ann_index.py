@@ -0,0 +1,329 @@
+"""
+语义向量的近似最近邻（ANN）索引
+IvfIndex：倒排文件索引（IVF），球面k-means把向量分到 nlist 个簇，查询只扫描与查询向量最接近的 nprobe 个簇，
+向量以float16存放；纯NumPy实现，不依赖网络或GPU。
+SemanticIndex：按 lost / found 各一个IvfIndex，从 post_embeddings 表增量同步（按 updated_at 水位），
+只收录开放、未认领的帖子（帖子关闭、认领或删除后从簇中移除），规模比上次训练时翻倍后重新训练。
+持久化到 SEMANTIC_INDEX_PATH 只在启动和后台维护任务中进行（maintenance_loop），查询路径不做磁盘写入，
+重启后只需同步水位之后的变化
+"""
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import select
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.database import engine
+from app.models.post import Post
+from app.models.post_embedding import PostEmbedding
+from app.services.embedding import DIM, EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+ITEM_TYPES = ("lost", "found")
+MIN_TRAIN_SIZE = 256  # 少于该数量时只用一个簇（即精确检索）
+MAX_LISTS = 1024
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE = 20000  # 训练簇中心时最多使用的样本数
+SYNC_INTERVAL_SECONDS = 1.0  # 从 post_embeddings 拉取增量的最小间隔
+SYNC_OVERLAP = timedelta(seconds=5)  # 水位回退量，覆盖其他进程晚提交但时间戳较早的写入
+MAINTENANCE_INTERVAL_SECONDS = 30.0  # 后台维护任务同步并写回磁盘的间隔
+OPEN_STATUSES = ("published", "active")
+
+
+class IvfIndex:
+    """单个IVF索引：centroids 为簇中心，每个簇保存 (post_id数组, float16向量矩阵)"""
+
+    def __init__(self, centroids: Optional[np.ndarray] = None):
+        self.centroids = centroids if centroids is not None else np.zeros((1, DIM), dtype=np.float32)
+        self.ids: List[np.ndarray] = [np.zeros(0, dtype=np.int64) for _ in range(len(self.centroids))]
+        self.vectors: List[np.ndarray] = [np.zeros((0, DIM), dtype=np.float16) for _ in range(len(self.centroids))]
+        self.assignment: Dict[int, int] = {}  # post_id -> 簇序号
+        self.trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self.assignment)
+
+    @staticmethod
+    def train(post_ids: np.ndarray, vectors: np.ndarray, seed: int = 42) -> "IvfIndex":
+        """球面k-means训练簇中心（簇数约为 sqrt(N)）并放入全部向量"""
+        count = len(post_ids)
+        nlist = 1 if count < MIN_TRAIN_SIZE else min(MAX_LISTS, int(np.sqrt(count)))
+        rng = np.random.RandomState(seed)
+
+        if nlist == 1:
+            centroids = np.zeros((1, DIM), dtype=np.float32)
+        else:
+            sample = vectors[rng.choice(count, min(count, KMEANS_SAMPLE), replace=False)]
+            centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+            for _ in range(KMEANS_ITERATIONS):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                for list_no in range(nlist):
+                    members = sample[labels == list_no]
+                    if len(members):
+                        centroids[list_no] = members.sum(axis=0)
+                centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        index = IvfIndex(centroids)
+        index.add(post_ids, vectors)
+        index.trained_size = count
+        return index
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if len(self.centroids) == 1:
+            return np.zeros(len(vectors), dtype=np.int64)
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def add(self, post_ids: np.ndarray, vectors: np.ndarray):
+        """加入或替换向量"""
+        if len(post_ids) == 0:
+            return
+        self.remove([post_id for post_id in post_ids.tolist() if post_id in self.assignment])
+        labels = self._assign(vectors)
+        for list_no in np.unique(labels):
+            mask = labels == list_no
+            self.ids[list_no] = np.concatenate([self.ids[list_no], post_ids[mask]])
+            self.vectors[list_no] = np.concatenate([self.vectors[list_no], vectors[mask].astype(np.float16)])
+        self.assignment.update(zip(post_ids.tolist(), labels.tolist()))
+
+    def remove(self, post_ids: List[int]):
+        by_list: Dict[int, List[int]] = {}
+        for post_id in post_ids:
+            list_no = self.assignment.pop(post_id, None)
+            if list_no is not None:
+                by_list.setdefault(list_no, []).append(post_id)
+        for list_no, removed in by_list.items():
+            keep = ~np.isin(self.ids[list_no], removed)
+            self.ids[list_no] = self.ids[list_no][keep]
+            self.vectors[list_no] = self.vectors[list_no][keep]
+
+    def search(self, query: np.ndarray, k: int, nprobe: int) -> List[Tuple[int, float]]:
+        """返回余弦相似度最高的k个 [(post_id, 相似度)]（近似：只扫描最近的nprobe个簇）"""
+        if not self.assignment:
+            return []
+        probe = np.argsort(-(self.centroids @ query))[:nprobe]
+        ids = np.concatenate([self.ids[list_no] for list_no in probe])
+        if len(ids) == 0:
+            return []
+        scores = np.concatenate([self.vectors[list_no] for list_no in probe]).astype(np.float32) @ query
+        top = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        """序列化为 np.savez 的数组"""
+        return {
+            f"{prefix}_centroids": self.centroids,
+            f"{prefix}_ids": np.concatenate(self.ids),
+            f"{prefix}_vectors": np.concatenate(self.vectors),
+            f"{prefix}_sizes": np.array([len(ids) for ids in self.ids], dtype=np.int64),
+            f"{prefix}_trained_size": np.array(self.trained_size, dtype=np.int64),
+        }
+
+    @staticmethod
+    def from_arrays(data, prefix: str) -> "IvfIndex":
+        index = IvfIndex(data[f"{prefix}_centroids"])
+        offsets = np.concatenate([[0], np.cumsum(data[f"{prefix}_sizes"])])
+        all_ids, all_vectors = data[f"{prefix}_ids"], data[f"{prefix}_vectors"]
+        for list_no in range(len(index.centroids)):
+            start, end = offsets[list_no], offsets[list_no + 1]
+            index.ids[list_no] = all_ids[start:end].copy()
+            index.vectors[list_no] = all_vectors[start:end].copy()
+            index.assignment.update(dict.fromkeys(index.ids[list_no].tolist(), list_no))
+        index.trained_size = int(data[f"{prefix}_trained_size"])
+        return index
+
+
+class SemanticIndex:
+    """lost / found 两个IVF索引，与 post_embeddings 表增量同步并持久化"""
+
+    def __init__(self, path: str = "", nprobe: int = 16):
+        self.path = path
+        self.nprobe = nprobe
+        self.indexes: Dict[str, IvfIndex] = {}
+        self.watermark: Optional[datetime] = None  # 已同步的 post_embeddings.updated_at
+        self._last_sync = 0.0
+        self._changes_since_save = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # 只串行化磁盘写入，不阻塞查询
+        self._loaded = False
+
+    def _load(self):
+        self._loaded = True
+        if not (self.path and os.path.exists(self.path)):
+            return
+        try:
+            with np.load(self.path) as data:
+                self.indexes = {item_type: IvfIndex.from_arrays(data, item_type) for item_type in ITEM_TYPES}
+                self.watermark = datetime.fromisoformat(str(data["watermark"])) if "watermark" in data else None
+            logger.info(f"[SEMANTIC] Loaded ANN index from {self.path} ({self.size()} vectors)")
+        except Exception:
+            logger.exception(f"[SEMANTIC] Failed to load ANN index from {self.path}, rebuilding")
+            self.indexes, self.watermark = {}, None
+
+    def _snapshot(self) -> Optional[Dict[str, np.ndarray]]:
+        """复制出待写盘的数组并清零变化计数（需持有 _lock）"""
+        if not self.path or not self.indexes:
+            return None
+        arrays = {}
+        for item_type, index in self.indexes.items():
+            arrays.update(index.arrays(item_type))
+        if self.watermark is not None:
+            arrays["watermark"] = np.array(self.watermark.isoformat())
+        self._changes_since_save = 0
+        return arrays
+
+    def _write(self, arrays: Optional[Dict[str, np.ndarray]]):
+        if arrays is None:
+            return
+        with self._save_lock:
+            temp_path = f"{self.path}.tmp.npz"
+            np.savez(temp_path, **arrays)
+            os.replace(temp_path, self.path)
+
+    def size(self) -> int:
+        return sum(len(index) for index in self.indexes.values())
+
+    def rebuild(self, session: Session):
+        """用 post_embeddings 全量重新训练并保存"""
+        with self._lock:
+            self._loaded = True
+            self.watermark = None
+            self.indexes = {}
+            self._sync(session, force_train=True)
+            arrays = self._snapshot()
+        self._write(arrays)
+
+    def maintain(self, session: Session) -> bool:
+        """
+        启动时和后台维护任务调用：加载、同步增量，有变化时写回磁盘，返回是否写盘。
+        锁内只复制数组，写文件在锁外进行，不阻塞并发查询
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            self._sync(session)
+            arrays = self._snapshot() if self._changes_since_save else None
+        self._write(arrays)
+        return arrays is not None
+
+    def _sync(self, session: Session, force_train: bool = False):
+        statement = (
+            select(
+                PostEmbedding.post_id, PostEmbedding.item_type, PostEmbedding.vector, PostEmbedding.updated_at,
+                Post.status, Post.is_claimed
+            )
+            .outerjoin(Post, Post.id == PostEmbedding.post_id)
+        )
+        if self.watermark is not None and not force_train:
+            statement = statement.where(PostEmbedding.updated_at >= self.watermark - SYNC_OVERLAP)
+        rows = session.exec(statement).all()
+        self._last_sync = time.monotonic()
+        if not rows and self.indexes:
+            return
+
+        # 已关闭、已认领或已删除的帖子从所有簇中移除，索引只保留可匹配的帖子
+        closed_ids = [row[0] for row in rows if row[4] not in OPEN_STATUSES or row[5]]
+        for index in self.indexes.values():
+            index.remove(closed_ids)
+        open_rows = [row for row in rows if row[4] in OPEN_STATUSES and not row[5]]
+
+        for item_type in ITEM_TYPES:
+            typed = [row for row in open_rows if row[1] == item_type]
+            post_ids = np.array([row[0] for row in typed], dtype=np.int64)
+            vectors = np.array(
+                [EmbeddingService.from_bytes(row[2]) for row in typed], dtype=np.float32
+            ).reshape(-1, DIM)
+            # 类型变化（极少见）时从另一个索引移除
+            for other in ITEM_TYPES:
+                if other != item_type and other in self.indexes:
+                    self.indexes[other].remove(post_ids.tolist())
+
+            index = self.indexes.get(item_type)
+            if index is None or force_train:
+                self.indexes[item_type] = IvfIndex.train(post_ids, vectors)
+                continue
+            index.add(post_ids, vectors)
+            if len(index) >= max(2 * index.trained_size, MIN_TRAIN_SIZE):
+                self.indexes[item_type] = self._retrain(index)
+
+        # 水位回退区间内重复读到的行已在内存中生效，不计为待写盘的变化
+        previous = self.watermark
+        self._changes_since_save += sum(1 for row in rows if previous is None or row[3] > previous)
+        if rows:
+            self.watermark = max(row[3] for row in rows)
+
+    @staticmethod
+    def _retrain(index: IvfIndex) -> IvfIndex:
+        post_ids = np.concatenate(index.ids)
+        vectors = np.concatenate(index.vectors).astype(np.float32)
+        return IvfIndex.train(post_ids, vectors)
+
+    def search(self, session: Session, query: np.ndarray, item_type: str, k: int) -> List[Tuple[int, float]]:
+        """
+        返回 item_type 帖子中与查询向量最相似的k个 [(post_id, 相似度)]。
+        只在内存中同步增量、不写磁盘；距上次同步不足 SYNC_INTERVAL_SECONDS 时结果可能包含刚关闭的帖子
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if not self.indexes or time.monotonic() - self._last_sync >= SYNC_INTERVAL_SECONDS:
+                self._sync(session)
+            index = self.indexes.get(item_type)
+            if index is None:
+                return []
+            return index.search(query, k, self.nprobe)
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path or None,
+            "nprobe": self.nprobe,
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "indexes": {
+                item_type: {"vectors": len(index), "lists": len(index.centroids), "trained_size": index.trained_size}
+                for item_type, index in self.indexes.items()
+            },
+        }
+
+
+_semantic_index: Optional[SemanticIndex] = None
+_semantic_index_lock = threading.Lock()
+
+
+def get_semantic_index() -> SemanticIndex:
+    """按配置创建的全局语义索引（SEMANTIC_INDEX_PATH 为相对路径时相对 backend 目录）"""
+    global _semantic_index
+    if _semantic_index is None:
+        with _semantic_index_lock:
+            if _semantic_index is None:
+                path = settings.SEMANTIC_INDEX_PATH
+                if path and not os.path.isabs(path):
+                    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+                    path = os.path.join(base_dir, path)
+                _semantic_index = SemanticIndex(path=path, nprobe=settings.SEMANTIC_NPROBE)
+    return _semantic_index
+
+
+async def maintenance_loop(interval: float = MAINTENANCE_INTERVAL_SECONDS):
+    """后台任务：定期同步语义索引并在有变化时写回磁盘（在线程中执行，不阻塞事件循环）"""
+    index = get_semantic_index()
+
+    def maintain() -> bool:
+        with Session(engine) as session:
+            return index.maintain(session)
+
+    while True:
+        try:
+            await asyncio.to_thread(maintain)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("[SEMANTIC] Index maintenance failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,446 @@
+"""
+全量重新匹配（管理员在调整权重或分词器后触发）
+协调线程先把全部开放的失物/招领帖子读成一份只读的语料快照（TF-IDF权重、按当前IDF重算的查询向量、
+地点三元组、图片哈希、分类、时间、重复簇，均为NumPy/SciPy数组或稀疏矩阵），写入临时文件；进程池中每个worker启动时加载一次快照，
+按分区对帖子批量打分（稀疏矩阵乘法一次算出一批帖子对全部候选的文本与地点相似度），
+结果交回协调线程统一写入 post_matches，并在 rematch_jobs 中记录进度。
+打分规则与 MatchRankingService 一致：综合得分 = 文本50% + 分类20% + 地点15% + 时间15%
+（双方都有图片时再按85% / 15%混入图片相似度），同一重复簇只保留最高分的候选
+"""
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import logging
+import multiprocessing
+import os
+import pickle
+import tempfile
+import threading
+
+import numpy as np
+from scipy import sparse
+from sqlmodel import Session, select, delete, and_, or_
+
+from app.database import engine
+from app.models.post import Post
+from app.models.post_index import PostTerm, TermStat
+from app.models.post_feature import PostTextFeature
+from app.models.location_index import LocationTrigram
+from app.models.post_signature import PostSignature
+from app.models.image_hash import PostImageHash
+from app.models.post_match import PostMatch, PostMatchState
+from app.models.match_job import RematchJob, MatchJobStatus
+from app.services.post_index import PostIndexService, OPEN_STATUSES, MATCHABLE_TYPES
+from app.services.corpus_stats import CorpusStatsService
+from app.services.text_similarity import TextSimilarityService
+from app.services.image_hash import IMAGE_MATCH_RADIUS
+from app.services.match_ranking import (
+    TEXT_WEIGHT, CATEGORY_WEIGHT, LOCATION_WEIGHT, TIME_WEIGHT, IMAGE_WEIGHT, MIN_MATCH_SCORE
+)
+
+logger = logging.getLogger(__name__)
+
+PARTITION_SIZE = 200  # 每个进程池任务处理的帖子数（也是一次写库的批量）
+CHUNK_CELLS = 4_000_000  # 一次稠密打分的 帖子数×候选数 上限，控制worker内存
+HEARTBEAT_STALE = timedelta(minutes=10)  # 运行中任务超过该时长没有进度视为已中断
+_EPOCH = datetime(1970, 1, 1)
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+class CorpusSnapshot:
+    """开放的失物/招领帖子的只读打分快照（行号即帖子在快照中的序号）"""
+
+    def __init__(self, post_ids, is_lost, categories, item_times, canonical, terms, queries, trigrams, image_rows, image_hashes):
+        self.post_ids = post_ids  # int64[n]
+        self.is_lost = is_lost  # bool[n]
+        self.categories = categories  # int64[n]，无分类为0
+        self.item_times = item_times  # float64[n]，item_time的epoch秒，无时间为NaN
+        self.canonical = canonical  # int64[n]，重复簇id
+        self.terms = terms  # csr[n, 词项数]，索引中L2归一化的TF-IDF权重（候选侧）
+        self.queries = queries  # csr[n, 词项数]，按当前IDF计算的查询向量（与 PostIndexService.query_weights 一致）
+        self.trigrams = trigrams  # csr[n, 三元组数]，0/1
+        self.trigram_counts = np.asarray(trigrams.sum(axis=1)).ravel()
+        self.image_rows = image_rows  # int64[m]，图片哈希所属帖子的行号（升序）
+        self.image_hashes = image_hashes  # uint64[m]，dHash
+
+    def __len__(self) -> int:
+        return len(self.post_ids)
+
+    @staticmethod
+    def build(session: Session) -> "CorpusSnapshot":
+        rows = session.exec(
+            select(Post.id, Post.item_type, Post.category_id, Post.item_time).where(
+                Post.status.in_(OPEN_STATUSES),
+                Post.item_type.in_(MATCHABLE_TYPES),
+                Post.is_claimed == False
+            ).order_by(Post.id)
+        ).all()
+        post_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        position = {post_id: i for i, post_id in enumerate(post_ids.tolist())}
+        is_lost = np.array([row[1] == "lost" for row in rows], dtype=bool)
+        categories = np.array([row[2] or 0 for row in rows], dtype=np.int64)
+        item_times = np.array(
+            [(row[3] - _EPOCH).total_seconds() if row[3] else np.nan for row in rows], dtype=np.float64
+        )
+
+        canonical = post_ids.copy()
+        for post_id, duplicate_of_id in session.exec(
+            select(PostSignature.post_id, PostSignature.duplicate_of_id)
+            .where(PostSignature.duplicate_of_id.isnot(None))
+        ):
+            if post_id in position:
+                canonical[position[post_id]] = duplicate_of_id
+
+        columns: Dict[str, int] = {}
+        stored = {}
+        terms = CorpusSnapshot._sparse(
+            session.exec(select(PostTerm.post_id, PostTerm.term, PostTerm.weight)), position, columns, stored
+        )
+        queries = CorpusSnapshot._sparse(
+            CorpusSnapshot._query_entries(session, position, stored), position, columns, extend=False
+        )
+        trigrams = CorpusSnapshot._sparse(
+            ((post_id, trigram, 1.0) for post_id, trigram in session.exec(
+                select(LocationTrigram.post_id, LocationTrigram.trigram)
+            )),
+            position
+        )
+        image_entries = sorted(
+            (position[post_id], value)
+            for post_id, value in session.exec(select(PostImageHash.post_id, PostImageHash.dhash))
+            if post_id in position
+        )
+        image_rows = np.array([row for row, _ in image_entries], dtype=np.int64)
+        image_hashes = np.array([value for _, value in image_entries], dtype=np.int64).view(np.uint64)
+        return CorpusSnapshot(
+            post_ids, is_lost, categories, item_times, canonical, terms, queries, trigrams, image_rows, image_hashes
+        )
+
+    @staticmethod
+    def _query_entries(session: Session, position: Dict[int, int], stored: Dict[int, List[tuple]]):
+        """查询向量：用缓存的分词结果与当前IDF重算；没有分词缓存的帖子沿用索引中的权重"""
+        doc_count = CorpusStatsService.get_doc_count(session)
+        doc_freqs = dict(session.exec(select(TermStat.term, TermStat.doc_freq)).all())
+        seen = set()
+        for post_id, tokens in session.exec(select(PostTextFeature.post_id, PostTextFeature.tokens)):
+            if post_id not in position:
+                continue
+            seen.add(post_id)
+            term_freqs = TextSimilarityService.term_frequencies_from_tokens(tokens or [])
+            idf = {
+                term: CorpusStatsService.compute_idf(doc_count, doc_freqs.get(term, 0))
+                for term in term_freqs
+            }
+            for term, weight in PostIndexService.build_weights(term_freqs, idf).items():
+                yield post_id, term, weight
+        for post_id, entries in stored.items():
+            if post_id not in seen:
+                for term, weight in entries:
+                    yield post_id, term, weight
+
+    @staticmethod
+    def _sparse(
+        entries,
+        position: Dict[int, int],
+        columns: Optional[Dict[str, int]] = None,
+        collect: Optional[Dict[int, List[tuple]]] = None,
+        extend: bool = True
+    ) -> sparse.csr_matrix:
+        """
+        (post_id, 特征, 值) -> 行为快照序号的CSR矩阵（不在快照中的帖子忽略）
+        columns 为特征到列号的映射，可在多个矩阵间共用；extend=False 时忽略映射中没有的特征；
+        collect 不为None时顺带按帖子收集 (特征, 值)
+        """
+        columns = {} if columns is None else columns
+        row_idx, col_idx, values = [], [], []
+        for post_id, feature, value in entries:
+            row = position.get(post_id)
+            if row is None:
+                continue
+            if collect is not None:
+                collect.setdefault(post_id, []).append((feature, value))
+            column = columns.setdefault(feature, len(columns)) if extend else columns.get(feature)
+            if column is None:
+                continue
+            row_idx.append(row)
+            col_idx.append(column)
+            values.append(value)
+        return sparse.csr_matrix(
+            (np.array(values, dtype=np.float64), (row_idx, col_idx)),
+            shape=(len(position), max(1, len(columns)))
+        )
+
+    @staticmethod
+    def partition_rows(count: int, size: int = PARTITION_SIZE) -> List[np.ndarray]:
+        """把快照行号切成进程池任务"""
+        rows = np.arange(count)
+        return [rows[start:start + size] for start in range(0, count, size)]
+
+    def save(self, directory: str) -> str:
+        path = os.path.join(directory, "corpus_snapshot.pkl")
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    def score_rows(self, rows: np.ndarray, limit: int, time_range_days: int) -> List[Tuple[int, List[tuple]]]:
+        """
+        为快照中的一批帖子计算匹配，返回 [(post_id, [(candidate_id, 文本, 分类, 地点, 时间, 图片, 综合), ...])]
+        各分项0-100（任一方没有图片时图片为None），候选按综合得分降序
+        """
+        results = []
+        for query_lost in (True, False):
+            query_rows = rows[self.is_lost[rows] == query_lost]
+            candidate_rows = np.nonzero(self.is_lost != query_lost)[0]
+            if len(query_rows) == 0:
+                continue
+            if len(candidate_rows) == 0:
+                results.extend((int(self.post_ids[row]), []) for row in query_rows)
+                continue
+
+            candidate_terms = self.terms[candidate_rows].T.tocsc()
+            candidate_trigrams = self.trigrams[candidate_rows].T.tocsc()
+            chunk = max(1, CHUNK_CELLS // len(candidate_rows))
+            for start in range(0, len(query_rows), chunk):
+                chunk_rows = query_rows[start:start + chunk]
+                components = self._score_chunk(
+                    chunk_rows, candidate_rows, candidate_terms, candidate_trigrams, query_lost, time_range_days
+                )
+                for i, row in enumerate(chunk_rows):
+                    results.append((
+                        int(self.post_ids[row]),
+                        self._top_candidates(candidate_rows, [c[i] for c in components], limit)
+                    ))
+        return results
+
+    def _score_chunk(self, chunk_rows, candidate_rows, candidate_terms, candidate_trigrams, query_lost, time_range_days):
+        text = (self.queries[chunk_rows] @ candidate_terms).toarray() * 100
+
+        query_categories = self.categories[chunk_rows][:, None]
+        category = ((query_categories == self.categories[candidate_rows][None, :]) & (query_categories > 0)) * 100.0
+
+        intersection = (self.trigrams[chunk_rows] @ candidate_trigrams).toarray()
+        union = self.trigram_counts[chunk_rows][:, None] + self.trigram_counts[candidate_rows][None, :] - intersection
+        with np.errstate(divide="ignore", invalid="ignore"):
+            location = np.where(
+                (self.trigram_counts[chunk_rows][:, None] > 0) & (union > 0), intersection / union, 0.0
+            ) * 100
+
+        # 与 MatchRankingService.time_score 相同：timedelta.days 向下取整，找到时间须不早于丢失时间
+        query_times = self.item_times[chunk_rows][:, None]
+        candidate_times = self.item_times[candidate_rows][None, :]
+        with np.errstate(invalid="ignore"):
+            delta = candidate_times - query_times
+            days = np.abs(np.floor(delta / 86400))
+            valid = (delta >= 0) if query_lost else (delta <= 0)
+            time_score = np.where(valid, np.maximum(0.0, (1 - days / time_range_days) * 100), 0.0)
+        time_score = np.nan_to_num(time_score, nan=0.0)
+
+        final = text * TEXT_WEIGHT + category * CATEGORY_WEIGHT + location * LOCATION_WEIGHT + time_score * TIME_WEIGHT
+        image = self._image_scores(chunk_rows, candidate_rows)
+        final = np.where(np.isnan(image), final, final * (1 - IMAGE_WEIGHT) + np.nan_to_num(image) * IMAGE_WEIGHT)
+        return text, category, location, time_score, image, final
+
+    def _image_scores(self, chunk_rows, candidate_rows) -> np.ndarray:
+        """图片分项（任意两张图片间的最大相似度），任一方没有图片为NaN；与 ImageHashService.similarity 一致"""
+        image = np.full((len(chunk_rows), len(candidate_rows)), np.nan)
+        query_mask = np.isin(self.image_rows, chunk_rows)
+        candidate_mask = np.isin(self.image_rows, candidate_rows)
+        if not (query_mask.any() and candidate_mask.any()):
+            return image
+
+        xor = self.image_hashes[query_mask][:, None] ^ self.image_hashes[candidate_mask][None, :]
+        distances = _POPCOUNT[xor.view(np.uint8)].reshape(*xor.shape, 8).sum(axis=-1)
+        similarity = np.where(
+            distances <= IMAGE_MATCH_RADIUS, 1 - (distances / (IMAGE_MATCH_RADIUS + 1)) ** 2, 0.0
+        ) * 100
+
+        best = np.full(image.shape, -1.0)
+        query_positions = np.searchsorted(chunk_rows, self.image_rows[query_mask])
+        candidate_positions = np.searchsorted(candidate_rows, self.image_rows[candidate_mask])
+        np.maximum.at(best, (query_positions[:, None], candidate_positions[None, :]), similarity)
+        return np.where(best >= 0, best, image)
+
+    def _top_candidates(self, candidate_rows, components, limit: int) -> List[tuple]:
+        text, category, location, time_score, image, final = components
+        passing = np.nonzero(final > MIN_MATCH_SCORE)[0]
+        if len(passing) == 0:
+            return []
+
+        # 先取前若干名，重复簇折叠后不够时再完整排序
+        for width in (limit * 4, len(passing)):
+            if width < len(passing):
+                head = passing[np.argpartition(-final[passing], width - 1)[:width]]
+            else:
+                head = passing
+            order = head[np.lexsort((self.post_ids[candidate_rows[head]], -final[head]))]
+            picked, clusters = [], set()
+            for i in order:
+                cluster = int(self.canonical[candidate_rows[i]])
+                if cluster in clusters:
+                    continue
+                clusters.add(cluster)
+                picked.append((
+                    int(self.post_ids[candidate_rows[i]]),
+                    float(text[i]), float(category[i]), float(location[i]), float(time_score[i]),
+                    None if np.isnan(image[i]) else float(image[i]), float(final[i])
+                ))
+                if len(picked) == limit:
+                    return picked
+            if width >= len(passing):
+                return picked
+        return picked
+
+
+# ---- 进程池worker ----
+
+_worker_snapshot: Optional[CorpusSnapshot] = None
+_worker_options: Tuple[int, int] = (10, 7)
+
+
+def _init_worker(snapshot_path: str, limit: int, time_range_days: int):
+    """每个worker进程启动时加载一次快照"""
+    global _worker_snapshot, _worker_options
+    with open(snapshot_path, "rb") as f:
+        _worker_snapshot = pickle.load(f)
+    _worker_options = (limit, time_range_days)
+
+
+def _score_partition(rows: np.ndarray) -> List[Tuple[int, List[tuple]]]:
+    limit, time_range_days = _worker_options
+    return _worker_snapshot.score_rows(rows, limit, time_range_days)
+
+
+class BulkRematchService:
+    """全量重新匹配任务的创建、执行与进度"""
+
+    @staticmethod
+    def get_active_job(session: Session) -> Optional[RematchJob]:
+        """仍在运行（心跳未过期）的任务"""
+        stale_before = datetime.utcnow() - HEARTBEAT_STALE
+        return session.exec(
+            select(RematchJob).where(
+                RematchJob.status.in_([MatchJobStatus.PENDING, MatchJobStatus.RUNNING]),
+                or_(
+                    and_(RematchJob.updated_at.is_(None), RematchJob.created_at >= stale_before),
+                    RematchJob.updated_at >= stale_before
+                )
+            )
+        ).first()
+
+    @staticmethod
+    def start(
+        session: Session,
+        requested_by: int,
+        workers: Optional[int] = None,
+        limit_per_post: int = 10,
+        time_range_days: int = 7
+    ) -> RematchJob:
+        """创建任务并在后台线程中执行（调用方需先确认没有运行中的任务）"""
+        job = RematchJob(
+            requested_by=requested_by,
+            workers=workers or os.cpu_count() or 1,
+            limit_per_post=limit_per_post,
+            time_range_days=time_range_days
+        )
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+
+        threading.Thread(
+            target=BulkRematchService.run, args=(job.id,), name=f"rematch-{job.id}", daemon=True
+        ).start()
+        return job
+
+    @staticmethod
+    def run(job_id: int):
+        with Session(engine) as session:
+            job = session.get(RematchJob, job_id)
+            job.status = MatchJobStatus.RUNNING
+            job.started_at = job.updated_at = datetime.utcnow()
+            session.add(job)
+            session.commit()
+
+            try:
+                snapshot = CorpusSnapshot.build(session)
+                job.total_posts = len(snapshot)
+                session.add(job)
+                session.commit()
+
+                with tempfile.TemporaryDirectory(prefix="rematch-") as directory:
+                    snapshot_path = snapshot.save(directory)
+                    del snapshot
+                    with ProcessPoolExecutor(
+                        max_workers=job.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(snapshot_path, job.limit_per_post, job.time_range_days)
+                    ) as pool:
+                        partitions = CorpusSnapshot.partition_rows(job.total_posts)
+                        futures = [pool.submit(_score_partition, rows) for rows in partitions]
+                        for future in as_completed(futures):
+                            BulkRematchService._write_results(session, job, future.result())
+
+                job.status = MatchJobStatus.COMPLETED
+                logger.info(f"[REMATCH] Job {job_id} re-matched {job.processed_posts} posts "
+                            f"({job.written_matches} matches)")
+            except Exception as exc:
+                logger.exception(f"[REMATCH] Job {job_id} failed")
+                session.rollback()
+                job.status = MatchJobStatus.FAILED
+                job.last_error = str(exc)[:500]
+
+            job.finished_at = job.updated_at = datetime.utcnow()
+            session.add(job)
+            session.commit()
+
+    @staticmethod
+    def _write_results(session: Session, job: RematchJob, results: List[Tuple[int, List[tuple]]]):
+        """用一个分区的结果替换这些帖子已有的匹配，并更新进度（单独一个事务）"""
+        now = datetime.utcnow()
+        post_ids = [post_id for post_id, _ in results]
+        session.exec(delete(PostMatch).where(PostMatch.post_id.in_(post_ids)))
+        rows = [
+            PostMatch(
+                post_id=post_id, candidate_id=candidate_id,
+                text_score=round(text, 4), category_score=category,
+                location_score=round(location, 4), time_score=round(time_score, 4),
+                image_score=None if image is None else round(image, 4),
+                score=round(score, 4), job_id=job.id, computed_at=now
+            )
+            for post_id, matches in results
+            for candidate_id, text, category, location, time_score, image, score in matches
+        ]
+        session.add_all(rows)
+        # 标记为新鲜结果，匹配接口可直接读取（见 PostMatchService.get_fresh）
+        states = {
+            state.post_id: state
+            for state in session.exec(select(PostMatchState).where(PostMatchState.post_id.in_(post_ids)))
+        }
+        for post_id in post_ids:
+            state = states.get(post_id) or PostMatchState(post_id=post_id)
+            state.candidate_limit = job.limit_per_post
+            state.time_range_days = job.time_range_days
+            state.computed_at = now
+            session.add(state)
+
+        job.processed_posts += len(results)
+        job.written_matches += len(rows)
+        job.updated_at = now
+        session.add(job)
+        session.commit()
+
+    @staticmethod
+    def progress(job: RematchJob) -> dict:
+        """进度百分比、已用时间、吞吐量（帖子/秒）与预计剩余时间"""
+        end = job.finished_at or datetime.utcnow()
+        elapsed = (end - job.started_at).total_seconds() if job.started_at else 0.0
+        throughput = job.processed_posts / elapsed if elapsed > 0 else 0.0
+        remaining = job.total_posts - job.processed_posts
+        return {
+            "percent": round(100 * job.processed_posts / job.total_posts, 1) if job.total_posts else (
+                100.0 if job.status == MatchJobStatus.COMPLETED else 0.0
+            ),
+            "elapsed_seconds": round(elapsed, 2),
+            "throughput_posts_per_second": round(throughput, 1),
+            "eta_seconds": round(remaining / throughput, 1) if throughput > 0 and job.finished_at is None else None,
+        }
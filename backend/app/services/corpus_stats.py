@@ -0,0 +1,140 @@
+"""
+语料统计服务
+增量维护开放失物/招领帖子的文档数、词项文档频率（DF）与词项总数（每篇文档的不同词项数之和，BM25的平均文档长度），
+匹配时直接读取IDF，不再每次请求重新拟合TF-IDF
+"""
+from typing import Dict, Iterable
+import math
+
+from sqlmodel import Session, select, update, delete, func
+
+from app.core.upsert import increment
+from app.models.post_index import TermStat, CorpusStat
+
+DOC_COUNT_KEY = "doc_count"
+TERM_COUNT_KEY = "term_count"
+
+
+class CorpusStatsService:
+    """文档频率与文档数的增量维护"""
+
+    @staticmethod
+    def _adjust_doc_count(session: Session, delta: int):
+        if delta > 0:
+            increment(session, CorpusStat, [{"key": DOC_COUNT_KEY}], "value", delta)
+            return
+        session.exec(
+            update(CorpusStat)
+            .where(CorpusStat.key == DOC_COUNT_KEY)
+            .values(value=CorpusStat.value + delta)
+        )
+
+    @staticmethod
+    def _adjust_term_count(session: Session, delta: int):
+        # 只在统计已初始化（ensure_term_count / reset）后增量维护，否则读取时按DF之和计算
+        if delta:
+            session.exec(
+                update(CorpusStat)
+                .where(CorpusStat.key == TERM_COUNT_KEY)
+                .values(value=CorpusStat.value + delta)
+            )
+
+    @staticmethod
+    def _adjust_doc_freqs(session: Session, terms: set, delta: int):
+        if not terms:
+            return
+
+        if delta > 0:
+            # 新词项插入、已有词项自增在同一条语句中完成，并发引入同一个新词项也不会主键冲突
+            increment(session, TermStat, [{"term": term} for term in sorted(terms)], "doc_freq", delta)
+            return
+
+        # 原子自减，避免并发写入时的读-改-写竞争
+        session.exec(
+            update(TermStat)
+            .where(TermStat.term.in_(terms))
+            .values(doc_freq=TermStat.doc_freq + delta)
+        )
+        session.exec(
+            delete(TermStat).where(TermStat.term.in_(terms), TermStat.doc_freq <= 0)
+        )
+
+    @staticmethod
+    def update_document(session: Session, old_terms: Iterable[str], new_terms: Iterable[str]):
+        """
+        文档进入、离开或变更时更新统计（不提交事务）
+        old_terms 为空表示新加入语料，new_terms 为空表示移出语料
+        """
+        old_terms = set(old_terms)
+        new_terms = set(new_terms)
+
+        if old_terms and not new_terms:
+            CorpusStatsService._adjust_doc_count(session, -1)
+        elif new_terms and not old_terms:
+            CorpusStatsService._adjust_doc_count(session, 1)
+
+        CorpusStatsService._adjust_doc_freqs(session, old_terms - new_terms, -1)
+        CorpusStatsService._adjust_doc_freqs(session, new_terms - old_terms, 1)
+        CorpusStatsService._adjust_term_count(session, len(new_terms) - len(old_terms))
+
+    @staticmethod
+    def get_doc_count(session: Session) -> int:
+        stat = session.get(CorpusStat, DOC_COUNT_KEY)
+        return stat.value if stat else 0
+
+    @staticmethod
+    def get_term_count(session: Session) -> int:
+        stat = session.get(CorpusStat, TERM_COUNT_KEY)
+        if stat is not None:
+            return stat.value
+        return session.exec(select(func.coalesce(func.sum(TermStat.doc_freq), 0))).one()
+
+    @staticmethod
+    def ensure_term_count(session: Session):
+        """升级前的语料没有词项总数统计时按DF之和初始化（启动时调用）"""
+        if session.get(CorpusStat, TERM_COUNT_KEY) is None:
+            session.add(CorpusStat(key=TERM_COUNT_KEY, value=CorpusStatsService.get_term_count(session)))
+            session.commit()
+
+    @staticmethod
+    def get_average_doc_length(session: Session) -> float:
+        """平均文档长度（按不同词项数计）"""
+        doc_count = CorpusStatsService.get_doc_count(session)
+        return CorpusStatsService.get_term_count(session) / doc_count if doc_count else 0.0
+
+    @staticmethod
+    def get_doc_freqs(session: Session, terms: Iterable[str]) -> Dict[str, int]:
+        terms = list(set(terms))
+        if not terms:
+            return {}
+        return dict(session.exec(select(TermStat.term, TermStat.doc_freq).where(TermStat.term.in_(terms))).all())
+
+    @staticmethod
+    def compute_idf(doc_count: int, doc_freq: int) -> float:
+        """平滑IDF：ln((1 + N) / (1 + df)) + 1，与 sklearn TfidfVectorizer(smooth_idf=True) 一致"""
+        return math.log((1 + doc_count) / (1 + doc_freq)) + 1
+
+    @staticmethod
+    def get_idf(session: Session, terms: Iterable[str]) -> Dict[str, float]:
+        """读取当前语料统计下各词项的IDF"""
+        terms = list(set(terms))
+        if not terms:
+            return {}
+
+        doc_count = CorpusStatsService.get_doc_count(session)
+        doc_freqs = CorpusStatsService.get_doc_freqs(session, terms)
+        return {
+            term: CorpusStatsService.compute_idf(doc_count, doc_freqs.get(term, 0))
+            for term in terms
+        }
+
+    @staticmethod
+    def reset(session: Session, doc_count: int, doc_freqs: Dict[str, int]):
+        """用全量统计结果覆盖（重建索引时使用，不提交事务）"""
+        session.exec(delete(TermStat))
+        session.exec(delete(CorpusStat))
+        session.add(CorpusStat(key=DOC_COUNT_KEY, value=doc_count))
+        session.add(CorpusStat(key=TERM_COUNT_KEY, value=sum(doc_freqs.values())))
+        session.add_all([TermStat(term=term, doc_freq=df) for term, df in doc_freqs.items()])
+        # 立即写入：之后同一事务中的 increment 是不经过ORM的UPSERT语句，待刷新的行会在之后刷新时主键冲突
+        session.flush()
@@ -0,0 +1,260 @@
+"""
+近似重复帖子检测服务（MinHash + LSH）
+为每个失物/招领帖子计算MinHash签名并按band写入LSH分桶表，
+新帖子入库前只需查询自身签名所在的桶即可找到近似重复帖子，开销与语料规模基本无关。
+重复在同类型、未认领的开放帖子之间判定（用户重复发布同一失物、多个服务点转发同一招领物品），
+被标记为重复的帖子仍然参与匹配和提醒，只在匹配结果中按重复簇折叠
+"""
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+from sqlmodel import Session, select, or_, and_, delete, update
+
+from app.models.post import Post
+from app.models.post_signature import PostSignature, LshBucket
+
+NUM_PERM = 64  # MinHash签名长度
+BANDS = 16  # LSH band数，每个band ROWS行；相似度≈0.5起开始成为候选
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3  # 字符3-gram
+DUPLICATE_THRESHOLD = 0.8  # 估计Jaccard相似度达到该值视为重复
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(20240601)
+_PERM_A = _rng.randint(1, _MERSENNE_PRIME, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, _MERSENNE_PRIME, size=NUM_PERM).astype(np.uint64)
+
+_NORMALIZE_PATTERN = re.compile(r'[^\u4e00-\u9fa5a-z0-9]')
+
+
+class DuplicateDetectionService:
+    """MinHash签名计算、LSH查询与重复簇管理"""
+
+    @staticmethod
+    def shingles(text: str) -> set:
+        """归一化（全角转半角、小写、去空白和标点）后取字符3-gram"""
+        text = _NORMALIZE_PATTERN.sub("", unicodedata.normalize("NFKC", text or "").lower())
+        if len(text) <= SHINGLE_SIZE:
+            return {text} if text else set()
+        return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+    @staticmethod
+    def compute_signature(text: str) -> List[int]:
+        """MinHash签名：对每个哈希函数 (a*x + b) mod p 取所有shingle的最小值"""
+        shingles = DuplicateDetectionService.shingles(text)
+        if not shingles:
+            return []
+
+        hashes = np.array(
+            [zlib.crc32(shingle.encode("utf-8")) % _MERSENNE_PRIME for shingle in shingles],
+            dtype=np.uint64
+        )
+        permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME
+        return permuted.min(axis=0).astype(np.int64).tolist()
+
+    @staticmethod
+    def bucket_keys(signature: List[int]) -> List[Tuple[int, int]]:
+        """签名按band切分并哈希，返回 [(band, bucket)]"""
+        if not signature:
+            return []
+        values = np.asarray(signature, dtype=np.uint32)
+        return [
+            (band, zlib.crc32(values[band * ROWS:(band + 1) * ROWS].tobytes()) & 0x7FFFFFFF)
+            for band in range(BANDS)
+        ]
+
+    @staticmethod
+    def estimate_similarity(signature: List[int], other: List[int]) -> float:
+        """两个签名相同位置取值相等的比例即Jaccard相似度的估计"""
+        if not signature or len(signature) != len(other):
+            return 0.0
+        return float(np.mean(np.asarray(signature) == np.asarray(other)))
+
+    @staticmethod
+    def find_duplicates(
+        session: Session,
+        signature: List[int],
+        item_type: str,
+        exclude_post_id: Optional[int] = None,
+        threshold: float = DUPLICATE_THRESHOLD
+    ) -> List[Tuple[PostSignature, float]]:
+        """查询与签名近似重复的同类型、未认领的开放帖子，按相似度降序返回 [(签名记录, 相似度)]"""
+        keys = DuplicateDetectionService.bucket_keys(signature)
+        if not keys:
+            return []
+
+        candidate_ids = set(session.exec(
+            select(LshBucket.post_id).where(
+                or_(*[and_(LshBucket.band == band, LshBucket.bucket == bucket) for band, bucket in keys])
+            )
+        ).all())
+        candidate_ids.discard(exclude_post_id)
+        if not candidate_ids:
+            return []
+
+        candidates = session.exec(
+            select(PostSignature)
+            .join(Post, Post.id == PostSignature.post_id)
+            .where(
+                PostSignature.post_id.in_(candidate_ids),
+                Post.item_type == item_type,
+                Post.status.in_(["published", "active"]),
+                Post.is_claimed == False
+            )
+        ).all()
+
+        duplicates = []
+        for candidate in candidates:
+            similarity = DuplicateDetectionService.estimate_similarity(signature, candidate.signature)
+            if similarity >= threshold:
+                duplicates.append((candidate, similarity))
+        duplicates.sort(key=lambda item: item[1], reverse=True)
+        return duplicates
+
+    @staticmethod
+    def register(
+        session: Session,
+        post: Post,
+        signature: List[int],
+        duplicates: List[Tuple[PostSignature, float]]
+    ) -> PostSignature:
+        """
+        保存帖子签名与LSH分桶（不提交事务）
+        存在重复时标记为最相似帖子所在簇的重复（指向簇的原始帖子）
+        """
+        record = session.get(PostSignature, post.id) or PostSignature(post_id=post.id)
+        record.signature = signature
+        record.duplicate_of_id = None
+        record.similarity = None
+        if duplicates:
+            best, similarity = duplicates[0]
+            record.duplicate_of_id = best.duplicate_of_id or best.post_id
+            record.similarity = round(similarity, 4)
+
+        session.exec(delete(LshBucket).where(LshBucket.post_id == post.id))
+        session.add(record)
+        session.add_all([
+            LshBucket(band=band, bucket=bucket, post_id=post.id)
+            for band, bucket in DuplicateDetectionService.bucket_keys(signature)
+        ])
+        return record
+
+    @staticmethod
+    def sync_post(session: Session, post: Post) -> PostSignature:
+        """
+        帖子标题、内容或类型被编辑后调用（不提交事务）：重新计算签名与LSH分桶，重新判定所属重复簇。
+        以它为原始帖子的重复帖子改为指向它的新簇（保持簇只有一层）
+        """
+        signature = DuplicateDetectionService.compute_signature(f"{post.title} {post.content}")
+        duplicates = []
+        if post.status in ("published", "active") and not post.is_claimed:
+            duplicates = [
+                (candidate, similarity)
+                for candidate, similarity in DuplicateDetectionService.find_duplicates(
+                    session, signature, post.item_type, exclude_post_id=post.id
+                )
+                # 自己簇内的重复帖子不能成为它的原始帖子
+                if candidate.duplicate_of_id != post.id
+            ]
+        record = DuplicateDetectionService.register(session, post, signature, duplicates)
+        if record.duplicate_of_id:
+            session.exec(
+                update(PostSignature)
+                .where(PostSignature.duplicate_of_id == post.id)
+                .values(duplicate_of_id=record.duplicate_of_id)
+            )
+        return record
+
+    @staticmethod
+    def canonical_ids(session: Session, post_ids: List[int]) -> Dict[int, int]:
+        """返回 {post_id: 所在重复簇的原始帖子id}，未被标记为重复的帖子映射到自身"""
+        canonical = {post_id: post_id for post_id in post_ids}
+        if not post_ids:
+            return canonical
+        rows = session.exec(
+            select(PostSignature.post_id, PostSignature.duplicate_of_id).where(
+                PostSignature.post_id.in_(post_ids),
+                PostSignature.duplicate_of_id.isnot(None)
+            )
+        ).all()
+        for post_id, duplicate_of_id in rows:
+            canonical[post_id] = duplicate_of_id
+        return canonical
+
+    @staticmethod
+    def list_clusters(session: Session, skip: int = 0, limit: int = 20) -> Tuple[List[dict], int]:
+        """列出重复簇：原始帖子及其所有被标记的重复帖子"""
+        rows = session.exec(
+            select(PostSignature)
+            .where(PostSignature.duplicate_of_id.isnot(None))
+            .order_by(PostSignature.duplicate_of_id.desc(), PostSignature.post_id)
+        ).all()
+
+        members: Dict[int, List[PostSignature]] = defaultdict(list)
+        for row in rows:
+            members[row.duplicate_of_id].append(row)
+
+        canonical_ids = list(members.keys())
+        page_ids = canonical_ids[skip:skip + limit]
+        post_ids = set(page_ids) | {row.post_id for canonical_id in page_ids for row in members[canonical_id]}
+        posts = {
+            post.id: post
+            for post in session.exec(select(Post).where(Post.id.in_(post_ids))).all()
+        } if post_ids else {}
+
+        def summarize(post: Post) -> dict:
+            return {
+                "id": post.id,
+                "title": post.title,
+                "item_type": post.item_type,
+                "status": post.status,
+                "author_id": post.author_id,
+                "created_at": post.created_at.isoformat() if post.created_at else None,
+            }
+
+        clusters = []
+        for canonical_id in page_ids:
+            if canonical_id not in posts:
+                continue
+            clusters.append({
+                "post": summarize(posts[canonical_id]),
+                "duplicates": [
+                    {**summarize(posts[row.post_id]), "similarity": row.similarity}
+                    for row in members[canonical_id]
+                    if row.post_id in posts
+                ]
+            })
+        return clusters, len(canonical_ids)
+
+    @staticmethod
+    def backfill(session: Session, only_missing: bool = True) -> int:
+        """
+        为失物/招领帖子按发布顺序补算签名（同时标记重复），返回处理数量；
+        only_missing=False 时清空已有签名与分桶，全部重新计算并重新划分重复簇
+        """
+        statement = select(Post).where(Post.item_type.in_(["lost", "found"])).order_by(Post.id)
+        if only_missing:
+            statement = statement.outerjoin(PostSignature, PostSignature.post_id == Post.id).where(
+                PostSignature.post_id.is_(None)
+            )
+        else:
+            session.exec(delete(LshBucket))
+            session.exec(delete(PostSignature))
+        posts = session.exec(statement).all()
+
+        for post in posts:
+            signature = DuplicateDetectionService.compute_signature(f"{post.title} {post.content}")
+            duplicates = []
+            if post.status in ("published", "active"):
+                duplicates = DuplicateDetectionService.find_duplicates(
+                    session, signature, post.item_type, exclude_post_id=post.id
+                )
+            DuplicateDetectionService.register(session, post, signature, duplicates)
+            session.flush()
+
+        session.commit()
+        return len(posts)
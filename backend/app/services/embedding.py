@@ -0,0 +1,155 @@
+"""
+帖子语义向量（离线、无模型文件、无GPU）
+特征为字符n-gram（中文2/3-gram，英文单词及其补位3-gram）加同义词表命中的规范词，
+经哈希技巧映射到固定维度并做次线性词频与L2归一化，余弦相似度即向量点积。
+同义词表让 "钱包" 与 "皮夹"、"phone" 与 "iPhone" 这类字面不同的说法落到相同的特征上
+"""
+from typing import Dict, List
+from collections import Counter
+from datetime import datetime
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.models.post import Post
+from app.models.post_embedding import PostEmbedding
+
+DIM = 256  # 向量维度
+SYNONYM_WEIGHT = 3.0  # 同义词规范词特征的权重（相对单个n-gram）
+
+# 规范词 -> 常见的其他说法（小写）
+SYNONYMS: Dict[str, List[str]] = {
+    "钱包": ["皮夹", "钱夹", "卡包", "wallet", "purse"],
+    "手机": ["iphone", "phone", "华为", "小米", "安卓机", "苹果机", "mobile"],
+    "耳机": ["耳麦", "airpods", "earphone", "earphones", "headphone", "headphones", "earbuds"],
+    "电脑": ["笔记本", "laptop", "macbook", "notebook", "平板", "ipad"],
+    "钥匙": ["钥匙串", "门禁卡", "key", "keys"],
+    "校园卡": ["一卡通", "饭卡", "学生卡", "campus card"],
+    "证件": ["身份证", "学生证", "驾驶证", "护照", "id card", "passport"],
+    "雨伞": ["伞", "遮阳伞", "umbrella"],
+    "水杯": ["杯子", "保温杯", "水壶", "bottle", "cup", "thermos"],
+    "眼镜": ["墨镜", "镜框", "glasses", "sunglasses"],
+    "书包": ["背包", "双肩包", "挎包", "backpack", "bag"],
+    "充电宝": ["移动电源", "power bank", "powerbank"],
+    "手表": ["手环", "watch"],
+    "u盘": ["优盘", "闪存盘", "usb"],
+    "课本": ["教材", "教科书", "book", "textbook"],
+    "外套": ["衣服", "夹克", "羽绒服", "卫衣", "jacket", "coat", "hoodie"],
+}
+
+_WORD_PATTERN = re.compile(r'[\u4e00-\u9fa5]+|[a-z0-9]+')
+_ASCII_PATTERN = re.compile(r'^[a-z0-9 ]+$')
+
+
+def _build_synonym_pattern():
+    variants = {}
+    for canonical, others in SYNONYMS.items():
+        for variant in [canonical, *others]:
+            variants[variant] = canonical
+    # 长词优先；英文按单词边界匹配，避免 "key" 命中 "keyboard"
+    alternatives = [
+        rf'\b{re.escape(variant)}\b' if _ASCII_PATTERN.match(variant) else re.escape(variant)
+        for variant in sorted(variants, key=len, reverse=True)
+    ]
+    return re.compile("|".join(alternatives)), variants
+
+
+_SYNONYM_PATTERN, _SYNONYM_CANONICAL = _build_synonym_pattern()
+
+
+class EmbeddingService:
+    """哈希语义向量的计算与持久化"""
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return unicodedata.normalize("NFKC", text or "").lower()
+
+    @staticmethod
+    def features(text: str) -> Counter:
+        """字符n-gram与同义词规范词特征及其出现次数"""
+        normalized = EmbeddingService.normalize(text)
+        features = Counter()
+        for word in _WORD_PATTERN.findall(normalized):
+            if word.isascii():
+                features[f"w:{word}"] += 1
+                padded = f"#{word}#"
+                features.update(padded[i:i + 3] for i in range(len(padded) - 2))
+            elif len(word) == 1:
+                features[word] += 1
+            else:
+                features.update(word[i:i + 2] for i in range(len(word) - 1))
+                features.update(word[i:i + 3] for i in range(len(word) - 2))
+        for match in _SYNONYM_PATTERN.finditer(normalized):
+            features[f"syn:{_SYNONYM_CANONICAL[match.group(0)]}"] += SYNONYM_WEIGHT
+        return features
+
+    @staticmethod
+    def embed(text: str) -> np.ndarray:
+        """文本 -> DIM维单位向量（float32）；没有任何特征时为零向量"""
+        vector = np.zeros(DIM, dtype=np.float32)
+        for feature, count in EmbeddingService.features(text).items():
+            hashed = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if (hashed >> 31) & 1 else -1.0  # 带符号哈希，减小碰撞带来的偏差
+            vector[hashed % DIM] += sign * (1.0 + np.log(count))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    @staticmethod
+    def embed_post(post: Post) -> np.ndarray:
+        return EmbeddingService.embed(f"{post.title} {post.content}")
+
+    @staticmethod
+    def to_bytes(vector: np.ndarray) -> bytes:
+        return vector.astype(np.float16).tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> np.ndarray:
+        return np.frombuffer(data, dtype=np.float16).astype(np.float32)
+
+    @staticmethod
+    def refresh(session: Session, post: Post) -> PostEmbedding:
+        """重新计算并保存失物/招领帖子的语义向量（不提交事务），发帖及编辑标题/内容时调用"""
+        vector = EmbeddingService.to_bytes(EmbeddingService.embed_post(post))
+        record = session.get(PostEmbedding, post.id)
+        if record is None:
+            record = PostEmbedding(post_id=post.id, item_type=post.item_type, vector=vector)
+        else:
+            record.item_type = post.item_type
+            record.vector = vector
+            record.updated_at = datetime.utcnow()
+        session.add(record)
+        return record
+
+    @staticmethod
+    def touch(session: Session, post: Post):
+        """
+        帖子状态变化（关闭、认领、删除、恢复）后调用（不提交事务）：更新向量记录的时间戳，
+        让各进程的ANN索引在下次增量同步时按帖子当前状态收录或移除它
+        """
+        record = session.get(PostEmbedding, post.id)
+        if record is not None:
+            record.updated_at = datetime.utcnow()
+            session.add(record)
+
+    @staticmethod
+    def get_vector(session: Session, post: Post) -> np.ndarray:
+        """读取帖子的语义向量；尚未计算过（历史数据）时临时计算"""
+        record = session.get(PostEmbedding, post.id)
+        return EmbeddingService.from_bytes(record.vector) if record else EmbeddingService.embed_post(post)
+
+    @staticmethod
+    def backfill(session: Session, only_missing: bool = True) -> int:
+        """为历史失物/招领帖子补算语义向量，返回处理数量"""
+        statement = select(Post).where(Post.item_type.in_(["lost", "found"]))
+        if only_missing:
+            statement = statement.outerjoin(PostEmbedding, PostEmbedding.post_id == Post.id).where(
+                PostEmbedding.post_id.is_(None)
+            )
+        posts = list(session.exec(statement).all())
+        for post in posts:
+            EmbeddingService.refresh(session, post)
+        session.commit()
+        return len(posts)
@@ -0,0 +1,143 @@
+"""
+图片感知哈希服务
+上传图片时计算64位差值哈希（dHash：灰度缩放到9x8，比较每行相邻像素的明暗），写入 image_hashes；
+发帖或修改图片时把帖子各图片的哈希同步到 post_image_hashes，供 ImageIndex（多索引哈希）做汉明半径查询。
+同一物品的照片经过缩放、重新压缩、轻微裁剪或调色后汉明距离通常在10以内，无关图片约为32。
+哈希按有符号64位整数存储（与 BIGINT 一致），比较时按无符号处理
+"""
+from typing import Dict, Iterable, List, Optional
+from io import BytesIO
+from pathlib import Path
+import logging
+
+from PIL import Image
+from sqlmodel import Session, select, delete
+
+from app.models.post import Post
+from app.models.image_hash import ImageHash, PostImageHash
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+HASH_MASK = (1 << HASH_BITS) - 1
+IMAGE_MATCH_RADIUS = 10  # 汉明距离不超过该值的图片视为相似
+UPLOAD_URL_PREFIX = "/uploads/images/"
+UPLOAD_DIR = Path("uploads/images")  # 与 app/api/upload.py 的上传目录一致
+
+
+class ImageHashService:
+    """感知哈希的计算、存储与帖子间的图片相似度"""
+
+    @staticmethod
+    def compute_hash(content: bytes) -> Optional[int]:
+        """计算图片的dHash（有符号64位整数），无法解码的文件返回None"""
+        try:
+            with Image.open(BytesIO(content)) as image:
+                # JPEG可在解码时直接降采样，大照片不必完整解码
+                image.draft("L", (64, 64))
+                pixels = image.convert("L").resize((9, 8), Image.Resampling.LANCZOS).tobytes()
+        except Exception as exc:
+            logger.warning(f"[IMAGE] Could not decode image for perceptual hashing: {exc}")
+            return None
+
+        value = 0
+        for row in range(8):
+            for col in range(8):
+                value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+        return ImageHashService.to_signed(value)
+
+    @staticmethod
+    def to_signed(value: int) -> int:
+        return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+    @staticmethod
+    def hamming(value: int, other: int) -> int:
+        return ((value ^ other) & HASH_MASK).bit_count()
+
+    @staticmethod
+    def similarity(distance: int) -> float:
+        """汉明距离 -> 相似度（0-1），随距离平方下降（重新压缩等造成的小距离扣分少），超过 IMAGE_MATCH_RADIUS 为0"""
+        if distance > IMAGE_MATCH_RADIUS:
+            return 0.0
+        return 1 - (distance / (IMAGE_MATCH_RADIUS + 1)) ** 2
+
+    @staticmethod
+    def store_upload(session: Session, url: str, content: bytes, uploaded_by: Optional[int] = None) -> Optional[int]:
+        """上传时调用（不提交事务）：计算并记录图片哈希，返回哈希值"""
+        value = ImageHashService.compute_hash(content)
+        if value is not None:
+            session.merge(ImageHash(url=url, dhash=value, uploaded_by=uploaded_by))
+        return value
+
+    @staticmethod
+    def get_or_compute(session: Session, url: str) -> Optional[int]:
+        """图片URL的哈希；上传时没有记录（历史图片）时从本地上传目录读取文件补算"""
+        record = session.get(ImageHash, url)
+        if record is not None:
+            return record.dhash
+        if not url.startswith(UPLOAD_URL_PREFIX):
+            return None
+        path = UPLOAD_DIR / url[len(UPLOAD_URL_PREFIX):]
+        if path.name != url[len(UPLOAD_URL_PREFIX):] or not path.is_file():
+            return None
+        return ImageHashService.store_upload(session, url, path.read_bytes())
+
+    @staticmethod
+    def sync_post(session: Session, post: Post):
+        """根据帖子当前图片刷新 post_image_hashes（不提交事务），发帖或修改图片时调用"""
+        session.exec(delete(PostImageHash).where(PostImageHash.post_id == post.id))
+        hashes = {ImageHashService.get_or_compute(session, url) for url in post.images or []}
+        session.add_all([
+            PostImageHash(post_id=post.id, item_type=post.item_type, dhash=value)
+            for value in hashes if value is not None
+        ])
+
+    @staticmethod
+    def post_hashes(session: Session, post_ids: Iterable[int]) -> Dict[int, List[int]]:
+        """{post_id: [哈希]}，没有图片哈希的帖子不出现"""
+        post_ids = list(post_ids)
+        if not post_ids:
+            return {}
+        result: Dict[int, List[int]] = {}
+        for post_id, value in session.exec(
+            select(PostImageHash.post_id, PostImageHash.dhash).where(PostImageHash.post_id.in_(post_ids))
+        ):
+            result.setdefault(post_id, []).append(value)
+        return result
+
+    @staticmethod
+    def similarities(
+        session: Session,
+        original_post: Post,
+        post_ids: Iterable[int],
+        query_hashes: Optional[List[int]] = None
+    ) -> Dict[int, float]:
+        """
+        原帖与候选帖子的图片相似度 {post_id: 0~1}（任意两张图片间的最大值）；
+        只包含双方都有图片哈希的候选，原帖没有图片时返回空字典
+        """
+        if query_hashes is None:
+            query_hashes = ImageHashService.post_hashes(session, [original_post.id]).get(original_post.id, [])
+        if not query_hashes:
+            return {}
+        return {
+            post_id: max(
+                ImageHashService.similarity(ImageHashService.hamming(query, value))
+                for query in query_hashes for value in values
+            )
+            for post_id, values in ImageHashService.post_hashes(session, post_ids).items()
+        }
+
+    @staticmethod
+    def backfill(session: Session, only_missing: bool = True) -> int:
+        """为有图片的历史失物/招领帖子补算图片哈希，返回处理数量"""
+        statement = select(Post).where(Post.item_type.in_(["lost", "found"]), Post.images.isnot(None))
+        if only_missing:
+            statement = statement.where(Post.id.not_in(select(PostImageHash.post_id)))
+        posts: List[Post] = [post for post in session.exec(statement).all() if post.images]
+
+        for post in posts:
+            ImageHashService.sync_post(session, post)
+
+        session.commit()
+        return len(posts)
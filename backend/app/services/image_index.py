@@ -0,0 +1,159 @@
+"""
+图片哈希的汉明半径索引
+MultiIndexHash：多索引哈希（MIH），64位哈希切成4段16位，每段一个哈希表。由抽屉原理，汉明距离不超过r的两个哈希
+至少有一段的距离不超过 r//4，查询时只需在每段枚举距离 r//4 以内的取值（r=10 时每段137个）做精确查找，
+再对候选计算完整距离；与BK树相比，r=10 这样较大的半径下不会退化为接近全量扫描。
+ImageIndex：按 lost / found 各一个MIH，从 post_image_hashes 表按自增id水位增量同步（帖子改图时旧行被删除、
+新行追加）；查询结果再回表核对，已删除的旧行不会返回，失效条目过多时全量重建。索引只在内存中，启动后首次查询时构建
+"""
+from typing import Dict, List, Optional, Tuple
+from itertools import combinations
+import logging
+import threading
+import time
+
+from sqlmodel import Session, select, func
+
+from app.models.image_hash import PostImageHash
+from app.services.image_hash import ImageHashService
+
+logger = logging.getLogger(__name__)
+
+ITEM_TYPES = ("lost", "found")
+SYNC_INTERVAL_SECONDS = 1.0  # 从 post_image_hashes 拉取增量的最小间隔
+REBUILD_STALE_RATIO = 2  # 索引中条目数超过表中行数的该倍数时重建
+SEGMENTS = 4
+SEGMENT_BITS = 16
+SEGMENT_MASK = (1 << SEGMENT_BITS) - 1
+
+
+def _flip_masks(radius: int) -> List[int]:
+    """一段16位中翻转不超过radius位的全部掩码"""
+    return [
+        sum(1 << bit for bit in bits)
+        for count in range(radius + 1)
+        for bits in combinations(range(SEGMENT_BITS), count)
+    ]
+
+
+class MultiIndexHash:
+    """tables[i] 为第i段取值 -> [(哈希, post_id)]"""
+
+    def __init__(self):
+        self.tables: List[Dict[int, List[Tuple[int, int]]]] = [{} for _ in range(SEGMENTS)]
+        self.size = 0
+        self._masks: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    @staticmethod
+    def segments(value: int) -> List[int]:
+        value &= (1 << (SEGMENTS * SEGMENT_BITS)) - 1
+        return [(value >> (i * SEGMENT_BITS)) & SEGMENT_MASK for i in range(SEGMENTS)]
+
+    def add(self, value: int, post_id: int):
+        self.size += 1
+        for table, segment in zip(self.tables, self.segments(value)):
+            table.setdefault(segment, []).append((value, post_id))
+
+    def search(self, value: int, radius: int) -> Dict[int, int]:
+        """距离不超过radius的帖子 {post_id: 最小汉明距离}"""
+        sub_radius = radius // SEGMENTS
+        masks = self._masks.get(sub_radius)
+        if masks is None:
+            masks = self._masks[sub_radius] = _flip_masks(sub_radius)
+
+        result: Dict[int, int] = {}
+        checked = set()
+        for table, segment in zip(self.tables, self.segments(value)):
+            for mask in masks:
+                for entry in table.get(segment ^ mask, ()):
+                    if entry in checked:
+                        continue
+                    checked.add(entry)
+                    distance = ImageHashService.hamming(value, entry[0])
+                    if distance <= radius and distance < result.get(entry[1], radius + 1):
+                        result[entry[1]] = distance
+        return result
+
+
+class ImageIndex:
+    """lost / found 两个MIH，与 post_image_hashes 表增量同步"""
+
+    def __init__(self):
+        self.indexes: Dict[str, MultiIndexHash] = {}
+        self.watermark = 0  # 已同步的 post_image_hashes.id
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+
+    def size(self) -> int:
+        return sum(len(index) for index in self.indexes.values())
+
+    def rebuild(self, session: Session):
+        with self._lock:
+            self._rebuild(session)
+
+    def _rebuild(self, session: Session):
+        self.indexes = {item_type: MultiIndexHash() for item_type in ITEM_TYPES}
+        self.watermark = 0
+        self._sync(session)
+        logger.info(f"[IMAGE] Built image hash index ({self.size()} hashes)")
+
+    def _sync(self, session: Session):
+        rows = session.exec(
+            select(PostImageHash.id, PostImageHash.post_id, PostImageHash.item_type, PostImageHash.dhash)
+            .where(PostImageHash.id > self.watermark)
+            .order_by(PostImageHash.id)
+        ).all()
+        self._last_sync = time.monotonic()
+        for row_id, post_id, item_type, value in rows:
+            index = self.indexes.get(item_type)
+            if index is not None:
+                index.add(value, post_id)
+            self.watermark = row_id
+
+        if rows:
+            live = session.exec(select(func.count()).select_from(PostImageHash)).one()
+            if self.size() > max(REBUILD_STALE_RATIO * live, 1000):
+                self._rebuild(session)
+
+    def search(
+        self,
+        session: Session,
+        query_hashes: List[int],
+        item_type: str,
+        radius: int
+    ) -> List[Tuple[int, int]]:
+        """item_type 帖子中与任一查询哈希距离不超过radius的 [(post_id, 最小汉明距离)]，按距离升序；结果可能包含已关闭的帖子"""
+        with self._lock:
+            if not self.indexes:
+                self._rebuild(session)
+            elif time.monotonic() - self._last_sync >= SYNC_INTERVAL_SECONDS:
+                self._sync(session)
+            index = self.indexes.get(item_type)
+            hits: Dict[int, int] = {}
+            for query in query_hashes if index is not None else []:
+                for post_id, distance in index.search(query, radius).items():
+                    hits[post_id] = min(distance, hits.get(post_id, radius + 1))
+
+        # 回表核对：索引中可能还有帖子改图前的旧哈希
+        verified = {}
+        for post_id, values in ImageHashService.post_hashes(session, hits.keys()).items():
+            distance = min(ImageHashService.hamming(query, value) for query in query_hashes for value in values)
+            if distance <= radius:
+                verified[post_id] = distance
+        return sorted(verified.items(), key=lambda item: (item[1], item[0]))
+
+
+_image_index: Optional[ImageIndex] = None
+_image_index_lock = threading.Lock()
+
+
+def get_image_index() -> ImageIndex:
+    global _image_index
+    if _image_index is None:
+        with _image_index_lock:
+            if _image_index is None:
+                _image_index = ImageIndex()
+    return _image_index
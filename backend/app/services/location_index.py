@@ -0,0 +1,122 @@
+"""
+地点三元组索引服务
+地点先归一化（全角转半角、小写、去空白和标点）写入 posts.location_normalized，
+再按字符3-gram（首尾补边界符）写入 location_trigrams 表。
+候选过滤和地点得分都以帖子的 location_normalized 为查询，通过三元组重合度（Jaccard）的索引查询得到，
+不再对每个候选做 LIKE 全表扫描或逐条计算编辑距离，拼写/写法略有差异的地点也能匹配
+"""
+from typing import Dict, Iterable, List, Optional, Set
+import math
+import re
+import unicodedata
+
+from sqlmodel import Session, select, delete, func
+
+from app.models.post import Post
+from app.models.location_index import LocationTrigram
+
+_NORMALIZE_PATTERN = re.compile(r'[^\u4e00-\u9fa5a-z0-9]')
+
+LOCATION_MATCH_THRESHOLD = 0.2  # 后台匹配任务中地点相似度低于该值的候选被过滤
+
+
+class LocationIndexService:
+    """地点归一化、三元组索引维护与相似度查询"""
+
+    @staticmethod
+    def normalize(location: Optional[str]) -> str:
+        """归一化地点文本，例如 "图书馆 3楼" 与 "图书馆3楼" 得到相同结果"""
+        if not location:
+            return ""
+        return _NORMALIZE_PATTERN.sub("", unicodedata.normalize("NFKC", location).lower())
+
+    @staticmethod
+    def trigrams(normalized: str) -> Set[str]:
+        """字符3-gram，首尾补 ^ / $，两个字的地点（如 "食堂"）也能产生三元组"""
+        if not normalized:
+            return set()
+        padded = f"^{normalized}$"
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @staticmethod
+    def similarity(location: Optional[str], other: Optional[str]) -> float:
+        """两个地点的三元组 Jaccard 相似度（内存计算，不查索引）"""
+        grams = LocationIndexService.trigrams(LocationIndexService.normalize(location))
+        other_grams = LocationIndexService.trigrams(LocationIndexService.normalize(other))
+        if not grams or not other_grams:
+            return 0.0
+        return len(grams & other_grams) / len(grams | other_grams)
+
+    @staticmethod
+    def sync_post(session: Session, post: Post):
+        """根据帖子当前地点刷新归一化地点，再由归一化地点生成三元组（不提交事务），发帖或修改地点时调用"""
+        post.location_normalized = LocationIndexService.normalize(post.location) or None
+        session.add(post)
+
+        session.exec(delete(LocationTrigram).where(LocationTrigram.post_id == post.id))
+        session.add_all([
+            LocationTrigram(trigram=trigram, post_id=post.id)
+            for trigram in LocationIndexService.trigrams(post.location_normalized or "")
+        ])
+
+    @staticmethod
+    def similarities(
+        session: Session,
+        normalized: Optional[str],
+        post_ids: Optional[Iterable[int]] = None,
+        min_similarity: float = 0.0
+    ) -> Dict[int, float]:
+        """
+        查询与给定归一化地点（帖子的 location_normalized）三元组重合的帖子及其 Jaccard 相似度 {post_id: 0~1}
+        post_ids 限定查询范围；min_similarity > 0 时先按重合数下界在数据库中剪枝
+        """
+        query_trigrams = LocationIndexService.trigrams(normalized or "")
+        if not query_trigrams:
+            return {}
+
+        overlap_query = (
+            select(LocationTrigram.post_id, func.count())
+            .where(LocationTrigram.trigram.in_(query_trigrams))
+            .group_by(LocationTrigram.post_id)
+        )
+        if post_ids is not None:
+            post_ids = list(post_ids)
+            if not post_ids:
+                return {}
+            overlap_query = overlap_query.where(LocationTrigram.post_id.in_(post_ids))
+        if min_similarity > 0:
+            # |A∩B| / |A∪B| >= t 要求 |A∩B| >= t * |A|
+            overlap_query = overlap_query.having(
+                func.count() >= math.ceil(min_similarity * len(query_trigrams))
+            )
+
+        overlaps = dict(session.exec(overlap_query).all())
+        if not overlaps:
+            return {}
+
+        sizes = dict(session.exec(
+            select(LocationTrigram.post_id, func.count())
+            .where(LocationTrigram.post_id.in_(list(overlaps.keys())))
+            .group_by(LocationTrigram.post_id)
+        ).all())
+
+        result = {}
+        for post_id, overlap in overlaps.items():
+            similarity = overlap / (len(query_trigrams) + sizes[post_id] - overlap)
+            if similarity >= min_similarity:
+                result[post_id] = similarity
+        return result
+
+    @staticmethod
+    def backfill(session: Session, only_missing: bool = True) -> int:
+        """为历史帖子补算归一化地点与三元组，返回处理数量"""
+        statement = select(Post).where(Post.location.isnot(None))
+        if only_missing:
+            statement = statement.where(Post.location_normalized.is_(None))
+        posts: List[Post] = list(session.exec(statement).all())
+
+        for post in posts:
+            LocationIndexService.sync_post(session, post)
+
+        session.commit()
+        return len(posts)
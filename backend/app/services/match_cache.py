@@ -0,0 +1,344 @@
+"""
+智能匹配结果缓存
+/posts/{post_id}/matches 的结果按 (post_id, limit, time_range_days, mode) 缓存匹配到的帖子id：
+一级为进程内LRU，可选二级为多个worker进程共享的SQLite文件。
+帖子本身或任一缓存结果中的帖子被编辑、认领、删除时失效；新帖子不主动失效，由TTL兜底。
+共享层还记录失效事件，各进程定期拉取并清理自己的进程内缓存
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from collections import Counter, OrderedDict
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EVENT_SYNC_INTERVAL_SECONDS = 1.0  # 拉取其他进程失效事件的最小间隔
+
+
+class _SharedTier:
+    """基于SQLite文件的共享缓存层"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS match_cache (
+                cache_key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS match_cache_deps (
+                post_id INTEGER NOT NULL,
+                cache_key TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_match_cache_deps_post_id ON match_cache_deps (post_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_match_cache_deps_cache_key ON match_cache_deps (cache_key)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS match_cache_invalidations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                post_id INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+
+    def get(self, key: str, now: float) -> Optional[Tuple[List[int], float]]:
+        row = self._conn.execute(
+            "SELECT result, expires_at FROM match_cache WHERE cache_key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def set(self, key: str, dependencies: Set[int], result_ids: List[int], expires_at: float):
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM match_cache_deps WHERE cache_key = ?", (key,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO match_cache (cache_key, result, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(result_ids), expires_at)
+            )
+            self._conn.executemany(
+                "INSERT INTO match_cache_deps (post_id, cache_key) VALUES (?, ?)",
+                [(post_id, key) for post_id in dependencies]
+            )
+
+    def invalidate(self, post_ids: List[int], now: float):
+        placeholders = ",".join("?" * len(post_ids))
+        with self._conn:
+            self._conn.execute("BEGIN")
+            keys = [
+                (row[0],) for row in self._conn.execute(
+                    f"SELECT DISTINCT cache_key FROM match_cache_deps WHERE post_id IN ({placeholders})", post_ids
+                )
+            ]
+            self._conn.executemany("DELETE FROM match_cache WHERE cache_key = ?", keys)
+            self._conn.executemany("DELETE FROM match_cache_deps WHERE cache_key = ?", keys)
+            self._conn.executemany(
+                "INSERT INTO match_cache_invalidations (post_id, created_at) VALUES (?, ?)",
+                [(post_id, now) for post_id in post_ids]
+            )
+
+    def events_since(self, last_event_id: int) -> List[Tuple[int, int]]:
+        """返回 [(事件id, post_id)]"""
+        return self._conn.execute(
+            "SELECT id, post_id FROM match_cache_invalidations WHERE id > ? ORDER BY id", (last_event_id,)
+        ).fetchall()
+
+    def last_event_id(self) -> int:
+        return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM match_cache_invalidations").fetchone()[0]
+
+    def prune(self, now: float, ttl_seconds: float):
+        """清理过期条目和早于一个TTL周期的失效事件"""
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "DELETE FROM match_cache_deps WHERE cache_key IN "
+                "(SELECT cache_key FROM match_cache WHERE expires_at <= ?)", (now,)
+            )
+            self._conn.execute("DELETE FROM match_cache WHERE expires_at <= ?", (now,))
+            self._conn.execute("DELETE FROM match_cache_invalidations WHERE created_at < ?", (now - ttl_seconds,))
+
+    def clear(self):
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM match_cache")
+            self._conn.execute("DELETE FROM match_cache_deps")
+
+
+class MatchCache:
+    """两级匹配结果缓存（线程安全）"""
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 300.0, shared_path: str = ""):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[List[int], float]]" = OrderedDict()  # key -> (帖子id列表, 过期时间)
+        self._dependents: Dict[int, Set[str]] = {}  # post_id -> 依赖该帖子的缓存key
+        self._counters = Counter()
+        self._generation = 0  # 失效序号，每次失效加1
+        # post_id -> 该帖子最近一次失效时的序号；写入时只检查结果自己的依赖是否在计算期间失效，
+        # 其他帖子的失效不影响。按失效先后排列，超过上限时淘汰最早的记录
+        self._invalidated_at: "OrderedDict[int, int]" = OrderedDict()
+        self._max_tracked_invalidations = max(4 * max_entries, 1024)
+        self._untracked_before = 0  # 序号不大于该值的失效记录已被淘汰，早于它开始的计算一律视为过期
+
+        self._shared: Optional[_SharedTier] = None
+        self._last_event_id = 0
+        self._last_sync = 0.0
+        self._last_prune = 0.0
+        if shared_path:
+            try:
+                self._shared = _SharedTier(shared_path)
+                self._last_event_id = self._shared.last_event_id()
+            except sqlite3.Error:
+                logger.exception(f"[MATCH_CACHE] Could not open shared cache at {shared_path}, using in-process cache only")
+
+    @staticmethod
+    def make_key(post_id: int, limit: int, time_range_days: int, mode: str) -> str:
+        return f"{post_id}:{limit}:{time_range_days}:{mode}"
+
+    @staticmethod
+    def _post_id_of(key: str) -> int:
+        return int(key.split(":", 1)[0])
+
+    def get(self, post_id: int, limit: int, time_range_days: int, mode: str) -> Optional[List[int]]:
+        """返回缓存的匹配帖子id列表（按排名），未命中返回None"""
+        key = self.make_key(post_id, limit, time_range_days, mode)
+        now = time.time()
+        with self._lock:
+            self._sync_events(now)
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return list(entry[0])
+                self._drop(key)
+
+            if self._shared is not None:
+                try:
+                    shared_entry = self._shared.get(key, now)
+                except sqlite3.Error:
+                    logger.exception("[MATCH_CACHE] Shared cache read failed")
+                    self._counters["shared_errors"] += 1
+                    shared_entry = None
+                if shared_entry is not None:
+                    result_ids, expires_at = shared_entry
+                    self._store(key, result_ids, expires_at)
+                    self._counters["shared_hits"] += 1
+                    return list(result_ids)
+
+            self._counters["misses"] += 1
+            return None
+
+    def generation(self) -> int:
+        """计算匹配结果前读取，写入缓存时传回 set()"""
+        with self._lock:
+            return self._generation
+
+    def set(
+        self,
+        post_id: int,
+        limit: int,
+        time_range_days: int,
+        mode: str,
+        result_ids: List[int],
+        generation: Optional[int] = None
+    ):
+        """
+        缓存匹配结果；失效依赖为帖子本身及结果中的所有帖子
+        generation 为开始计算前读取的失效序号；计算期间任一依赖帖子失效时不写入，避免缓存旧数据
+        """
+        key = self.make_key(post_id, limit, time_range_days, mode)
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            if generation is not None and self._dependency_changed({post_id, *result_ids}, generation):
+                self._counters["stale_writes_skipped"] += 1
+                return
+            self._store(key, list(result_ids), expires_at)
+            if self._shared is not None:
+                try:
+                    self._shared.set(key, {post_id, *result_ids}, list(result_ids), expires_at)
+                except sqlite3.Error:
+                    logger.exception("[MATCH_CACHE] Shared cache write failed")
+                    self._counters["shared_errors"] += 1
+
+    def invalidate(self, post_ids: Iterable[int]):
+        """帖子被编辑、认领或删除后调用：清除以其为查询帖子或出现在结果中的缓存"""
+        post_ids = sorted(set(post_ids))
+        if not post_ids:
+            return
+        now = time.time()
+        with self._lock:
+            self._invalidate_local(post_ids)
+            if self._shared is not None:
+                try:
+                    self._shared.invalidate(post_ids, now)
+                    self._counters["shared_invalidations"] += len(post_ids)
+                except sqlite3.Error:
+                    logger.exception("[MATCH_CACHE] Shared cache invalidation failed")
+                    self._counters["shared_errors"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dependents.clear()
+            if self._shared is not None:
+                self._shared.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._counters["hits"] + self._counters["shared_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                "hits": self._counters["hits"],
+                "shared_hits": self._counters["shared_hits"],
+                "misses": self._counters["misses"],
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._counters["invalidations"],
+                "shared_invalidations": self._counters["shared_invalidations"],
+                "evictions": self._counters["evictions"],
+                "stale_writes_skipped": self._counters["stale_writes_skipped"],
+                "shared_errors": self._counters["shared_errors"],
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "shared_tier": self._shared.path if self._shared is not None else None,
+            }
+
+    # 以下方法需在持有锁时调用
+
+    def _store(self, key: str, result_ids: List[int], expires_at: float):
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (result_ids, expires_at)
+        for post_id in {self._post_id_of(key), *result_ids}:
+            self._dependents.setdefault(post_id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._counters["evictions"] += 1
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for post_id in {self._post_id_of(key), *entry[0]}:
+            keys = self._dependents.get(post_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._dependents[post_id]
+
+    def _dependency_changed(self, post_ids: Set[int], generation: int) -> bool:
+        if generation < self._untracked_before:
+            return True
+        return any(self._invalidated_at.get(post_id, 0) > generation for post_id in post_ids)
+
+    def _invalidate_local(self, post_ids: Iterable[int]):
+        post_ids = list(post_ids)
+        self._generation += 1
+        for post_id in post_ids:
+            self._invalidated_at.pop(post_id, None)
+            self._invalidated_at[post_id] = self._generation
+        while len(self._invalidated_at) > self._max_tracked_invalidations:
+            _, sequence = self._invalidated_at.popitem(last=False)
+            self._untracked_before = max(self._untracked_before, sequence)
+        for post_id in post_ids:
+            for key in list(self._dependents.get(post_id, ())):
+                self._drop(key)
+                self._counters["invalidations"] += 1
+
+    def _sync_events(self, now: float):
+        """拉取其他进程写入的失效事件，清理本进程缓存"""
+        if self._shared is None or now - self._last_sync < EVENT_SYNC_INTERVAL_SECONDS:
+            return
+        self._last_sync = now
+        try:
+            events = self._shared.events_since(self._last_event_id)
+            if events:
+                self._last_event_id = events[-1][0]
+                self._invalidate_local({post_id for _, post_id in events})
+            if now - self._last_prune >= self.ttl_seconds:
+                self._shared.prune(now, self.ttl_seconds)
+                self._last_prune = now
+        except sqlite3.Error:
+            logger.exception("[MATCH_CACHE] Shared cache event sync failed")
+            self._counters["shared_errors"] += 1
+
+
+_match_cache: Optional[MatchCache] = None
+_match_cache_lock = threading.Lock()
+
+
+def get_match_cache() -> Optional[MatchCache]:
+    """按配置创建的全局匹配缓存；MATCH_CACHE_ENABLED=false 时返回None"""
+    global _match_cache
+    if not settings.MATCH_CACHE_ENABLED:
+        return None
+    if _match_cache is None:
+        with _match_cache_lock:
+            if _match_cache is None:
+                _match_cache = MatchCache(
+                    max_entries=settings.MATCH_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.MATCH_CACHE_TTL_SECONDS,
+                    shared_path=settings.MATCH_CACHE_SQLITE_PATH
+                )
+    return _match_cache
+
+
+def invalidate_matches(*post_ids: int):
+    """帖子被编辑、认领或删除并提交后调用（缓存未启用时不做任何事）"""
+    match_cache = get_match_cache()
+    if match_cache is not None:
+        match_cache.invalidate(post_ids)
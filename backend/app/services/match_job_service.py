@@ -0,0 +1,269 @@
+"""
+智能匹配后台任务服务
+发帖时只写入一条匹配任务，由后台worker完成候选查询、相似度打分和匹配通知，
+发帖接口不再承担匹配开销。任务持久化在 match_jobs 表中，失败后按指数退避重试。
+任务中的查询、打分和提交都是同步的，worker 通过 asyncio.to_thread 在线程中执行，
+不占用事件循环；只有通知的WebSocket推送回到事件循环中发送
+"""
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import logging
+
+from sqlmodel import Session, select, update, and_
+
+from app.database import engine
+from app.models.post import Post
+from app.models.match_job import MatchJob, MatchJobStatus
+from app.models.notification import Notification
+from app.api.notifications import manager, notification_message
+from app.services.notification_service import NotificationService
+from app.services.text_similarity import TextSimilarityService
+from app.services.post_features import PostFeatureService
+from app.services.duplicate_detection import DuplicateDetectionService
+from app.services.location_index import LocationIndexService, LOCATION_MATCH_THRESHOLD
+from app.services.alert_service import AlertService
+from app.services.post_match_service import PostMatchService
+
+logger = logging.getLogger(__name__)
+
+# 相似度超过该阈值才发送匹配通知（0.3 = 30%）
+NOTIFY_THRESHOLD = 0.3
+# 重试退避基数（秒）：第n次失败后等待 RETRY_BASE_SECONDS * 2^(n-1)
+RETRY_BASE_SECONDS = 10
+# running 状态超过该时长视为worker异常退出，重新入队
+STALE_RUNNING_MINUTES = 10
+
+
+class MatchJobService:
+    """匹配任务的入队、执行与后台轮询"""
+
+    @staticmethod
+    def enqueue(session: Session, post_id: int) -> MatchJob:
+        """创建匹配任务（不提交事务，与帖子写入在同一事务中提交）"""
+        job = MatchJob(post_id=post_id)
+        session.add(job)
+        return job
+
+    @staticmethod
+    def get_latest_job(session: Session, post_id: int) -> Optional[MatchJob]:
+        """获取帖子最近一次的匹配任务"""
+        return session.exec(
+            select(MatchJob)
+            .where(MatchJob.post_id == post_id)
+            .order_by(MatchJob.created_at.desc(), MatchJob.id.desc())
+        ).first()
+
+    @staticmethod
+    def find_matches(session: Session, post: Post, limit: int = 10) -> List[Tuple[Post, float]]:
+        """查询与新帖子互补（lost <-> found）的候选帖子并计算文本相似度"""
+        target_type = "found" if post.item_type == "lost" else "lost"
+
+        match_query = select(Post).where(
+            and_(
+                Post.status.in_(["published", "active"]),
+                Post.item_type == target_type,
+                Post.is_claimed == False,
+                Post.id != post.id
+            )
+        )
+
+        # Filter by category if available
+        if post.category_id:
+            match_query = match_query.where(Post.category_id == post.category_id)
+
+        # Filter by location if available: 地点三元组相似度达到阈值的帖子
+        if post.location_normalized:
+            nearby = LocationIndexService.similarities(
+                session, post.location_normalized, min_similarity=LOCATION_MATCH_THRESHOLD
+            )
+            match_query = match_query.where(Post.id.in_(list(nearby.keys())))
+
+        # Filter by time range (7 days) if available
+        if post.item_time:
+            time_start = post.item_time - timedelta(days=7)
+            time_end = post.item_time + timedelta(days=7)
+            match_query = match_query.where(
+                and_(
+                    Post.item_time.isnot(None),
+                    Post.item_time >= time_start,
+                    Post.item_time <= time_end
+                )
+            )
+
+        match_query = match_query.order_by(Post.created_at.desc()).limit(limit)
+        potential_matches = list(session.exec(match_query).all())
+
+        # 同一重复簇只保留最新的一个帖子，避免重复帖子的作者收到多条相同通知
+        canonical = DuplicateDetectionService.canonical_ids(session, [match_post.id for match_post in potential_matches])
+        seen_clusters = set()
+        unique_matches = []
+        for match_post in potential_matches:
+            if canonical[match_post.id] not in seen_clusters:
+                seen_clusters.add(canonical[match_post.id])
+                unique_matches.append(match_post)
+        potential_matches = unique_matches
+
+        if not potential_matches:
+            return []
+
+        features = PostFeatureService.get_many(session, [post] + potential_matches)
+        scores = TextSimilarityService.calculate_batch_similarity_from_counts(
+            features[post.id].term_freqs,
+            [features[match_post.id].term_freqs for match_post in potential_matches]
+        )
+        return [
+            (match_post, float(score))
+            for match_post, score in zip(potential_matches, scores["combined"])
+        ]
+
+    @staticmethod
+    def run_job(session: Session, job: MatchJob) -> Tuple[dict, List[Notification]]:
+        """执行单个匹配任务：打分并通知匹配帖子的作者，返回结果摘要和待推送的通知"""
+        post = session.get(Post, job.post_id)
+        if not post or post.status not in ("published", "active") or post.item_type not in ("lost", "found"):
+            return {"skipped": True, "candidates": 0, "notified": 0, "alerts_notified": 0}, []
+
+        matches = MatchJobService.find_matches(session, post)
+
+        # 重试时跳过上次已经发出的通知，保证通知不重复
+        already_notified = {
+            (notification.extra_data or {}).get("matched_post_id")
+            for notification in session.exec(
+                select(Notification).where(Notification.related_post_id == post.id)
+            ).all()
+        }
+
+        notifications = []
+        for match_post, similarity_score in matches:
+            if similarity_score > NOTIFY_THRESHOLD and match_post.id not in already_notified:
+                notifications.append(NotificationService.create_matching_notification(
+                    session=session,
+                    user_id=match_post.author_id,
+                    new_post=post,
+                    matched_post=match_post,
+                    similarity_score=similarity_score
+                ))
+        notified = len(notifications)
+
+        # 新帖子同时经过一次percolator，通知保存了相应提醒的用户
+        alert_notifications = AlertService.notify_matches(session, post)
+        notifications.extend(alert_notifications)
+
+        return {
+            "skipped": False,
+            "candidates": len(matches),
+            "notified": notified,
+            "alerts_notified": len(alert_notifications)
+        }, notifications
+
+    @staticmethod
+    def claim_next(session: Session) -> Optional[MatchJob]:
+        """领取一个到期的待执行任务；通过条件更新保证多个worker不会重复领取"""
+        now = datetime.utcnow()
+        job = session.exec(
+            select(MatchJob)
+            .where(MatchJob.status == MatchJobStatus.PENDING, MatchJob.run_after <= now)
+            .order_by(MatchJob.run_after, MatchJob.id)
+        ).first()
+        if not job:
+            return None
+
+        claimed = session.exec(
+            update(MatchJob)
+            .where(MatchJob.id == job.id, MatchJob.status == MatchJobStatus.PENDING)
+            .values(status=MatchJobStatus.RUNNING, started_at=now, attempts=MatchJob.attempts + 1)
+        )
+        session.commit()
+        if claimed.rowcount != 1:
+            return None
+
+        session.refresh(job)
+        return job
+
+    @staticmethod
+    def execute_next() -> Tuple[bool, List[Tuple[int, dict]]]:
+        """
+        领取并执行一个任务（同步，在worker线程中调用），
+        返回是否有任务被处理，以及待推送的通知 [(user_id, 推送消息)]
+        """
+        with Session(engine) as session:
+            job = MatchJobService.claim_next(session)
+            if not job:
+                return False, []
+
+            pushes = []
+            try:
+                result, notifications = MatchJobService.run_job(session, job)
+                # 会话关闭后通知对象不可再读取，先生成推送消息
+                pushes = [(notification.user_id, notification_message(notification)) for notification in notifications]
+                if not result["skipped"]:
+                    # 物化新帖子的匹配结果，并让它可能挤进其结果的已有帖子重新计算；
+                    # 失败时整个任务按退避重试（匹配通知按 matched_post_id、提醒按 alert_matches 去重，不会重复发送）
+                    PostMatchService.refresh_new_post(session, session.get(Post, job.post_id))
+            except Exception as e:
+                session.rollback()
+                job = session.get(MatchJob, job.id)
+                job.last_error = str(e)[:500]
+                if job.attempts >= job.max_attempts:
+                    job.status = MatchJobStatus.FAILED
+                    job.finished_at = datetime.utcnow()
+                    logger.exception(f"[MATCH_JOB] Job {job.id} failed permanently after {job.attempts} attempts")
+                else:
+                    job.status = MatchJobStatus.PENDING
+                    job.run_after = datetime.utcnow() + timedelta(
+                        seconds=RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+                    )
+                    logger.warning(f"[MATCH_JOB] Job {job.id} attempt {job.attempts} failed, retry at {job.run_after}: {e}")
+            else:
+                job.status = MatchJobStatus.COMPLETED
+                job.result = result
+                job.last_error = None
+                job.finished_at = datetime.utcnow()
+
+            session.add(job)
+            session.commit()
+            return True, pushes
+
+    @staticmethod
+    async def process_next() -> bool:
+        """在线程中领取并执行一个任务，再在事件循环中推送通知，返回是否有任务被处理"""
+        processed, pushes = await asyncio.to_thread(MatchJobService.execute_next)
+        for user_id, message in pushes:
+            await manager.send_personal_message(message, user_id)
+        return processed
+
+    @staticmethod
+    def requeue_stale_jobs() -> int:
+        """把长时间停留在running的任务（worker中途退出）重新放回队列"""
+        cutoff = datetime.utcnow() - timedelta(minutes=STALE_RUNNING_MINUTES)
+        with Session(engine) as session:
+            result = session.exec(
+                update(MatchJob)
+                .where(MatchJob.status == MatchJobStatus.RUNNING, MatchJob.started_at < cutoff)
+                .values(status=MatchJobStatus.PENDING, run_after=datetime.utcnow())
+            )
+            session.commit()
+            return result.rowcount
+
+    @staticmethod
+    async def worker_loop(poll_interval: float = 2.0):
+        """后台worker：持续处理到期任务，队列为空时按间隔轮询"""
+        requeued = await asyncio.to_thread(MatchJobService.requeue_stale_jobs)
+        if requeued:
+            logger.info(f"[MATCH_JOB] Requeued {requeued} stale running jobs")
+
+        while True:
+            try:
+                processed = await MatchJobService.process_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("[MATCH_JOB] Worker iteration failed")
+                processed = False
+
+            if processed:
+                # 连续处理任务时也让出事件循环
+                await asyncio.sleep(0)
+            else:
+                await asyncio.sleep(poll_interval)
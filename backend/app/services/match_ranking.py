@@ -0,0 +1,453 @@
+"""
+智能匹配排序服务
+综合得分 = 文本相似度50% + 分类20% + 地点15% + 时间15%（各分项0-100）。
+top_k 在全部开放帖子上返回得分最高的k个匹配：各分项按得分降序分页读取（词项posting list按权重、
+同分类/时间窗口内的帖子按时间接近程度、地点按三元组相似度），新读到的帖子随机访问补齐其余分项后进入
+有界堆；当堆中第k名的得分不低于"尚未读到的帖子可能达到的得分上界"时提前终止（Threshold Algorithm / MaxScore），
+因此延迟取决于匹配的质量而不是语料规模。
+semantic_rank 以语义向量ANN索引的近邻为候选，文本分项取语义相似度与TF-IDF余弦的较大者，可匹配改写的描述。
+双方都有图片时综合得分再混入图片相似度（感知哈希的汉明距离，见 ImageHashService）：基础得分85% + 图片15%；
+top_k 中图片来源按多索引哈希半径查询的命中（距离升序）读取
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import timedelta
+import heapq
+
+from sqlmodel import Session, select, and_, case
+
+from app.models.post import Post
+from app.services.post_index import PostIndexService
+from app.services.post_features import PostFeatureService
+from app.services.location_index import LocationIndexService
+from app.services.duplicate_detection import DuplicateDetectionService
+from app.services.text_similarity import TextSimilarityService
+from app.services.embedding import EmbeddingService
+from app.services.ann_index import get_semantic_index
+from app.services.image_hash import ImageHashService, IMAGE_MATCH_RADIUS
+from app.services.image_index import get_image_index
+
+TEXT_WEIGHT = 0.50
+CATEGORY_WEIGHT = 0.20
+LOCATION_WEIGHT = 0.15
+TIME_WEIGHT = 0.15
+IMAGE_WEIGHT = 0.15  # 双方都有图片时图片相似度在综合得分中的占比（其余分项按比例缩小）
+MIN_MATCH_SCORE = 10  # 综合得分需高于该值才作为匹配返回
+
+PAGE_SIZE = 50  # 每个有序来源每次读取的条数
+SOURCES_PER_ROUND = 4  # 每轮推进的有序来源数
+LOCATION_SOURCE_MIN_SIMILARITY = 0.5  # 地点来源只列出相似度不低于该值的帖子，其余帖子地点得分上界按该值计
+SEMANTIC_CANDIDATES = 200  # 语义匹配从ANN索引取的近邻数（索引只收录开放帖子，过滤后再打分）
+
+
+class MatchRankingService:
+    """匹配打分与全量top-k检索"""
+
+    @staticmethod
+    def time_score(original_post: Post, post: Post, time_range_days: int) -> float:
+        """时间接近度得分（0-100）：找到时间须不早于丢失时间，同一天100分，超过time_range_days为0"""
+        if not (original_post.item_time and post.item_time):
+            return 0
+        if original_post.item_type == "lost" and post.item_time < original_post.item_time:
+            # Found before lost - invalid
+            return 0
+        if original_post.item_type == "found" and post.item_time > original_post.item_time:
+            # Lost after found - invalid
+            return 0
+        time_diff = abs((post.item_time - original_post.item_time).days)
+        return max(0, (1 - time_diff / time_range_days) * 100)
+
+    @staticmethod
+    def category_score(original_post: Post, post: Post) -> float:
+        return 100 if (original_post.category_id and original_post.category_id == post.category_id) else 0
+
+    @staticmethod
+    def final_score(
+        text_score: float,
+        category_score: float,
+        location_score: float,
+        time_score: float,
+        image_score: Optional[float] = None
+    ) -> float:
+        """加权综合得分，各分项均为0-100；image_score 为None（任一方没有图片）时不计图片分项"""
+        score = (text_score * TEXT_WEIGHT +
+                 category_score * CATEGORY_WEIGHT +
+                 location_score * LOCATION_WEIGHT +
+                 time_score * TIME_WEIGHT)
+        if image_score is None:
+            return score
+        return score * (1 - IMAGE_WEIGHT) + image_score * IMAGE_WEIGHT
+
+    @staticmethod
+    def candidate_filter(original_post: Post):
+        """候选帖子条件：互补类型、开放、未认领、非自身"""
+        target_type = "found" if original_post.item_type == "lost" else "lost"
+        return and_(
+            Post.status.in_(["published", "active"]),
+            Post.item_type == target_type,
+            Post.is_claimed == False,
+            Post.id != original_post.id
+        )
+
+    @staticmethod
+    def top_k(
+        session: Session,
+        original_post: Post,
+        limit: int = 10,
+        time_range_days: int = 7
+    ) -> List[Tuple[float, Post]]:
+        """在全部开放帖子中返回综合得分最高的limit个匹配 [(得分, 帖子)]，同一重复簇只保留最高分的帖子"""
+        target_type = "found" if original_post.item_type == "lost" else "lost"
+        candidate_filter = MatchRankingService.candidate_filter(original_post)
+
+        feature = PostFeatureService.get(session, original_post)
+        query_weights = PostIndexService.query_weights(
+            session, TextSimilarityService.term_frequencies_from_tokens(feature.tokens)
+        )
+
+        text_sources = [
+            _TermSource(session, term, target_type, weight)
+            for term, weight in query_weights.items()
+        ]
+
+        window = MatchRankingService._time_window(original_post, time_range_days)
+
+        # 同分类帖子：时间窗口内的按接近程度在前，其余在后（分类20分 + 时间分）
+        category_source = None
+        if original_post.category_id:
+            category_statement = select(Post).where(candidate_filter, Post.category_id == original_post.category_id)
+            if window is not None:
+                category_statement = category_statement.order_by(
+                    case((window, 0), else_=1), *MatchRankingService._closeness_order(original_post), Post.id
+                )
+            else:
+                category_statement = category_statement.order_by(Post.id)
+            category_source = _PostSource(
+                session, category_statement, (CATEGORY_WEIGHT + TIME_WEIGHT) * 100,
+                lambda post: CATEGORY_WEIGHT * 100 + TIME_WEIGHT * MatchRankingService.time_score(
+                    original_post, post, time_range_days
+                )
+            )
+
+        # 时间窗口内的帖子按接近程度（时间分）
+        time_source = None
+        if window is not None:
+            time_statement = (
+                select(Post)
+                .where(candidate_filter, window)
+                .order_by(*MatchRankingService._closeness_order(original_post), Post.id)
+            )
+            time_source = _PostSource(
+                session, time_statement, TIME_WEIGHT * 100,
+                lambda post: TIME_WEIGHT * MatchRankingService.time_score(original_post, post, time_range_days)
+            )
+
+        # 地点相似度较高的帖子（地点分）
+        location_source = None
+        if original_post.location_normalized:
+            location_source = _LocationSource(
+                LocationIndexService.similarities(
+                    session, original_post.location_normalized, min_similarity=LOCATION_SOURCE_MIN_SIMILARITY
+                )
+            )
+
+        # 图片哈希相近的帖子（图片分）
+        query_hashes = ImageHashService.post_hashes(session, [original_post.id]).get(original_post.id, [])
+        image_source = None
+        if query_hashes:
+            image_source = _ImageSource(
+                get_image_index().search(session, query_hashes, target_type, IMAGE_MATCH_RADIUS)
+            )
+
+        sources = [
+            source for source in [*text_sources, category_source, time_source, location_source, image_source]
+            if source
+        ]
+        heap = _ClusterTopK(limit)
+        seen = set()
+
+        while True:
+            new_ids = set()
+            loaded: Dict[int, Post] = {}
+            # 每轮只推进上界贡献最大的几个来源，尽快压低未读帖子的得分上界
+            active = sorted(
+                (source for source in sources if not source.exhausted),
+                key=lambda source: source.frontier, reverse=True
+            )[:SOURCES_PER_ROUND]
+            for source in active:
+                for item in source.next_page():
+                    if isinstance(item, Post):
+                        loaded[item.id] = item
+                        new_ids.add(item.id)
+                    else:
+                        new_ids.add(item)
+            new_ids -= seen
+            seen |= new_ids
+
+            if new_ids:
+                MatchRankingService._score_batch(
+                    session, original_post, list(new_ids), loaded, candidate_filter,
+                    query_weights, time_range_days, heap, query_hashes=query_hashes
+                )
+
+            # 尚未读到的帖子的得分上界
+            text_bound = sum(source.frontier for source in text_sources)
+            category_bound = category_source.frontier if category_source else 0
+            time_bound = time_source.frontier if time_source else 0
+            location_bound = location_source.frontier if location_source else 0
+            unseen_bound = text_bound + max(category_bound, time_bound) + location_bound
+            if image_source:
+                # 未读帖子要么没有图片（不计图片分），要么图片分不超过图片来源的frontier
+                unseen_bound = max(unseen_bound, unseen_bound * (1 - IMAGE_WEIGHT) + image_source.frontier)
+
+            if all(source.exhausted for source in sources) or heap.threshold() >= unseen_bound:
+                break
+
+        return heap.ranked()
+
+    @staticmethod
+    def semantic_rank(
+        session: Session,
+        original_post: Post,
+        limit: int = 10,
+        time_range_days: int = 7
+    ) -> List[Tuple[float, Post]]:
+        """语义匹配：在ANN索引给出的近邻中返回综合得分最高的limit个匹配 [(得分, 帖子)]"""
+        target_type = "found" if original_post.item_type == "lost" else "lost"
+        neighbours = get_semantic_index().search(
+            session, EmbeddingService.get_vector(session, original_post), target_type, SEMANTIC_CANDIDATES
+        )
+        semantic_scores = {post_id: max(0.0, similarity) for post_id, similarity in neighbours}
+        semantic_scores.pop(original_post.id, None)
+        if not semantic_scores:
+            return []
+
+        feature = PostFeatureService.get(session, original_post)
+        query_weights = PostIndexService.query_weights(
+            session, TextSimilarityService.term_frequencies_from_tokens(feature.tokens)
+        )
+        heap = _ClusterTopK(limit)
+        MatchRankingService._score_batch(
+            session, original_post, list(semantic_scores), {},
+            MatchRankingService.candidate_filter(original_post),
+            query_weights, time_range_days, heap, semantic_scores=semantic_scores
+        )
+        return heap.ranked()
+
+    @staticmethod
+    def _time_window(original_post: Post, time_range_days: int):
+        """时间分大于0的候选所在的item_time区间条件；原帖没有时间时返回None"""
+        if not original_post.item_time:
+            return None
+        if original_post.item_type == "lost":
+            return and_(
+                Post.item_time >= original_post.item_time,
+                Post.item_time < original_post.item_time + timedelta(days=time_range_days)
+            )
+        return and_(
+            Post.item_time <= original_post.item_time,
+            Post.item_time > original_post.item_time - timedelta(days=time_range_days + 1)
+        )
+
+    @staticmethod
+    def _closeness_order(original_post: Post):
+        """按与原帖时间的接近程度排序（只在有效方向的时间窗口内单调）"""
+        if original_post.item_type == "lost":
+            return [Post.item_time.asc()]
+        return [Post.item_time.desc()]
+
+    @staticmethod
+    def _score_batch(
+        session: Session,
+        original_post: Post,
+        post_ids: List[int],
+        loaded: Dict[int, Post],
+        candidate_filter,
+        query_weights: Dict[str, float],
+        time_range_days: int,
+        heap: "_ClusterTopK",
+        semantic_scores: Optional[Dict[int, float]] = None,
+        query_hashes: Optional[List[int]] = None
+    ):
+        """随机访问补齐一批新读到的帖子的全部分项并放入堆；给出semantic_scores时文本分项取其与TF-IDF余弦的较大者"""
+        missing = [post_id for post_id in post_ids if post_id not in loaded]
+        posts = [loaded[post_id] for post_id in post_ids if post_id in loaded]
+        if missing:
+            posts.extend(session.exec(select(Post).where(candidate_filter, Post.id.in_(missing))).all())
+        if not posts:
+            return
+
+        components = MatchRankingService.score_components(
+            session, original_post, posts, query_weights, time_range_days, semantic_scores, query_hashes
+        )
+        canonical = DuplicateDetectionService.canonical_ids(session, [post.id for post in posts])
+
+        for post in posts:
+            score = MatchRankingService.final_score(*components[post.id])
+            if score > MIN_MATCH_SCORE:
+                heap.push(score, post, canonical[post.id])
+
+    @staticmethod
+    def score_components(
+        session: Session,
+        original_post: Post,
+        posts: List[Post],
+        query_weights: Dict[str, float],
+        time_range_days: int,
+        semantic_scores: Optional[Dict[int, float]] = None,
+        query_hashes: Optional[List[int]] = None
+    ) -> Dict[int, Tuple[float, float, float, float, Optional[float]]]:
+        """
+        一批候选帖子的各分项得分 {post_id: (文本, 分类, 地点, 时间, 图片)}，均为0-100；
+        任一方没有图片时图片分项为None。query_hashes 为原帖的图片哈希，未给出时查询
+        """
+        ids = [post.id for post in posts]
+        text_scores = PostIndexService.text_scores(session, query_weights, ids)
+        location_similarities = LocationIndexService.similarities(
+            session, original_post.location_normalized, post_ids=ids
+        ) if original_post.location_normalized else {}
+        image_similarities = ImageHashService.similarities(session, original_post, ids, query_hashes)
+
+        components = {}
+        for post in posts:
+            text_score = text_scores.get(post.id, 0.0)
+            if semantic_scores:
+                text_score = max(text_score, semantic_scores.get(post.id, 0.0))
+            components[post.id] = (
+                text_score * 100,
+                MatchRankingService.category_score(original_post, post),
+                location_similarities.get(post.id, 0.0) * 100,
+                MatchRankingService.time_score(original_post, post, time_range_days),
+                image_similarities[post.id] * 100 if post.id in image_similarities else None
+            )
+        return components
+
+
+class _TermSource:
+    """单个查询词项的posting list（按权重降序），frontier为未读帖子在该词项上的得分上界（已加权）"""
+
+    def __init__(self, session: Session, term: str, item_type: str, query_weight: float):
+        self.session = session
+        self.term = term
+        self.item_type = item_type
+        self.query_weight = query_weight * 100 * TEXT_WEIGHT
+        self.offset = 0
+        self.frontier = self.query_weight  # 帖子向量已归一化，单个词项权重不超过1
+        self.exhausted = False
+
+    def next_page(self) -> List[int]:
+        rows = PostIndexService.postings_page(
+            self.session, self.term, self.item_type, offset=self.offset, limit=PAGE_SIZE
+        )
+        self.offset += len(rows)
+        if len(rows) < PAGE_SIZE:
+            self.exhausted = True
+            self.frontier = 0
+        else:
+            self.frontier = self.query_weight * rows[-1][1]
+        return [post_id for post_id, _ in rows]
+
+
+class _PostSource:
+    """按某个分项得分降序排列的帖子查询，frontier为未读帖子在该分项上的得分上界（已加权）"""
+
+    def __init__(self, session: Session, statement, max_value: float, value: Callable[[Post], float]):
+        self.session = session
+        self.statement = statement
+        self.value = value
+        self.offset = 0
+        self.frontier = max_value
+        self.exhausted = False
+
+    def next_page(self) -> List[Post]:
+        posts = list(self.session.exec(self.statement.offset(self.offset).limit(PAGE_SIZE)).all())
+        self.offset += len(posts)
+        if len(posts) < PAGE_SIZE:
+            self.exhausted = True
+            self.frontier = 0
+        else:
+            self.frontier = self.value(posts[-1])
+        return posts
+
+
+class _LocationSource:
+    """地点相似度不低于阈值的帖子（按相似度降序，已在内存中）"""
+
+    def __init__(self, similarities: Dict[int, float]):
+        self.ranked = sorted(similarities.items(), key=lambda item: item[1], reverse=True)
+        self.offset = 0
+        self.frontier = LOCATION_WEIGHT * 100
+        self.exhausted = False
+
+    def next_page(self) -> List[int]:
+        page = self.ranked[self.offset:self.offset + PAGE_SIZE]
+        self.offset += len(page)
+        if self.offset >= len(self.ranked):
+            self.exhausted = True
+            # 未列出的帖子地点相似度低于阈值
+            self.frontier = LOCATION_WEIGHT * 100 * LOCATION_SOURCE_MIN_SIMILARITY
+        else:
+            self.frontier = LOCATION_WEIGHT * 100 * page[-1][1]
+        return [post_id for post_id, _ in page]
+
+
+class _ImageSource:
+    """图片哈希半径查询命中的帖子（按汉明距离升序，已在内存中），frontier为未读帖子图片分的上界（已加权）"""
+
+    def __init__(self, hits: List[Tuple[int, int]]):
+        self.ranked = hits
+        self.offset = 0
+        self.frontier = IMAGE_WEIGHT * 100
+        self.exhausted = False
+
+    def next_page(self) -> List[int]:
+        page = self.ranked[self.offset:self.offset + PAGE_SIZE]
+        self.offset += len(page)
+        if self.offset >= len(self.ranked):
+            self.exhausted = True
+            # 半径之外的图片相似度为0
+            self.frontier = 0
+        else:
+            self.frontier = IMAGE_WEIGHT * 100 * ImageHashService.similarity(page[-1][1])
+        return [post_id for post_id, _ in page]
+
+
+class _ClusterTopK:
+    """容量为k的有界最小堆，同一重复簇只保留最高分的帖子（被替换的条目惰性删除）"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.heap: List[Tuple[float, int, int]] = []  # (得分, post_id, 簇id)
+        self.best: Dict[int, Tuple[float, Post]] = {}  # 簇id -> (得分, 帖子)
+
+    def _is_live(self, entry: Tuple[float, int, int]) -> bool:
+        score, post_id, cluster = entry
+        best = self.best.get(cluster)
+        return best is not None and best[1].id == post_id and best[0] == score
+
+    def _drop_stale(self):
+        while self.heap and not self._is_live(self.heap[0]):
+            heapq.heappop(self.heap)
+
+    def push(self, score: float, post: Post, cluster: int):
+        current = self.best.get(cluster)
+        if current is not None and current[0] >= score:
+            return
+        if len(self.best) >= self.k and current is None and score <= self.threshold():
+            return
+
+        self.best[cluster] = (score, post)
+        heapq.heappush(self.heap, (score, post.id, cluster))
+        while len(self.best) > self.k:
+            self._drop_stale()
+            _, _, evicted = heapq.heappop(self.heap)
+            del self.best[evicted]
+
+    def threshold(self) -> float:
+        """第k名的得分；堆未满时为最低匹配分"""
+        if len(self.best) < self.k:
+            return MIN_MATCH_SCORE
+        self._drop_stale()
+        return self.heap[0][0]
+
+    def ranked(self) -> List[Tuple[float, Post]]:
+        return sorted(self.best.values(), key=lambda item: (-item[0], item[1].id))
@@ -0,0 +1,177 @@
+"""
+可插拔的匹配引擎
+引擎负责 rerank 模式（及 topk / semantic 出错时的降级路径）的候选检索与文本相似度（0-1），
+分类/地点/时间分项和加权综合得分仍由 MatchRankingService 统一计算。
+内置引擎：
+- tfidf：倒排索引上的TF-IDF余弦（默认）
+- simple：最新的候选帖子上的词频余弦/Jaccard，不读倒排索引，开销最低
+- bm25：倒排索引检索 + BM25（IDF与平均文档长度来自语料统计），按查询帖子自身的BM25得分归一化
+部署时通过 MATCHING_ENGINE 选择默认引擎，单次请求可用 engine 参数覆盖；可用 register_engine 注册新的引擎
+"""
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+import heapq
+import math
+
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.post import Post
+from app.models.post_index import PostTerm
+from app.services.corpus_stats import CorpusStatsService
+from app.services.match_ranking import MatchRankingService
+from app.services.post_features import PostFeatureService
+from app.services.post_index import PostIndexService
+from app.services.text_similarity import TextSimilarityService
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_RESCORE_CANDIDATES = 300  # 按命中词项IDF之和预选后精确计算BM25的候选数
+
+
+class MatchingEngine:
+    """匹配引擎接口"""
+
+    name = ""
+    description = ""
+
+    def search(self, session: Session, original_post: Post, limit: int) -> List[Tuple[Post, float]]:
+        """在互补类型的开放帖子中检索候选，返回 [(帖子, 文本相似度0-1)]，按相似度降序"""
+        raise NotImplementedError
+
+    @staticmethod
+    def target_type(original_post: Post) -> str:
+        return "found" if original_post.item_type == "lost" else "lost"
+
+    @staticmethod
+    def load_ranked(session: Session, original_post: Post, scored: List[Tuple[int, float]]) -> List[Tuple[Post, float]]:
+        """按 [(post_id, 相似度)] 的顺序读取仍满足候选条件的帖子"""
+        if not scored:
+            return []
+        statement = select(Post).where(
+            MatchRankingService.candidate_filter(original_post),
+            Post.id.in_([post_id for post_id, _ in scored])
+        )
+        posts_by_id = {post.id: post for post in session.exec(statement).all()}
+        return [(posts_by_id[post_id], score) for post_id, score in scored if post_id in posts_by_id]
+
+
+class TfidfEngine(MatchingEngine):
+    name = "tfidf"
+    description = "TF-IDF cosine over the inverted index"
+
+    def search(self, session: Session, original_post: Post, limit: int) -> List[Tuple[Post, float]]:
+        feature = PostFeatureService.get(session, original_post)
+        hits = PostIndexService.search_terms(
+            session,
+            TextSimilarityService.term_frequencies_from_tokens(feature.tokens),
+            self.target_type(original_post),
+            exclude_post_id=original_post.id,
+            limit=limit
+        )
+        return self.load_ranked(session, original_post, hits)
+
+
+class SimpleEngine(MatchingEngine):
+    name = "simple"
+    description = "Cosine/Jaccard over token counts of the newest candidates (no index reads)"
+
+    def search(self, session: Session, original_post: Post, limit: int) -> List[Tuple[Post, float]]:
+        statement = (
+            select(Post)
+            .where(MatchRankingService.candidate_filter(original_post))
+            .order_by(Post.created_at.desc())
+            .limit(limit)
+        )
+        candidates = list(session.exec(statement).all())
+        if not candidates:
+            return []
+
+        features = PostFeatureService.get_many(session, [original_post] + candidates)
+        similarities = TextSimilarityService.calculate_batch_similarity_from_counts(
+            features[original_post.id].term_freqs,
+            [features[post.id].term_freqs for post in candidates]
+        )["combined"]
+        ranked = sorted(zip(candidates, similarities), key=lambda item: -item[1])
+        return [(post, float(score)) for post, score in ranked]
+
+
+class Bm25Engine(MatchingEngine):
+    name = "bm25"
+    description = "BM25 over the inverted index with corpus-statistics IDF"
+
+    @staticmethod
+    def idf(doc_count: int, doc_freq: int) -> float:
+        """BM25的IDF（Lucene形式，始终为正）"""
+        return math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    @staticmethod
+    def score(term_freqs: Dict[str, int], query_idf: Dict[str, float], avg_length: float) -> float:
+        """文档长度按不同词项数计，与语料统计的平均文档长度一致"""
+        length_norm = 1 - BM25_B + BM25_B * len(term_freqs) / avg_length if avg_length else 1.0
+        total = 0.0
+        for term, idf in query_idf.items():
+            tf = term_freqs.get(term, 0)
+            if tf:
+                total += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+        return total
+
+    def search(self, session: Session, original_post: Post, limit: int) -> List[Tuple[Post, float]]:
+        query_freqs = TextSimilarityService.term_frequencies_from_tokens(
+            PostFeatureService.get(session, original_post).tokens
+        )
+        if not query_freqs:
+            return []
+
+        doc_count = CorpusStatsService.get_doc_count(session)
+        doc_freqs = CorpusStatsService.get_doc_freqs(session, query_freqs.keys())
+        query_idf = {term: self.idf(doc_count, doc_freqs.get(term, 0)) for term in query_freqs}
+        avg_length = CorpusStatsService.get_average_doc_length(session)
+
+        # 预选：命中词项的IDF之和（tf按1计的BM25上界顺序）
+        matched: Dict[int, float] = defaultdict(float)
+        for post_id, term in session.exec(
+            select(PostTerm.post_id, PostTerm.term).where(
+                PostTerm.item_type == self.target_type(original_post),
+                PostTerm.term.in_(list(query_idf.keys()))
+            )
+        ):
+            matched[post_id] += query_idf[term]
+        matched.pop(original_post.id, None)
+        shortlist = heapq.nlargest(BM25_RESCORE_CANDIDATES, matched.items(), key=lambda item: item[1])
+        if not shortlist:
+            return []
+
+        posts = [post for post, _ in self.load_ranked(session, original_post, shortlist)]
+        features = PostFeatureService.get_many(session, posts)
+        self_score = self.score(query_freqs, query_idf, avg_length)
+        scored = []
+        for post in posts:
+            term_freqs = TextSimilarityService.term_frequencies_from_tokens(features[post.id].tokens)
+            similarity = min(1.0, self.score(term_freqs, query_idf, avg_length) / self_score) if self_score else 0.0
+            scored.append((post, similarity))
+        scored.sort(key=lambda item: (-item[1], item[0].id))
+        return scored[:limit]
+
+
+_engines: Dict[str, MatchingEngine] = {}
+
+
+def register_engine(engine: MatchingEngine):
+    _engines[engine.name] = engine
+
+
+def available_engines() -> List[str]:
+    return list(_engines)
+
+
+def get_matching_engine(name: Optional[str] = None) -> MatchingEngine:
+    """按名称获取引擎，未指定时使用 MATCHING_ENGINE 配置"""
+    name = name or settings.MATCHING_ENGINE
+    if name not in _engines:
+        raise ValueError(f"Unknown matching engine '{name}', available: {', '.join(_engines)}")
+    return _engines[name]
+
+
+for _engine in (TfidfEngine(), SimpleEngine(), Bm25Engine()):
+    register_engine(_engine)
@@ -5,7 +5,8 @@ from app.models.user import User
 from app.models.post import Post
 from app.models.claim import Claim
 from app.models.comment import Comment
-from app.api.notifications import create_notification
+from app.models.alert import SavedAlert
+from app.api.notifications import create_notification, save_notification
 
 class NotificationService:
     """通知服务类"""
@@ -114,21 +115,21 @@ class NotificationService:
             )
     
     @staticmethod
-    async def create_matching_notification(
+    def create_matching_notification(
         session: Session,
         user_id: int,
         new_post: "Post",
         matched_post: "Post",
         similarity_score: float
-    ):
-        """创建智能匹配通知"""
+    ) -> Notification:
+        """创建智能匹配通知（只落库，实时推送由后台匹配任务在事件循环中发送）"""
         title = "发现可能的匹配物品"
         item_type_label = "丢失" if matched_post.item_type == "lost" else "拾到"
         new_type_label = "拾到" if new_post.item_type == "found" else "丢失"
         
         content = f"您{item_type_label}的物品《{matched_post.title}》可能与新发布的{new_type_label}物品《{new_post.title}》匹配（相似度：{int(similarity_score * 100)}%）"
         
-        await create_notification(
+        return save_notification(
             session=session,
             user_id=user_id,
             title=title,
@@ -144,6 +145,32 @@ class NotificationService:
             }
         )
     
+    @staticmethod
+    def create_alert_match_notification(
+        session: Session,
+        alert: SavedAlert,
+        post: Post
+    ) -> Notification:
+        """创建物品提醒命中通知（只落库，实时推送由后台匹配任务在事件循环中发送）"""
+        title = "您的物品提醒有新的匹配"
+        type_label = "拾到" if post.item_type == "found" else "丢失"
+        content = f"新发布的{type_label}物品《{post.title}》符合您的提醒「{alert.keywords}」"
+        
+        return save_notification(
+            session=session,
+            user_id=alert.user_id,
+            title=title,
+            content=content,
+            notification_type=NotificationType.ALERT_MATCHED,
+            related_post_id=post.id,
+            extra_data={
+                "alert_id": alert.id,
+                "alert_keywords": alert.keywords,
+                "new_post_id": post.id,
+                "new_post_title": post.title
+            }
+        )
+    
     @staticmethod
     async def create_system_notification(
         session: Session,
@@ -195,6 +222,8 @@ class NotificationService:
             return settings.comment_notifications
         elif notification_type == NotificationType.SYSTEM_ANNOUNCEMENT:
             return settings.system_notifications
+        elif notification_type == NotificationType.ALERT_MATCHED:
+            return settings.system_notifications
         
         return True
 
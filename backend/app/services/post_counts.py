@@ -0,0 +1,215 @@
+"""
+帖子列表总数
+GET /posts/ 每次都要对与分页查询相同的筛选条件再执行一次 count 子查询。两种方式减少这部分开销：
+PostCountCache：按规范化后的筛选条件缓存精确总数（进程内LRU），本进程的帖子写操作提交后整体清空，其他进程的写入由短TTL兜底；
+PostCounterService：post_counters 表按 (状态, 物品类型, 分类, 是否认领) 维护帖子数，total=approx 时直接求和，不扫描 posts。
+计数随写路径增量维护，绕过API的批量导入可能使其偏离，启动时总数不一致则重建
+"""
+from typing import Optional, Tuple
+from collections import Counter, OrderedDict
+import logging
+import threading
+import time
+
+from sqlmodel import Session, select, update, delete, func
+
+from app.core.config import settings
+from app.core.upsert import increment
+from app.models.post import Post
+from app.models.post_counter import PostCounter
+
+logger = logging.getLogger(__name__)
+
+LISTED_STATUSES = ("published", "active")  # 出现在帖子列表中的状态
+
+CounterKey = Tuple[str, str, int, bool]
+
+
+class PostCounterService:
+    """post_counters 的增量维护与总数估算"""
+
+    @staticmethod
+    def key(post: Post) -> CounterKey:
+        """帖子所属的计数分组；编辑前先取出，与编辑后的分组比较"""
+        return (post.status, post.item_type, post.category_id or 0, bool(post.is_claimed))
+
+    @staticmethod
+    def _adjust(session: Session, key: CounterKey, delta: int):
+        status, item_type, category_id, is_claimed = key
+        if delta > 0:
+            # 计数行不存在时插入，并发写入同一个新组合也不会主键冲突
+            increment(session, PostCounter, [{
+                "status": status, "item_type": item_type, "category_id": category_id, "is_claimed": is_claimed
+            }], "count", delta)
+            return
+        # 原子自减，避免并发写入时的读-改-写竞争
+        session.exec(
+            update(PostCounter)
+            .where(
+                PostCounter.status == status,
+                PostCounter.item_type == item_type,
+                PostCounter.category_id == category_id,
+                PostCounter.is_claimed == is_claimed
+            )
+            .values(count=PostCounter.count + delta)
+        )
+
+    @staticmethod
+    def sync_post(session: Session, post: Post, previous_key: Optional[CounterKey] = None):
+        """
+        发帖（previous_key 为空）或修改状态/类型/分类/认领状态后调用（不提交事务）
+        previous_key 为修改前的 PostCounterService.key(post)
+        """
+        new_key = PostCounterService.key(post)
+        if previous_key == new_key:
+            return
+        if previous_key is not None:
+            PostCounterService._adjust(session, previous_key, -1)
+        PostCounterService._adjust(session, new_key, 1)
+
+    @staticmethod
+    def estimate(
+        session: Session,
+        item_type: Optional[str] = None,
+        category_id: Optional[int] = None,
+        is_claimed: Optional[bool] = None
+    ) -> int:
+        """列表中满足筛选条件的帖子数（由计数求和，与 list_posts 的筛选语义一致）"""
+        statement = select(func.coalesce(func.sum(PostCounter.count), 0)).where(
+            PostCounter.status.in_(LISTED_STATUSES)
+        )
+        if item_type:
+            statement = statement.where(PostCounter.item_type == item_type)
+        if category_id:
+            statement = statement.where(PostCounter.category_id == category_id)
+        if is_claimed is not None:
+            statement = statement.where(PostCounter.is_claimed == is_claimed)
+        return max(int(session.exec(statement).one()), 0)
+
+    @staticmethod
+    def rebuild(session: Session) -> int:
+        """按 posts 重新统计全部计数并提交，返回分组数"""
+        session.exec(delete(PostCounter))
+        rows = session.exec(
+            select(Post.status, Post.item_type, func.coalesce(Post.category_id, 0), Post.is_claimed, func.count())
+            .group_by(Post.status, Post.item_type, func.coalesce(Post.category_id, 0), Post.is_claimed)
+        ).all()
+        session.add_all([
+            PostCounter(status=status, item_type=item_type, category_id=category_id, is_claimed=bool(is_claimed), count=count)
+            for status, item_type, category_id, is_claimed, count in rows
+        ])
+        session.commit()
+        return len(rows)
+
+    @staticmethod
+    def ensure_built(session: Session) -> bool:
+        """计数之和与帖子总数不一致（首次启动、绕过API导入数据）时重建，返回是否重建"""
+        counted = session.exec(select(func.coalesce(func.sum(PostCounter.count), 0))).one()
+        if counted == session.exec(select(func.count()).select_from(Post)).one():
+            return False
+        groups = PostCounterService.rebuild(session)
+        logger.info(f"[POST_COUNTS] Rebuilt post counters ({groups} groups)")
+        return True
+
+
+class PostCountCache:
+    """精确总数缓存（线程安全）"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()  # key -> (总数, 过期时间)
+        self._counters = Counter()
+        self._generation = 0  # 每次清空加1，用于丢弃计数期间发生过写入的结果
+
+    @staticmethod
+    def make_key(
+        item_type: Optional[str],
+        category_id: Optional[int],
+        is_claimed: Optional[bool],
+        search: Optional[str]
+    ) -> str:
+        """规范化筛选条件：与 list_posts 一样，空字符串、0 等同于未筛选"""
+        return "|".join([
+            item_type or "",
+            str(category_id) if category_id else "",
+            "" if is_claimed is None else str(int(is_claimed)),
+            search or ""
+        ])
+
+    def get(self, key: str) -> Optional[int]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return entry[0]
+                del self._entries[key]
+            self._counters["misses"] += 1
+            return None
+
+    def generation(self) -> int:
+        """执行 count 查询前读取，写入缓存时传回 set()"""
+        with self._lock:
+            return self._generation
+
+    def set(self, key: str, total: int, generation: Optional[int] = None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (total, time.time() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._counters["invalidations"] += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "hits": self._counters["hits"],
+                "misses": self._counters["misses"],
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+                "invalidations": self._counters["invalidations"],
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def count(self, session: Session, key: str, statement) -> int:
+        """statement 的结果行数，命中缓存时不查询"""
+        total = self.get(key)
+        if total is None:
+            generation = self.generation()
+            total = session.exec(select(func.count()).select_from(statement.subquery())).one()
+            self.set(key, total, generation)
+        return total
+
+
+_post_count_cache: Optional[PostCountCache] = None
+_post_count_cache_lock = threading.Lock()
+
+
+def get_post_count_cache() -> PostCountCache:
+    global _post_count_cache
+    if _post_count_cache is None:
+        with _post_count_cache_lock:
+            if _post_count_cache is None:
+                _post_count_cache = PostCountCache(
+                    max_entries=settings.POST_COUNT_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.POST_COUNT_CACHE_TTL_SECONDS
+                )
+    return _post_count_cache
+
+
+def invalidate_post_counts():
+    """帖子发布、编辑、删除或认领并提交后调用"""
+    get_post_count_cache().clear()
@@ -0,0 +1,69 @@
+"""
+帖子文本特征服务
+发帖/编辑标题或内容时计算一次分词结果与词频并持久化，
+匹配、索引同步时直接读取，避免对每个候选重复执行正则分词
+"""
+from typing import Dict, List
+from collections import Counter
+from datetime import datetime
+
+from sqlmodel import Session, select
+
+from app.models.post import Post
+from app.models.post_feature import PostTextFeature
+from app.services.text_similarity import TextSimilarityService
+
+
+class PostFeatureService:
+    """文本特征的计算、持久化与批量读取"""
+
+    @staticmethod
+    def compute(post: Post) -> PostTextFeature:
+        """计算帖子的文本特征（不入库）"""
+        tokens = TextSimilarityService.simple_tokenize(f"{post.title} {post.content}")
+        return PostTextFeature(
+            post_id=post.id,
+            tokens=tokens,
+            term_freqs=dict(Counter(tokens)),
+            token_count=len(tokens)
+        )
+
+    @staticmethod
+    def refresh(session: Session, post: Post) -> PostTextFeature:
+        """重新计算并保存帖子的文本特征（不提交事务），标题或内容变化时调用"""
+        computed = PostFeatureService.compute(post)
+
+        feature = session.get(PostTextFeature, post.id)
+        if feature is None:
+            feature = computed
+        else:
+            feature.tokens = computed.tokens
+            feature.term_freqs = computed.term_freqs
+            feature.token_count = computed.token_count
+            feature.updated_at = datetime.utcnow()
+
+        session.add(feature)
+        return feature
+
+    @staticmethod
+    def get(session: Session, post: Post) -> PostTextFeature:
+        """读取帖子的文本特征；尚未计算过（历史数据）时临时计算"""
+        feature = session.get(PostTextFeature, post.id)
+        return feature if feature is not None else PostFeatureService.compute(post)
+
+    @staticmethod
+    def get_many(session: Session, posts: List[Post]) -> Dict[int, PostTextFeature]:
+        """一次查询批量读取多个帖子的文本特征，缺失的临时计算"""
+        post_ids = [post.id for post in posts]
+        features = {
+            feature.post_id: feature
+            for feature in session.exec(
+                select(PostTextFeature).where(PostTextFeature.post_id.in_(post_ids))
+            ).all()
+        } if post_ids else {}
+
+        for post in posts:
+            if post.id not in features:
+                features[post.id] = PostFeatureService.compute(post)
+
+        return features
@@ -0,0 +1,118 @@
+"""
+帖子列表的字段选择（fields= 参数）
+fields 为逗号分隔的字段名，可用 PostRead 的字段以及 thumbnail（首张图片）；
+summary 展开为 PostSummary 的字段。只查询所选字段对应的列，只加载所选的关系，
+评论数、认领数直接读取帖子的计数列，不加载评论内容。未给出 fields 时返回完整的 PostRead。
+两种序列化方式：apply + serialize 走 ORM 实体与 pydantic 模型；select_rows + serialize_rows 直接查询
+Core 行并组装字典（app/core/row_serialization.py），用于热点列表接口
+"""
+from typing import List, Optional, Tuple, Type
+from functools import lru_cache
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+from sqlmodel import Session
+
+from app.core.eager_loading import eager_options
+from app.core.row_serialization import row_select, rows_to_dicts
+from app.models.post import Post
+from app.schemas.post import PostRead, PostSummary
+
+COMPUTED_FIELDS = ("thumbnail",)
+SUMMARY_ALIAS = "summary"
+ALWAYS_LOADED = ("id", "created_at")  # 排序与游标分页需要
+
+
+class PostFieldsService:
+    """解析 fields 参数，按所选字段裁剪查询与序列化"""
+
+    @staticmethod
+    def available_fields() -> Tuple[str, ...]:
+        return tuple(PostRead.model_fields) + COMPUTED_FIELDS
+
+    @staticmethod
+    def parse(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+        """fields 参数 -> 按固定顺序排列的字段元组（总是包含id）；未给出时返回None，未知字段返回400"""
+        if not fields or not fields.strip():
+            return None
+        requested = set()
+        for name in fields.split(","):
+            name = name.strip()
+            if name == SUMMARY_ALIAS:
+                requested.update(PostSummary.model_fields)
+            elif name:
+                requested.add(name)
+
+        available = PostFieldsService.available_fields()
+        unknown = sorted(requested - set(available))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        requested.add("id")
+        return tuple(name for name in available if name in requested)
+
+    @staticmethod
+    def apply(statement, fields: Optional[Tuple[str, ...]]):
+        """给帖子查询加上列裁剪与关系预加载"""
+        if fields is None:
+            return statement.options(*eager_options(Post, PostRead))
+        columns = set(inspect(Post).column_attrs.keys())
+        loaded = set(ALWAYS_LOADED) | {name for name in fields if name in columns}
+        if "thumbnail" in fields:
+            loaded.add("images")
+        return statement.options(
+            load_only(*(getattr(Post, name) for name in sorted(loaded))),
+            *eager_options(Post, _fields_schema(fields))
+        )
+
+    @staticmethod
+    def schema(fields: Optional[Tuple[str, ...]]) -> Type[BaseModel]:
+        """fields 对应的响应模型（不含计算字段）"""
+        return PostRead if fields is None else _fields_schema(fields)
+
+    @staticmethod
+    def select_rows(fields: Optional[Tuple[str, ...]]):
+        """只选出所需列的帖子 Core 查询，代替 select(Post) 再添加筛选条件"""
+        extra = ALWAYS_LOADED + (("images",) if fields is not None and "thumbnail" in fields else ())
+        return row_select(Post, PostFieldsService.schema(fields), extra)
+
+    @staticmethod
+    def serialize_rows(session: Session, rows: list, fields: Optional[Tuple[str, ...]]) -> List[dict]:
+        """select_rows 查询出的行 -> JSON 字典列表（datetime 保持原样，由 ORJSONResponse 序列化）"""
+        result = rows_to_dicts(session, Post, PostFieldsService.schema(fields), rows)
+        if fields is not None and "thumbnail" in fields:
+            for row, item in zip(rows, result):
+                item["thumbnail"] = row.images[0] if row.images else None
+        return result
+
+    @staticmethod
+    def serialize(session: Session, posts: List[Post], fields: Optional[Tuple[str, ...]]) -> List[dict]:
+        """帖子 -> JSON 字典列表，只包含所选字段"""
+        if fields is None:
+            return [PostRead.model_validate(post).model_dump(mode='json') for post in posts]
+
+        schema = _fields_schema(fields)
+        result = []
+        for post in posts:
+            item = schema.model_validate(post).model_dump(mode='json')
+            if "thumbnail" in fields:
+                item["thumbnail"] = post.images[0] if post.images else None
+            result.append(item)
+        return result
+
+
+@lru_cache(maxsize=256)
+def _fields_schema(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """PostRead 中所选字段组成的响应模型（计算字段在序列化时补上）"""
+    return create_model(
+        "PostFields",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            name: (PostRead.model_fields[name].annotation, PostRead.model_fields[name])
+            for name in fields if name in PostRead.model_fields
+        }
+    )
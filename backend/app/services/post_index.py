@@ -0,0 +1,220 @@
+"""
+帖子倒排索引服务
+维护 词项 -> 开放失物/招领帖子 的倒排表，智能匹配直接在全量开放帖子上检索，
+不再局限于最新的100条。词项权重为 TF-IDF（IDF 来自增量维护的语料统计）
+"""
+from typing import Dict, List, Optional, Tuple
+from collections import Counter, defaultdict
+import heapq
+import math
+import logging
+
+from sqlmodel import Session, select, delete, func
+
+from app.models.post import Post
+from app.models.post_index import PostTerm
+from app.models.post_feature import PostTextFeature
+from app.services.text_similarity import TextSimilarityService
+from app.services.corpus_stats import CorpusStatsService
+from app.services.post_features import PostFeatureService
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = ("published", "active")
+MATCHABLE_TYPES = ("lost", "found")
+
+
+class PostIndexService:
+    """倒排索引维护与检索"""
+
+    @staticmethod
+    def is_indexable(post: Post) -> bool:
+        """只有开放（已发布、未认领）的失物/招领帖子进入索引"""
+        return (
+            post.id is not None
+            and post.status in OPEN_STATUSES
+            and post.item_type in MATCHABLE_TYPES
+            and not post.is_claimed
+        )
+
+    @staticmethod
+    def build_weights(term_freqs: Dict[str, int], idf: Dict[str, float]) -> Dict[str, float]:
+        """TF-IDF向量做L2归一化，查询向量与帖子向量的点积即为余弦相似度"""
+        weights = {term: tf * idf.get(term, 1.0) for term, tf in term_freqs.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        if norm == 0:
+            return {}
+        return {term: w / norm for term, w in weights.items()}
+
+    @staticmethod
+    def remove_post(session: Session, post_id: int):
+        """从索引中移除帖子（不提交事务）"""
+        session.exec(delete(PostTerm).where(PostTerm.post_id == post_id))
+
+    @staticmethod
+    def sync_post(session: Session, post: Post):
+        """
+        根据帖子当前状态同步索引与语料统计（不提交事务，由调用方统一commit）
+        创建、编辑、认领、软删除之后都应调用
+        """
+        old_terms = session.exec(select(PostTerm.term).where(PostTerm.post_id == post.id)).all()
+        PostIndexService.remove_post(session, post.id)
+
+        term_freqs = Counter()
+        if PostIndexService.is_indexable(post):
+            feature = PostFeatureService.get(session, post)
+            term_freqs = TextSimilarityService.term_frequencies_from_tokens(feature.tokens)
+
+        CorpusStatsService.update_document(session, old_terms, term_freqs.keys())
+        if not term_freqs:
+            return
+
+        idf = CorpusStatsService.get_idf(session, term_freqs.keys())
+        weights = PostIndexService.build_weights(term_freqs, idf)
+        session.add_all([
+            PostTerm(term=term, post_id=post.id, item_type=post.item_type, weight=weight)
+            for term, weight in weights.items()
+        ])
+
+    @staticmethod
+    def search(
+        session: Session,
+        text: str,
+        item_type: str,
+        exclude_post_id: Optional[int] = None,
+        limit: int = 100
+    ) -> List[Tuple[int, float]]:
+        """
+        在目标类型的开放帖子中检索，返回 [(post_id, 文本相似度0-1)]，按相似度降序
+        只读取查询词项对应的posting list，开销与命中的倒排表长度成正比
+        """
+        return PostIndexService.search_terms(
+            session,
+            TextSimilarityService.term_frequencies(text),
+            item_type,
+            exclude_post_id=exclude_post_id,
+            limit=limit
+        )
+
+    @staticmethod
+    def search_terms(
+        session: Session,
+        term_freqs: Dict[str, int],
+        item_type: str,
+        exclude_post_id: Optional[int] = None,
+        limit: int = 100
+    ) -> List[Tuple[int, float]]:
+        """同 search，查询词频已预先计算（如来自帖子的文本特征）"""
+        query_weights = PostIndexService.query_weights(session, term_freqs)
+        if not query_weights:
+            return []
+
+        statement = select(PostTerm.post_id, PostTerm.term, PostTerm.weight).where(
+            PostTerm.item_type == item_type,
+            PostTerm.term.in_(list(query_weights.keys()))
+        )
+
+        scores: Dict[int, float] = defaultdict(float)
+        for post_id, term, weight in session.exec(statement):
+            scores[post_id] += query_weights[term] * weight
+
+        scores.pop(exclude_post_id, None)
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    @staticmethod
+    def query_weights(session: Session, term_freqs: Dict[str, int]) -> Dict[str, float]:
+        """查询向量：按当前IDF计算并L2归一化的词项权重"""
+        idf = CorpusStatsService.get_idf(session, term_freqs.keys())
+        return PostIndexService.build_weights(term_freqs, idf)
+
+    @staticmethod
+    def postings_page(
+        session: Session,
+        term: str,
+        item_type: str,
+        offset: int = 0,
+        limit: int = 50
+    ) -> List[Tuple[int, float]]:
+        """按权重降序分页读取词项的posting list，返回 [(post_id, 权重)]，供top-k检索提前终止"""
+        statement = (
+            select(PostTerm.post_id, PostTerm.weight)
+            .where(PostTerm.term == term, PostTerm.item_type == item_type)
+            .order_by(PostTerm.weight.desc(), PostTerm.post_id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(session.exec(statement).all())
+
+    @staticmethod
+    def text_scores(session: Session, query_weights: Dict[str, float], post_ids: List[int]) -> Dict[int, float]:
+        """随机访问：计算指定帖子与查询向量的文本相似度 {post_id: 0-1}"""
+        if not query_weights or not post_ids:
+            return {}
+
+        # 只按post_id索引读取（每个帖子的词项数有限），词项在内存中过滤；
+        # 同时按词项过滤会让SQLite选择词项索引而扫描常见词的整条posting list
+        statement = select(PostTerm.post_id, PostTerm.term, PostTerm.weight).where(
+            PostTerm.post_id.in_(post_ids)
+        )
+
+        scores: Dict[int, float] = defaultdict(float)
+        for post_id, term, weight in session.exec(statement):
+            if term in query_weights:
+                scores[post_id] += query_weights[term] * weight
+        return scores
+
+    @staticmethod
+    def rebuild(session: Session, refresh_features: bool = False) -> int:
+        """
+        全量重建索引与语料统计（同时刷新旧帖子的IDF权重），返回入索引的帖子数
+        refresh_features=True 时按当前分词器重新计算所有文本特征（切换分词器后使用）
+        """
+        posts = session.exec(
+            select(Post).where(
+                Post.status.in_(OPEN_STATUSES),
+                Post.item_type.in_(MATCHABLE_TYPES),
+                Post.is_claimed == False
+            )
+        ).all()
+
+        if refresh_features:
+            session.exec(delete(PostTextFeature))
+
+        features = PostFeatureService.get_many(session, posts)
+        documents = []
+        doc_freqs = Counter()
+        for post in posts:
+            # 顺带补齐历史帖子缺失的文本特征
+            session.add(features[post.id])
+            term_freqs = TextSimilarityService.term_frequencies_from_tokens(features[post.id].tokens)
+            if term_freqs:
+                documents.append((post, term_freqs))
+                doc_freqs.update(term_freqs.keys())
+
+        session.exec(delete(PostTerm))
+        CorpusStatsService.reset(session, len(documents), doc_freqs)
+
+        doc_count = len(documents)
+        idf = {term: CorpusStatsService.compute_idf(doc_count, df) for term, df in doc_freqs.items()}
+        for post, term_freqs in documents:
+            weights = PostIndexService.build_weights(term_freqs, idf)
+            session.add_all([
+                PostTerm(term=term, post_id=post.id, item_type=post.item_type, weight=weight)
+                for term, weight in weights.items()
+            ])
+
+        session.commit()
+        return len(documents)
+
+    @staticmethod
+    def ensure_built(session: Session) -> int:
+        """索引为空但存在开放帖子时（如首次升级）自动回填"""
+        if session.exec(select(func.count()).select_from(PostTerm)).one() > 0:
+            CorpusStatsService.ensure_term_count(session)
+            return 0
+
+        indexed = PostIndexService.rebuild(session)
+        if indexed:
+            logger.info(f"[POST_INDEX] Backfilled inverted index with {indexed} posts")
+        return indexed
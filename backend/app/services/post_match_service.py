@@ -0,0 +1,141 @@
+"""
+物化匹配结果服务
+失物/招领帖子的 top-k 匹配结果（含各分项得分）写入 post_matches，post_match_states 记录计算参数与时间。
+/posts/{post_id}/matches 在结果新鲜时只需按 (post_id, score) 索引做一次范围读取，不必重新打分。
+结果失效的时机：
+- 帖子本身被编辑（updated_at 晚于计算时间）；
+- 结果中的候选帖子被编辑、认领、删除（invalidate 删除引用它的状态）；
+- 新帖子发布后，后台匹配任务以新帖子为查询计算一次 top-k，得分足以挤进对方现有结果的候选帖子的状态被删除；
+- 超过 MATCH_TABLE_MAX_AGE_SECONDS 兜底（新帖子对未进入其 top-k 的帖子的影响）
+"""
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, select, delete, func, or_
+
+from app.core.config import settings
+from app.models.post import Post
+from app.models.post_match import PostMatch, PostMatchState
+from app.services.match_ranking import MatchRankingService
+from app.services.post_index import PostIndexService
+from app.services.post_features import PostFeatureService
+from app.services.text_similarity import TextSimilarityService
+
+DEFAULT_LIMIT = 10  # 后台匹配任务为新帖子物化的候选数（与匹配接口的默认limit一致）
+DEFAULT_TIME_RANGE_DAYS = 7
+
+
+class PostMatchService:
+    """post_matches 的读取、写入与失效"""
+
+    @staticmethod
+    def get_fresh(
+        session: Session,
+        post: Post,
+        limit: int,
+        time_range_days: int
+    ) -> Optional[List[Tuple[float, Post]]]:
+        """返回新鲜的物化结果 [(得分, 帖子)]（最多limit个，按得分降序）；没有可用结果时返回None"""
+        state = session.get(PostMatchState, post.id)
+        if (
+            state is None
+            or state.time_range_days != time_range_days
+            or state.candidate_limit < limit
+            or state.computed_at < datetime.utcnow() - timedelta(seconds=settings.MATCH_TABLE_MAX_AGE_SECONDS)
+            or state.computed_at < (post.updated_at or post.created_at)
+        ):
+            return None
+
+        rows = session.exec(
+            select(PostMatch.score, Post)
+            .join(Post, Post.id == PostMatch.candidate_id)
+            .where(PostMatch.post_id == post.id, MatchRankingService.candidate_filter(post))
+            .order_by(PostMatch.score.desc(), PostMatch.candidate_id)
+            .limit(limit)
+        ).all()
+        return [(score, candidate) for score, candidate in rows]
+
+    @staticmethod
+    def store(
+        session: Session,
+        post: Post,
+        ranked: List[Tuple[float, Post]],
+        limit: int,
+        time_range_days: int,
+        computed_at: Optional[datetime] = None
+    ):
+        """用 top_k 的结果替换帖子的物化匹配（不提交事务）；computed_at 为排序计算的时间，默认为当前时间"""
+        components = {}
+        if ranked:
+            feature = PostFeatureService.get(session, post)
+            query_weights = PostIndexService.query_weights(
+                session, TextSimilarityService.term_frequencies_from_tokens(feature.tokens)
+            )
+            components = MatchRankingService.score_components(
+                session, post, [candidate for _, candidate in ranked], query_weights, time_range_days
+            )
+
+        now = computed_at or datetime.utcnow()
+        session.exec(delete(PostMatch).where(PostMatch.post_id == post.id))
+        session.add_all([
+            PostMatch(
+                post_id=post.id, candidate_id=candidate.id,
+                text_score=round(components[candidate.id][0], 4),
+                category_score=components[candidate.id][1],
+                location_score=round(components[candidate.id][2], 4),
+                time_score=round(components[candidate.id][3], 4),
+                image_score=None if components[candidate.id][4] is None else round(components[candidate.id][4], 4),
+                score=round(score, 4), computed_at=now
+            )
+            for score, candidate in ranked
+        ])
+        PostMatchService.mark_fresh(session, post.id, limit, time_range_days, now)
+
+    @staticmethod
+    def mark_fresh(session: Session, post_id: int, limit: int, time_range_days: int, computed_at: datetime):
+        state = session.get(PostMatchState, post_id)
+        if state is None:
+            state = PostMatchState(post_id=post_id, candidate_limit=limit, time_range_days=time_range_days)
+        state.candidate_limit = limit
+        state.time_range_days = time_range_days
+        state.computed_at = computed_at
+        session.add(state)
+
+    @staticmethod
+    def invalidate(session: Session, post_id: int):
+        """帖子被编辑、认领或删除后调用（不提交事务）：它自己以及结果中包含它的帖子都需要重新计算"""
+        referencing = select(PostMatch.post_id).where(PostMatch.candidate_id == post_id)
+        session.exec(delete(PostMatchState).where(
+            or_(PostMatchState.post_id == post_id, PostMatchState.post_id.in_(referencing))
+        ))
+
+    @staticmethod
+    def refresh_new_post(session: Session, post: Post) -> int:
+        """
+        新帖子发布后（后台匹配任务中）调用，不提交事务：物化新帖子自己的匹配，
+        并让"新帖子得分足以进入其现有结果"的候选帖子的结果失效（以新帖子为查询的得分近似对方视角的得分），
+        返回失效的帖子数
+        """
+        ranked = MatchRankingService.top_k(
+            session, post, limit=DEFAULT_LIMIT, time_range_days=DEFAULT_TIME_RANGE_DAYS
+        )
+        PostMatchService.store(session, post, ranked, DEFAULT_LIMIT, DEFAULT_TIME_RANGE_DAYS)
+        if not ranked:
+            return 0
+
+        candidate_ids = [candidate.id for _, candidate in ranked]
+        scores = {candidate.id: score for score, candidate in ranked}
+        # 每个候选现有结果的条数与最低分
+        existing = session.exec(
+            select(PostMatchState, func.count(PostMatch.id), func.min(PostMatch.score))
+            .outerjoin(PostMatch, PostMatch.post_id == PostMatchState.post_id)
+            .where(PostMatchState.post_id.in_(candidate_ids))
+            .group_by(PostMatchState.post_id)
+        ).all()
+        stale = [
+            state.post_id for state, count, lowest in existing
+            if count < state.candidate_limit or scores[state.post_id] > lowest
+        ]
+        if stale:
+            session.exec(delete(PostMatchState).where(PostMatchState.post_id.in_(stale)))
+        return len(stale)
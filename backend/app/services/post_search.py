@@ -0,0 +1,208 @@
+"""
+帖子全文检索服务
+SQLite：FTS5 虚表 post_search（rowid 即帖子id），标题和内容按"中文二元组 + 英文/数字词"写入，unicode61 分词。
+连续中文切成重叠的二字词（"校园卡" -> "校园 园卡"），查询时每段中文作为二字词短语匹配，命中行再按子串核对，效果等同子串匹配且不依赖词典；
+英文/数字按词前缀匹配（"phone" 能匹配 "phones"，但匹配不到词中间的 "iPhone"）。结果按 bm25 相关度排序（标题权重2、内容1）。
+含英文/数字词的查询在全文索引中没有任何命中时退回 LIKE 子串匹配，保留旧版 LIKE 检索能找到的词中子串结果。
+二元组在 Python 中生成，因此由写路径（发帖、编辑标题/内容）同步，启动时行数与 posts 不一致则全量重建。
+PostgreSQL：posts.title / posts.content 上的 pg_trgm GIN 索引支撑 ILIKE 子串过滤，按 word_similarity 排序。
+无法使用全文索引时（单个汉字的查询、FTS5 / pg_trgm 不可用）退回 LIKE 扫描
+"""
+from typing import List, Optional, Tuple
+import logging
+import re
+import unicodedata
+
+from sqlalchemy import Column, Integer, MetaData, Table, Text, literal_column, text
+from sqlmodel import Session, select, func, or_
+
+from app.models.post import Post
+
+logger = logging.getLogger(__name__)
+
+TITLE_WEIGHT = 2.0  # bm25 中标题相对内容的权重
+
+_TOKEN_PATTERN = re.compile(r'[\u4e00-\u9fa5]+|[a-z0-9]+')
+
+# FTS5 虚表不能由 create_all 创建，单独的 MetaData 只用于构造查询
+post_search_table = Table(
+    "post_search", MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("title", Text),
+    Column("content", Text),
+)
+
+_backends = {}  # 数据库URL -> "fts5" / "pg_trgm" / "like"
+
+
+class PostSearchService:
+    """全文索引的维护与查询"""
+
+    @staticmethod
+    def tokens(text_value: Optional[str]) -> List[str]:
+        """归一化（全角转半角、小写）后的中文段与英文/数字词"""
+        if not text_value:
+            return []
+        return _TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text_value).lower())
+
+    @staticmethod
+    def is_chinese(token: str) -> bool:
+        return token[0] >= "\u4e00"
+
+    @staticmethod
+    def bigrams(run: str) -> List[str]:
+        if len(run) < 2:
+            return [run]
+        return [run[i:i + 2] for i in range(len(run) - 1)]
+
+    @staticmethod
+    def index_text(text_value: Optional[str]) -> str:
+        """写入FTS5的文本：中文段展开为二元组，英文/数字词原样保留"""
+        terms = []
+        for token in PostSearchService.tokens(text_value):
+            terms.extend(PostSearchService.bigrams(token) if PostSearchService.is_chinese(token) else [token])
+        return " ".join(terms)
+
+    @staticmethod
+    def match_query(search: str) -> Optional[str]:
+        """把搜索词转为FTS5查询（各部分AND）；没有可检索的词或含单个汉字时返回None（退回LIKE）"""
+        parts = []
+        for token in PostSearchService.tokens(search):
+            if PostSearchService.is_chinese(token):
+                if len(token) < 2:
+                    return None
+                parts.append('"' + " ".join(PostSearchService.bigrams(token)) + '"')
+            else:
+                parts.append(f'"{token}"*')
+        return " AND ".join(parts) or None
+
+    @staticmethod
+    def has_latin(search: str) -> bool:
+        return any(not PostSearchService.is_chinese(token) for token in PostSearchService.tokens(search))
+
+    @staticmethod
+    def has_match(session: Session, query: str) -> bool:
+        """FTS5 查询是否命中至少一个帖子（只查全文索引，走索引的单行查询）"""
+        return session.exec(
+            select(post_search_table.c.rowid).where(literal_column("post_search").op("MATCH")(query)).limit(1)
+        ).first() is not None
+
+    @staticmethod
+    def backend(session: Session) -> str:
+        """当前数据库可用的检索方式"""
+        bind = session.get_bind()
+        # 会话也可能绑定在连接上（如在外层事务中回滚的基准测试）
+        key = str(bind.engine.url)
+        if key not in _backends:
+            dialect = bind.dialect.name
+            if dialect == "sqlite":
+                exists = session.exec(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'post_search'"
+                )).first()
+                _backends[key] = "fts5" if exists else "like"
+            elif dialect == "postgresql":
+                exists = session.exec(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+                _backends[key] = "pg_trgm" if exists else "like"
+            else:
+                _backends[key] = "like"
+        return _backends[key]
+
+    @staticmethod
+    def ensure_built(session: Session) -> int:
+        """创建全文索引（首次启动或升级时），FTS5 行数与 posts 不一致时全量重建，返回重建的帖子数"""
+        bind = session.get_bind()
+        _backends.pop(str(bind.engine.url), None)
+        if bind.dialect.name == "postgresql":
+            try:
+                session.exec(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                session.exec(text(
+                    "CREATE INDEX IF NOT EXISTS ix_posts_title_trgm ON posts USING gin (title gin_trgm_ops)"
+                ))
+                session.exec(text(
+                    "CREATE INDEX IF NOT EXISTS ix_posts_content_trgm ON posts USING gin (content gin_trgm_ops)"
+                ))
+                session.commit()
+            except Exception:
+                session.rollback()
+                logger.warning("[SEARCH] pg_trgm unavailable, post search falls back to LIKE", exc_info=True)
+            return 0
+        if bind.dialect.name != "sqlite":
+            return 0
+
+        try:
+            session.exec(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS post_search USING fts5(title, content, tokenize = 'unicode61')"
+            ))
+            session.commit()
+        except Exception:
+            session.rollback()
+            logger.warning("[SEARCH] FTS5 unavailable, post search falls back to LIKE", exc_info=True)
+            return 0
+
+        indexed = session.exec(select(func.count()).select_from(post_search_table)).one()
+        if indexed == session.exec(select(func.count()).select_from(Post)).one():
+            return 0
+        rebuilt = PostSearchService.rebuild(session)
+        logger.info(f"[SEARCH] Rebuilt full-text index with {rebuilt} posts")
+        return rebuilt
+
+    @staticmethod
+    def rebuild(session: Session) -> int:
+        """用 posts 全量重建 FTS5 表并提交"""
+        session.exec(post_search_table.delete())
+        rows = session.exec(select(Post.id, Post.title, Post.content)).all()
+        if rows:
+            session.exec(post_search_table.insert(), params=[
+                {
+                    "rowid": post_id,
+                    "title": PostSearchService.index_text(title),
+                    "content": PostSearchService.index_text(content),
+                }
+                for post_id, title, content in rows
+            ])
+        session.commit()
+        return len(rows)
+
+    @staticmethod
+    def sync_post(session: Session, post: Post):
+        """发帖或修改标题/内容后调用（不提交事务）"""
+        if PostSearchService.backend(session) != "fts5":
+            return
+        session.exec(post_search_table.delete().where(post_search_table.c.rowid == post.id))
+        session.exec(post_search_table.insert().values(
+            rowid=post.id,
+            title=PostSearchService.index_text(post.title),
+            content=PostSearchService.index_text(post.content)
+        ))
+
+    @staticmethod
+    def apply(session: Session, statement, search: str) -> Tuple[object, list]:
+        """给帖子查询加上搜索条件，返回 (查询, 相关度排序表达式列表)"""
+        backend = PostSearchService.backend(session)
+        query = PostSearchService.match_query(search) if backend == "fts5" else None
+        # 英文/数字按词前缀匹配，词中子串（"phone" 之于 "iPhone"）只能由 LIKE 找到：全文索引无命中时退回 LIKE
+        if query is not None and PostSearchService.has_latin(search) and not PostSearchService.has_match(session, query):
+            query = None
+
+        if query is not None:
+            statement = statement.join(post_search_table, post_search_table.c.rowid == Post.id).where(
+                literal_column("post_search").op("MATCH")(query)
+            )
+            # 二元组短语可能跨越标点两侧的中文段（"校园，园卡" 也含 "校园 园卡"），命中行再按子串核对
+            for token in PostSearchService.tokens(search):
+                if PostSearchService.is_chinese(token):
+                    statement = statement.where(or_(Post.title.contains(token), Post.content.contains(token)))
+            # bm25 越小越相关
+            return statement, [func.bm25(literal_column("post_search"), TITLE_WEIGHT, 1.0)]
+
+        search_pattern = f"%{search}%"
+        if backend == "pg_trgm":
+            statement = statement.where(or_(Post.title.ilike(search_pattern), Post.content.ilike(search_pattern)))
+            relevance = (
+                func.word_similarity(search, Post.title) * TITLE_WEIGHT
+                + func.word_similarity(search, Post.content)
+            )
+            return statement, [relevance.desc()]
+
+        statement = statement.where(or_(Post.title.like(search_pattern), Post.content.like(search_pattern)))
+        return statement, []
@@ -0,0 +1,60 @@
+"""
+帖子的评论数、认领数计数
+posts.comment_count / claim_count / pending_claim_count 在评论和认领的写操作中用 UPDATE ... SET x = x + n
+原子增减，与写操作同一事务提交，列表和管理后台直接读取列值，不再对 comments / claims 做聚合查询。
+认领状态变化对计数的影响：提交 +1/+1，确认、拒绝 0/-1，取消 -1/-1（claim_count / pending_claim_count）。
+绕过API写入的数据可能使计数偏离，由 recount 全量重算修复
+"""
+from sqlmodel import Session, select, update, func, or_
+
+from app.models.claim import Claim
+from app.models.comment import Comment
+from app.models.post import Post
+
+
+class PostStatsService:
+    """帖子计数列的增量维护与全量重算"""
+
+    @staticmethod
+    def adjust(session: Session, post_id: int, comments: int = 0, claims: int = 0, pending_claims: int = 0):
+        """原子增减帖子的计数（不提交事务）"""
+        values = {}
+        if comments:
+            values["comment_count"] = Post.comment_count + comments
+        if claims:
+            values["claim_count"] = Post.claim_count + claims
+        if pending_claims:
+            values["pending_claim_count"] = Post.pending_claim_count + pending_claims
+        if values:
+            session.exec(update(Post).where(Post.id == post_id).values(**values))
+
+    @staticmethod
+    def recount(session: Session) -> int:
+        """按 comments / claims 重算所有帖子的计数并提交，返回计数有误而被修正的帖子数"""
+        comment_count = (
+            select(func.count()).select_from(Comment).where(Comment.post_id == Post.id).scalar_subquery()
+        )
+        claim_count = (
+            select(func.count()).select_from(Claim)
+            .where(Claim.post_id == Post.id, Claim.status != "cancelled").scalar_subquery()
+        )
+        pending_claim_count = (
+            select(func.count()).select_from(Claim)
+            .where(Claim.post_id == Post.id, Claim.status == "pending").scalar_subquery()
+        )
+        result = session.exec(
+            update(Post)
+            .where(or_(
+                Post.comment_count != comment_count,
+                Post.claim_count != claim_count,
+                Post.pending_claim_count != pending_claim_count
+            ))
+            .values(
+                comment_count=comment_count,
+                claim_count=claim_count,
+                pending_claim_count=pending_claim_count
+            )
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        return result.rowcount
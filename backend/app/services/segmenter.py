@@ -0,0 +1,160 @@
+"""
+中文分词服务（纯Python，无额外依赖）
+基于紧凑字典树的正向/逆向最大匹配（双向最大匹配），词典在首次使用时加载，
+同一段文本的分词结果会被缓存
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+from pathlib import Path
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DICT_PATH = Path(__file__).parent / "data" / "zh_words.txt"
+_WORD_PATTERN = re.compile(r'[\u4e00-\u9fa5]+')  # 与 simple_tokenize 交给分词器的连续汉字段一致
+
+
+class CharTrie:
+    """
+    紧凑字典树：节点用整数编号，children[i] 为节点i的 {字符: 子节点编号}，
+    terminal[i] 标记节点i是否为词尾。构建完成后只读
+    """
+    __slots__ = ("children", "terminal", "max_word_len")
+
+    def __init__(self, words: Iterable[str]):
+        self.children: List[Dict[str, int]] = [{}]
+        self.terminal = bytearray(1)
+        self.max_word_len = 0
+
+        for word in words:
+            node = 0
+            for char in word:
+                child = self.children[node].get(char)
+                if child is None:
+                    child = len(self.children)
+                    self.children[node][char] = child
+                    self.children.append({})
+                    self.terminal.append(0)
+                node = child
+            self.terminal[node] = 1
+            self.max_word_len = max(self.max_word_len, len(word))
+
+    def __len__(self) -> int:
+        return len(self.children)
+
+    def longest_match(self, text: str, start: int) -> int:
+        """返回从start开始能匹配到的最长词的长度，没有匹配返回0"""
+        children = self.children
+        terminal = self.terminal
+        node = 0
+        longest = 0
+        end = min(len(text), start + self.max_word_len)
+        for i in range(start, end):
+            node = children[node].get(text[i])
+            if node is None:
+                break
+            if terminal[node]:
+                longest = i - start + 1
+        return longest
+
+
+class MaxMatchSegmenter:
+    """双向最大匹配分词器"""
+
+    def __init__(self, dict_path: Path = DEFAULT_DICT_PATH, cache_size: int = 8192):
+        self.dict_path = Path(dict_path)
+        self._forward_trie: Optional[CharTrie] = None
+        self._backward_trie: Optional[CharTrie] = None
+        self._lock = threading.Lock()
+        self._segment_cached = lru_cache(maxsize=cache_size)(self._segment)
+
+    @staticmethod
+    def load_words(dict_path: Path) -> List[str]:
+        """读取词典文件：词之间以空白分隔，# 开头的行为注释；不全是汉字的词条永远不会被匹配，跳过并告警"""
+        words = []
+        with open(dict_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                for word in line.split():
+                    if _WORD_PATTERN.fullmatch(word):
+                        words.append(word)
+                    else:
+                        logger.warning(f"[SEGMENTER] Skipping non-Chinese dictionary entry {word!r} in {dict_path}")
+        return words
+
+    def _ensure_loaded(self):
+        if self._forward_trie is not None:
+            return
+        with self._lock:
+            if self._forward_trie is None:
+                words = [word for word in self.load_words(self.dict_path) if len(word) > 1]
+                self._backward_trie = CharTrie(word[::-1] for word in words)
+                self._forward_trie = CharTrie(words)
+
+    def forward(self, text: str) -> List[str]:
+        """正向最大匹配"""
+        self._ensure_loaded()
+        tokens = []
+        i = 0
+        while i < len(text):
+            length = self._forward_trie.longest_match(text, i) or 1
+            tokens.append(text[i:i + length])
+            i += length
+        return tokens
+
+    def backward(self, text: str) -> List[str]:
+        """逆向最大匹配（在反转文本上用反转词典做正向匹配）"""
+        self._ensure_loaded()
+        reversed_text = text[::-1]
+        tokens = []
+        i = 0
+        while i < len(reversed_text):
+            length = self._backward_trie.longest_match(reversed_text, i) or 1
+            tokens.append(reversed_text[i:i + length][::-1])
+            i += length
+        tokens.reverse()
+        return tokens
+
+    def _segment(self, text: str) -> Tuple[str, ...]:
+        forward = self.forward(text)
+        backward = self.backward(text)
+        if forward == backward:
+            return tuple(forward)
+
+        # 词数少者优先；词数相同时单字少者优先；仍相同取逆向结果（中文逆向匹配通常更准确）
+        forward_key = (len(forward), sum(1 for token in forward if len(token) == 1))
+        backward_key = (len(backward), sum(1 for token in backward if len(token) == 1))
+        return tuple(forward if forward_key < backward_key else backward)
+
+    def segment(self, text: str) -> List[str]:
+        """对一段连续的中文文本分词（结果按文本缓存）"""
+        if not text:
+            return []
+        return list(self._segment_cached(text))
+
+    def cache_clear(self):
+        self._segment_cached.cache_clear()
+
+
+def char_segment(text: str) -> List[str]:
+    """按单字切分（旧行为）"""
+    return list(text)
+
+
+_default_segmenter = MaxMatchSegmenter()
+
+SEGMENTERS: Dict[str, Callable[[str], List[str]]] = {
+    "mm": _default_segmenter.segment,
+    "char": char_segment,
+}
+
+
+def get_segmenter(name: str) -> Callable[[str], List[str]]:
+    """按名称获取分词函数：mm（双向最大匹配）或 char（单字）"""
+    if name not in SEGMENTERS:
+        raise ValueError(f"Unknown segmenter '{name}', expected one of: {', '.join(SEGMENTERS)}")
+    return SEGMENTERS[name]
@@ -2,19 +2,44 @@
 文本相似度匹配服务
 用于计算帖子内容的相似度，提高智能匹配准确性
 """
-from typing import List, Tuple
+from typing import List, Tuple, Dict, Callable, Optional
 import re
 import math
 from collections import Counter
+import numpy as np
+from scipy import sparse
+from app.core.config import settings
+from app.services.segmenter import get_segmenter
 
 class TextSimilarityService:
     """文本相似度计算服务"""
     
+    # 停用词（简单版本）
+    STOPWORDS = {
+        '的', '了', '在', '是', '我', '有', '和', '就', '不', '人',
+        '都', '一', '个', '上', '也', '很', '到', '说', '要', '去',
+        '你', '会', '着', '没', '看', '好', '自己', '这', '那', '能'
+    }
+    
+    # 中文分词函数：输入连续的中文串，返回词列表（默认按配置 CHINESE_SEGMENTER 选择）
+    _segmenter: Optional[Callable[[str], List[str]]] = None
+    
+    @staticmethod
+    def set_segmenter(segmenter: Optional[Callable[[str], List[str]]]):
+        """替换中文分词函数；传入None恢复为配置的默认分词器"""
+        TextSimilarityService._segmenter = segmenter
+    
+    @staticmethod
+    def get_segmenter() -> Callable[[str], List[str]]:
+        if TextSimilarityService._segmenter is None:
+            TextSimilarityService._segmenter = get_segmenter(settings.CHINESE_SEGMENTER)
+        return TextSimilarityService._segmenter
+    
     @staticmethod
     def simple_tokenize(text: str) -> List[str]:
         """
         简单的中文分词（不需要额外依赖）
-        使用正则表达式分离中文字符和英文单词
+        使用正则表达式分离中文和英文单词，连续的中文交给可插拔的分词器切分
         """
         if not text:
             return []
@@ -22,8 +47,13 @@ class TextSimilarityService:
         # 转小写
         text = text.lower()
         
-        # 提取中文字符（按字符分）
-        chinese_chars = re.findall(r'[\u4e00-\u9fa5]', text)
+        # 提取连续中文并分词（默认词典最大匹配，配置为char时按字符分）
+        segment = TextSimilarityService.get_segmenter()
+        chinese_chars = [
+            word
+            for run in re.findall(r'[\u4e00-\u9fa5]+', text)
+            for word in segment(run)
+        ]
         
         # 提取英文单词
         english_words = re.findall(r'[a-z]+', text)
@@ -36,6 +66,26 @@ class TextSimilarityService:
         
         return tokens
     
+    @staticmethod
+    def term_frequencies(text: str) -> Counter:
+        """
+        计算索引词项的词频：unigram + 相邻bigram（与原TF-IDF的ngram_range=(1, 2)一致）
+        停用词不参与索引，避免倒排表过长
+        """
+        return TextSimilarityService.term_frequencies_from_tokens(
+            TextSimilarityService.simple_tokenize(text)
+        )
+    
+    @staticmethod
+    def term_frequencies_from_tokens(tokens: List[str]) -> Counter:
+        """基于已分好的token计算索引词项词频（用于复用预先存储的分词结果）"""
+        tokens = [token for token in tokens if token not in TextSimilarityService.STOPWORDS]
+        
+        terms = Counter(tokens)
+        terms.update(f"{a}{b}" for a, b in zip(tokens, tokens[1:]))
+        
+        return terms
+    
     @staticmethod
     def calculate_cosine_similarity(text1: str, text2: str) -> float:
         """
@@ -121,6 +171,80 @@ class TextSimilarityService:
         
         return round(combined, 4)
     
+    @staticmethod
+    def calculate_batch_similarity(query_text: str, candidate_texts: List[str]) -> Dict[str, np.ndarray]:
+        """
+        一对多批量相似度：查询文本只分词一次，与N个候选文本一次性计算
+        返回 {"cosine": 数组, "jaccard": 数组, "combined": 数组}，与逐对计算的结果一致
+        """
+        query_counts = Counter(TextSimilarityService.simple_tokenize(query_text))
+        candidate_counts = [
+            Counter(TextSimilarityService.simple_tokenize(text)) for text in candidate_texts
+        ]
+        return TextSimilarityService.calculate_batch_similarity_from_counts(query_counts, candidate_counts)
+    
+    @staticmethod
+    def calculate_batch_similarity_from_counts(
+        query_counts: Dict[str, int],
+        candidate_counts: List[Dict[str, int]]
+    ) -> Dict[str, np.ndarray]:
+        """
+        基于词频的批量相似度（稀疏矩阵实现）
+        候选词频构成 N x V 的CSR矩阵，余弦相似度和Jaccard交集都只需一次稀疏矩阵-向量乘法
+        """
+        n = len(candidate_counts)
+        zeros = np.zeros(n)
+        if n == 0 or not query_counts:
+            return {"cosine": zeros, "jaccard": zeros.copy(), "combined": zeros.copy()}
+        
+        # 构建词表与候选词频矩阵
+        vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        indices = []
+        data = []
+        for counts in candidate_counts:
+            for term, count in counts.items():
+                indices.append(vocabulary.setdefault(term, len(vocabulary)))
+                data.append(count)
+            indptr.append(len(indices))
+        for term in query_counts:
+            vocabulary.setdefault(term, len(vocabulary))
+        
+        matrix = sparse.csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+            shape=(n, len(vocabulary))
+        )
+        query_vector = np.zeros(len(vocabulary))
+        for term, count in query_counts.items():
+            query_vector[vocabulary[term]] = count
+        
+        # 余弦相似度
+        dot_products = matrix @ query_vector
+        candidate_norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        query_norm = np.linalg.norm(query_vector)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cosine = np.where(candidate_norms > 0, dot_products / (candidate_norms * query_norm), 0.0)
+        
+        # Jaccard相似度：交集 = 二值矩阵 x 二值查询向量，并集 = |A| + |B| - 交集
+        query_binary = (query_vector > 0).astype(np.float64)
+        binary = matrix.copy()
+        binary.data[:] = 1.0
+        intersection = binary @ query_binary
+        union = np.diff(binary.indptr) + query_binary.sum() - intersection
+        with np.errstate(divide="ignore", invalid="ignore"):
+            jaccard = np.where(union > 0, intersection / union, 0.0)
+        
+        # 与单对计算保持相同的舍入方式：np.round 先放大再取整，临界值上与内置 round 结果不同
+        cosine = TextSimilarityService._round_scores(cosine)
+        jaccard = TextSimilarityService._round_scores(jaccard)
+        combined = TextSimilarityService._round_scores(cosine * 0.7 + jaccard * 0.3)
+        
+        return {"cosine": cosine, "jaccard": jaccard, "combined": combined}
+    
+    @staticmethod
+    def _round_scores(scores: np.ndarray) -> np.ndarray:
+        return np.array([round(score, 4) for score in scores.tolist()], dtype=np.float64)
+    
     @staticmethod
     def extract_keywords(text: str, top_n: int = 10) -> List[str]:
         """
@@ -131,17 +255,10 @@ class TextSimilarityService:
         if not tokens:
             return []
         
-        # 过滤停用词（简单版本）
-        stopwords = {
-            '的', '了', '在', '是', '我', '有', '和', '就', '不', '人',
-            '都', '一', '个', '上', '也', '很', '到', '说', '要', '去',
-            '你', '会', '着', '没', '看', '好', '自己', '这', '那', '能'
-        }
-        
         # 过滤停用词和单字符token
         filtered_tokens = [
             token for token in tokens 
-            if token not in stopwords and len(token) > 1
+            if token not in TextSimilarityService.STOPWORDS and len(token) > 1
         ]
         
         # 统计词频
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Query-count check for the post list endpoints.
+
+Builds a small SQLite database (posts with authors, categories and comments
+written by several users), then requests every list endpoint that serializes
+PostRead with several page sizes and counts the SQL statements each request
+executes (and the response size, to compare full PostRead pages with
+fields=summary). Relationships are loaded by eager_options(Post, PostRead), so the
+count must not depend on the page size; the script exits with status 1 when
+it does (an N+1 query crept back in).
+
+For reference it also reports the statements needed to serialize the same
+pages with plain lazy loading.
+
+Usage:
+    python benchmarks/bench_list_queries.py
+    python benchmarks/bench_list_queries.py --posts 500 --page-sizes 10 50 100
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the backend directory to the Python path
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlmodel import Session, SQLModel, select
+
+import app.database  # noqa: F401  registers every table with SQLModel.metadata
+from app.main import app as fastapi_app
+from app.core.deps import get_current_admin_user
+from app.core.eager_loading import count_queries
+from app.database import get_session
+from app.models.category import Category
+from app.models.comment import Comment
+from app.models.post import Post
+from app.models.user import User
+from app.schemas.post import PostRead
+
+USER_COUNT = 20
+CATEGORY_COUNT = 10
+COMMENTS_PER_POST = 3
+
+
+def build_database(path: str, posts: int, seed: int):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(seed)
+    anchor = datetime(2024, 6, 1)
+    with Session(engine) as session:
+        session.add_all([
+            User(name=f"user{i}", username=f"user{i}", email=f"user{i}@example.com", password_hash="x", is_admin=i == 1)
+            for i in range(1, USER_COUNT + 1)
+        ])
+        session.add_all([Category(name=f"分类{i}", name_en=f"category-{i}") for i in range(1, CATEGORY_COUNT + 1)])
+        session.flush()
+        for post_id in range(1, posts + 1):
+            session.add(Post(
+                id=post_id,
+                title=f"帖子{post_id}",
+                content="在图书馆捡到一个黑色钱包",
+                item_type=rng.choice(["lost", "found"]),
+                author_id=rng.randint(1, USER_COUNT),
+                category_id=rng.randint(1, CATEGORY_COUNT),
+                comment_count=COMMENTS_PER_POST,
+                created_at=anchor - timedelta(minutes=post_id)
+            ))
+            session.add_all([
+                Comment(content="是我的", post_id=post_id, author_id=rng.randint(1, USER_COUNT))
+                for _ in range(COMMENTS_PER_POST)
+            ])
+        session.commit()
+    return engine
+
+
+def endpoints(page_size: int) -> dict:
+    return {
+        "GET /posts/": ("/api/posts/", {"limit": page_size}),
+        "GET /posts/?search": ("/api/posts/", {"limit": page_size, "search": "钱包"}),
+        "GET /posts/?fields=summary": ("/api/posts/", {"limit": page_size, "fields": "summary"}),
+        "GET /posts/search/advanced": ("/api/posts/search/advanced", {"limit": page_size, "item_type": "lost"}),
+        "GET /search/advanced?summary": ("/api/posts/search/advanced", {"limit": page_size, "item_type": "lost", "fields": "summary"}),
+        "GET /users/{id}/posts": ("/api/users/1/posts", {"limit": page_size}),
+        "GET /admin/posts": ("/api/admin/posts", {"limit": page_size}),
+    }
+
+
+def measure(client: TestClient, engine, url: str, params: dict, repeats: int):
+    latencies = []
+    for _ in range(repeats):
+        with count_queries(engine) as queries:
+            started = time.perf_counter()
+            response = client.get(url, params=params)
+            latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.text
+    return queries.count, statistics.median(latencies), len(response.content) / 1024
+
+
+def lazy_queries(engine, page_size: int) -> int:
+    """Statements needed to serialize one page without loader options"""
+    with Session(engine) as session:
+        with count_queries(engine) as queries:
+            for post in session.exec(select(Post).order_by(Post.created_at.desc()).limit(page_size)).all():
+                PostRead.model_validate(post)
+    return queries.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that post list endpoints run a constant number of queries")
+    parser.add_argument("--posts", type=int, default=300)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--repeats", type=int, default=5, help="timed requests per endpoint and page size")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_database(os.path.join(tmp, "list_queries.db"), args.posts, args.seed)
+
+        def _session():
+            with Session(engine) as session:
+                yield session
+
+        def _admin():
+            with Session(engine) as session:
+                return session.get(User, 1)
+
+        fastapi_app.dependency_overrides[get_session] = _session
+        fastapi_app.dependency_overrides[get_current_admin_user] = _admin
+        client = TestClient(fastapi_app)
+
+        counts = {}
+        print(f"{'endpoint':<30}{'page':>6}{'queries':>9}{'p50 ms':>9}{'KiB':>9}")
+        for page_size in args.page_sizes:
+            for name, (url, params) in endpoints(page_size).items():
+                queries, p50, size = measure(client, engine, url, params, args.repeats)
+                counts.setdefault(name, set()).add(queries)
+                print(f"{name:<30}{page_size:>6}{queries:>9}{p50:>9.2f}{size:>9.1f}")
+        for page_size in args.page_sizes:
+            print(f"{'(lazy loading reference)':<30}{page_size:>6}{lazy_queries(engine, page_size):>9}")
+        fastapi_app.dependency_overrides.clear()
+        engine.dispose()
+
+    failures = [name for name, values in counts.items() if len(values) > 1]
+    if failures:
+        print("Query count depends on the page size for: " + ", ".join(failures))
+        sys.exit(1)
+    print("Query counts are independent of the page size.")
+
+
+if __name__ == "__main__":
+    main()
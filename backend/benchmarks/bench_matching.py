@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Smart-matching benchmark suite.
+
+Builds deterministic synthetic corpora (1k / 10k / 100k / 1M posts) with the
+same Faker setup as generate_large_test_data.py and measures p50/p95 latency,
+throughput and peak traced memory of each matching path:
+
+    matches-topk      GET /posts/{id}/matches, mode=topk (match cache disabled, recomputed every time)
+    matches-stored    GET /posts/{id}/matches, mode=topk served from materialized post_matches
+    matches-rerank    GET /posts/{id}/matches, mode=rerank
+    matches-semantic  GET /posts/{id}/matches, mode=semantic (ANN index trained during warmup)
+    create-post       POST /posts/ (duplicate check, index writes, job enqueue)
+    match-job         background matching job run for the new post
+    text-similarity   TextSimilarityService batch scoring against 100 candidates
+
+The matches paths, create-post and match-job run inside a transaction that is
+rolled back, so the corpus is unchanged between runs. Corpora are built once into
+benchmarks/.corpus/ and reused; building the 1M corpus takes a while.
+
+Results can be stored as a baseline; later runs exit with status 1 when any
+metric (p50, p95, peak memory) regresses by more than --max-regression percent.
+
+Usage:
+    python benchmarks/bench_matching.py --sizes 1000 10000
+    python benchmarks/bench_matching.py --sizes 1000 10000 --save-baseline
+    python benchmarks/bench_matching.py --sizes 1000 10000 --max-regression 20
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Add the backend directory to the Python path
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+
+from fastapi import BackgroundTasks
+from sqlalchemy import create_engine, event, insert
+from sqlmodel import Session, SQLModel, select
+
+import generate_large_test_data as datagen
+import app.database  # noqa: F401  registers every table with SQLModel.metadata
+from app.core.config import settings
+from app.api.posts import create_post, get_matching_posts
+from app.models.category import Category
+from app.models.location_index import LocationTrigram
+from app.models.post import Post
+from app.models.post_embedding import PostEmbedding
+from app.models.post_feature import PostTextFeature
+from app.models.post_index import PostTerm
+from app.models.post_signature import LshBucket, PostSignature
+from app.models.user import User
+from app.schemas.post import PostCreate
+from app.services import ann_index
+from app.services.corpus_stats import CorpusStatsService
+from app.services.duplicate_detection import DuplicateDetectionService
+from app.services.embedding import EmbeddingService
+from app.services.location_index import LocationIndexService
+from app.services.match_job_service import MatchJobService
+from app.services.post_features import PostFeatureService
+from app.services.post_index import PostIndexService
+from app.services.post_match_service import PostMatchService
+from app.services.text_similarity import TextSimilarityService
+
+CORPUS_SIZES = [1000, 10000, 100000, 1000000]
+CORPUS_VERSION = 4  # bump when the corpus tables change so cached corpora are rebuilt
+CORPUS_DIR = os.path.join(BENCH_DIR, ".corpus")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "matching_baseline.json")
+ANCHOR_TIME = datetime(2024, 6, 1)  # item times are spread over the year before this
+USER_COUNT = 50
+BATCH_SIZE = 5000
+SIMILARITY_CANDIDATES = 100
+
+PATHS = ["matches-topk", "matches-stored", "matches-rerank", "matches-semantic", "create-post", "match-job", "text-similarity"]
+COMPARED_METRICS = ["p50_ms", "p95_ms", "peak_kib"]
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+def make_engine(path: str):
+    """SQLite engine whose transactions SQLAlchemy controls, so create_post's commit can run as a savepoint"""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, _record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+def generate_posts(size: int, seed: int, first_id: int = 1):
+    """Deterministic lost/found post rows with ids first_id..first_id+size-1"""
+    datagen.fake.seed_instance(seed)
+    rng = random.Random(seed)
+    for post_id in range(first_id, first_id + size):
+        category_id = rng.randrange(len(datagen.CATEGORIES_DATA)) + 1
+        post_type = rng.choice(["lost", "found"])
+        title, content = datagen.fake_post_text(datagen.CATEGORIES_DATA[category_id - 1]["name"], post_type)
+        item_time = ANCHOR_TIME - timedelta(minutes=rng.randrange(365 * 24 * 60))
+        yield {
+            "id": post_id,
+            "title": title,
+            "content": content,
+            "item_type": post_type,
+            "location": datagen.fake.address(),
+            "item_time": item_time,
+            "contact_info": f"Tel: {datagen.fake.phone_number()}",
+            "images": [],
+            "author_id": rng.randint(1, USER_COUNT),
+            "category_id": category_id,
+            "status": "published",
+            "is_claimed": False,
+            "created_at": item_time,
+        }
+
+
+def batched(rows, size: int = BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def corpus_path(size: int, seed: int) -> str:
+    return os.path.join(CORPUS_DIR, f"matching_v{CORPUS_VERSION}_{size}_{seed}.db")
+
+
+def build_corpus(size: int, seed: int) -> str:
+    """
+    Write the corpus straight into the tables the write path maintains
+    (text features, inverted index, corpus stats, location trigrams,
+    MinHash signatures, embeddings) using the same services' pure helpers, in batches.
+    """
+    path = corpus_path(size, seed)
+    if os.path.exists(path):
+        # Tables added since the corpus was built (e.g. post_matches) start out empty
+        engine = make_engine(path)
+        SQLModel.metadata.create_all(engine)
+        engine.dispose()
+        return path
+
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    partial = f"{path}.partial"
+    if os.path.exists(partial):
+        os.remove(partial)
+
+    started = time.perf_counter()
+    engine = make_engine(partial)
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        session.execute(insert(User), [
+            {
+                "id": user_id, "name": f"bench{user_id}", "username": f"bench{user_id}",
+                "email": f"bench{user_id}@example.com", "password_hash": "x",
+                "is_active": True, "is_admin": False, "credit_score": 100,
+                "created_at": ANCHOR_TIME,
+            }
+            for user_id in range(1, USER_COUNT + 1)
+        ])
+        session.execute(insert(Category), [
+            {**category, "id": category_id, "is_active": True, "created_at": ANCHOR_TIME}
+            for category_id, category in enumerate(datagen.CATEGORIES_DATA, start=1)
+        ])
+
+        # Pass 1: posts, features, location trigrams, signatures; collect document frequencies
+        item_types = {}
+        doc_freqs = Counter()
+        for batch in batched(generate_posts(size, seed)):
+            features, trigrams, signatures, buckets, embeddings = [], [], [], [], []
+            for row in batch:
+                normalized = LocationIndexService.normalize(row["location"])
+                row["location_normalized"] = normalized or None
+                item_types[row["id"]] = row["item_type"]
+
+                feature = PostFeatureService.compute(Post(id=row["id"], title=row["title"], content=row["content"]))
+                features.append(feature.model_dump())
+                doc_freqs.update(TextSimilarityService.term_frequencies_from_tokens(feature.tokens).keys())
+
+                trigrams.extend(
+                    {"trigram": trigram, "post_id": row["id"]}
+                    for trigram in LocationIndexService.trigrams(normalized)
+                )
+
+                signature = DuplicateDetectionService.compute_signature(f"{row['title']} {row['content']}")
+                signatures.append({"post_id": row["id"], "signature": signature, "created_at": row["created_at"]})
+                buckets.extend(
+                    {"band": band, "bucket": bucket, "post_id": row["id"]}
+                    for band, bucket in DuplicateDetectionService.bucket_keys(signature)
+                )
+
+                embeddings.append({
+                    "post_id": row["id"], "item_type": row["item_type"], "updated_at": row["created_at"],
+                    "vector": EmbeddingService.to_bytes(EmbeddingService.embed(f"{row['title']} {row['content']}")),
+                })
+
+            session.execute(insert(Post), batch)
+            session.execute(insert(PostTextFeature), features)
+            session.execute(insert(LocationTrigram), trigrams)
+            session.execute(insert(PostSignature), signatures)
+            session.execute(insert(LshBucket), buckets)
+            session.execute(insert(PostEmbedding), embeddings)
+            session.commit()
+            print(f"  corpus {size}: {batch[-1]['id']}/{size} posts", end="\r", flush=True)
+
+        # Pass 2: inverted index weights with the final IDF
+        idf = {term: CorpusStatsService.compute_idf(size, df) for term, df in doc_freqs.items()}
+        for first_id in range(1, size + 1, BATCH_SIZE):
+            rows = session.exec(
+                select(PostTextFeature.post_id, PostTextFeature.tokens).where(
+                    PostTextFeature.post_id >= first_id,
+                    PostTextFeature.post_id < first_id + BATCH_SIZE
+                )
+            ).all()
+            postings = []
+            for post_id, tokens in rows:
+                term_freqs = TextSimilarityService.term_frequencies_from_tokens(tokens)
+                postings.extend(
+                    {"term": term, "post_id": post_id, "item_type": item_types[post_id], "weight": weight}
+                    for term, weight in PostIndexService.build_weights(term_freqs, idf).items()
+                )
+            session.execute(insert(PostTerm), postings)
+            session.commit()
+
+        CorpusStatsService.reset(session, size, doc_freqs)
+        session.commit()
+
+    with engine.connect() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    os.replace(partial, path)
+    print(f"  corpus {size}: built in {time.perf_counter() - started:.1f}s{' ' * 20}")
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+class Probe:
+    """Times (and, during the memory pass, traces) the measured section of one operation"""
+
+    def __init__(self, trace_memory: bool):
+        self.trace_memory = trace_memory
+        self.elapsed = None
+        self.peak = None
+
+    @contextmanager
+    def measure(self):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        yield
+        self.elapsed = time.perf_counter() - start
+        if self.trace_memory:
+            self.peak = tracemalloc.get_traced_memory()[1] - base
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_path(operation, iterations: int, warmup: int, memory_iterations: int) -> dict:
+    for i in range(warmup):
+        operation(i, Probe(False))
+
+    latencies = []
+    for i in range(iterations):
+        probe = Probe(False)
+        operation(warmup + i, probe)
+        latencies.append(probe.elapsed)
+
+    # Memory is traced in a separate, shorter pass: tracemalloc would distort the latencies
+    peak = 0
+    tracemalloc.start()
+    try:
+        for i in range(memory_iterations):
+            probe = Probe(True)
+            operation(warmup + i, probe)
+            peak = max(peak, probe.peak)
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "throughput_ops": round(iterations / sum(latencies), 1),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def build_operations(engine, size: int, seed: int, iterations: int) -> dict:
+    rng = random.Random(seed + 1)
+    query_ids = rng.sample(range(1, size + 1), min(size, iterations))
+    new_posts = [
+        PostCreate(**{key: row[key] for key in ("title", "content", "item_type", "location", "item_time", "contact_info", "category_id")})
+        for row in generate_posts(iterations, seed + 1, first_id=size + 1)
+    ]
+    with Session(engine) as session:
+        texts = [
+            f"{title} {content}"
+            for title, content in session.exec(
+                select(Post.title, Post.content).where(Post.id <= SIMILARITY_CANDIDATES + iterations)
+            ).all()
+        ]
+    candidates = texts[:SIMILARITY_CANDIDATES]
+    queries = texts[SIMILARITY_CANDIDATES:] or texts
+    loop = asyncio.new_event_loop()
+
+    @contextmanager
+    def rolled_back_session():
+        connection = engine.connect()
+        transaction = connection.begin()
+        session = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        finally:
+            session.close()
+            transaction.rollback()
+            connection.close()
+
+    def get_matches(session, post_id, mode):
+        # topk materializes its ranking in a background task; run it as the server would after the response
+        tasks = BackgroundTasks()
+        result = get_matching_posts(
+            post_id, limit=10, time_range_days=7, mode=mode, engine=None, session=session, background_tasks=tasks
+        )
+        loop.run_until_complete(tasks())
+        return result
+
+    def matches(mode):
+        # topk writes its results to post_matches; roll back so every call ranks from scratch
+        def operation(i, probe):
+            with rolled_back_session() as session:
+                with probe.measure():
+                    get_matches(session, query_ids[i % len(query_ids)], mode)
+        return operation
+
+    def stored_matches(i, probe):
+        with rolled_back_session() as session:
+            get_matches(session, query_ids[i % len(query_ids)], "topk")
+            with probe.measure():
+                get_matches(session, query_ids[i % len(query_ids)], "topk")
+
+    def create(i, probe):
+        with rolled_back_session() as session:
+            author = session.get(User, 1 + i % USER_COUNT)
+            with probe.measure():
+                loop.run_until_complete(create_post(new_posts[i % len(new_posts)], current_user=author, session=session))
+
+    def match_job(i, probe):
+        with rolled_back_session() as session:
+            author = session.get(User, 1 + i % USER_COUNT)
+            post = loop.run_until_complete(create_post(new_posts[i % len(new_posts)], current_user=author, session=session))
+            job = MatchJobService.get_latest_job(session, post.id)
+            with probe.measure():
+                if job is not None:
+                    MatchJobService.run_job(session, job)
+                    PostMatchService.refresh_new_post(session, session.get(Post, post.id))
+
+    def text_similarity(i, probe):
+        query = queries[i % len(queries)]
+        with probe.measure():
+            TextSimilarityService.calculate_batch_similarity(query, candidates)
+
+    return {
+        "matches-topk": matches("topk"),
+        "matches-stored": stored_matches,
+        "matches-rerank": matches("rerank"),
+        "matches-semantic": matches("semantic"),
+        "create-post": create,
+        "match-job": match_job,
+        "text-similarity": text_similarity,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Baseline
+# ---------------------------------------------------------------------------
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(path: str, results: dict, args):
+    merged = load_baseline(path)
+    for size, paths in results.items():
+        merged.setdefault(size, {}).update(paths)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "saved_at": datetime.now().isoformat(timespec="seconds"),
+                "seed": args.seed,
+                "iterations": args.iterations,
+                "python": sys.version.split()[0],
+            },
+            "results": merged,
+        }, f, indent=2, sort_keys=True)
+
+
+def regressions(current: dict, baseline: dict, max_regression: float) -> list:
+    """Metrics that grew by more than max_regression percent over the baseline"""
+    found = []
+    for metric in COMPARED_METRICS:
+        base, now = baseline.get(metric), current.get(metric)
+        if base and now is not None:
+            change = (now - base) / base * 100
+            if change > max_regression:
+                found.append(f"{metric} {base} -> {now} (+{change:.0f}%)")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark smart-matching paths on synthetic corpora")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], choices=CORPUS_SIZES, help="corpus sizes (posts)")
+    parser.add_argument("--paths", nargs="+", default=PATHS, choices=PATHS)
+    parser.add_argument("--iterations", type=int, default=50, help="timed operations per path")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--memory-iterations", type=int, default=10, help="operations traced for peak memory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--max-regression", type=float, default=25.0, help="allowed growth over the baseline, percent")
+    args = parser.parse_args()
+
+    # Every request must reach the ranking code
+    settings.MATCH_CACHE_ENABLED = False
+    baseline = {} if args.save_baseline else load_baseline(args.baseline)
+
+    results, failures = {}, []
+    print(f"{'posts':>8} {'path':>16} {'p50 ms':>9} {'p95 ms':>9} {'ops/s':>9} {'peak KiB':>10}  vs baseline")
+    for size in args.sizes:
+        path = build_corpus(size, args.seed)
+        engine = make_engine(path)
+        # A fresh ANN index per corpus, persisted next to it
+        settings.SEMANTIC_INDEX_PATH = f"{path}.semantic.npz"
+        ann_index._semantic_index = None
+        operations = build_operations(engine, size, args.seed, args.iterations)
+        results[str(size)] = {}
+        for name in args.paths:
+            stats = run_path(operations[name], args.iterations, args.warmup, min(args.memory_iterations, args.iterations))
+            results[str(size)][name] = stats
+
+            base = baseline.get(str(size), {}).get(name)
+            if base is None:
+                verdict = "-"
+            else:
+                regressed = regressions(stats, base, args.max_regression)
+                verdict = "REGRESSED: " + "; ".join(regressed) if regressed else "ok"
+                failures.extend(f"{size}/{name}: {item}" for item in regressed)
+            print(f"{size:>8} {name:>16} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                  f"{stats['throughput_ops']:>9.1f} {stats['peak_kib']:>10.1f}  {verdict}")
+        engine.dispose()
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, args)
+        print(f"Baseline saved to {args.baseline}")
+
+    if failures:
+        print(f"\n{len(failures)} metric(s) regressed by more than {args.max_regression:g}%:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Post list serialization benchmark.
+
+Compares the two ways a page of posts is turned into a response body:
+
+    pydantic      select(Post) with eager loading -> PostRead.model_validate ->
+                  model_dump(mode='json') -> JSONResponse (the original list path)
+    rows+orjson   PostFieldsService.select_rows -> Core rows -> dicts built by
+                  rows_to_dicts -> ORJSONResponse (list_posts / admin_list_posts)
+
+Each variant runs for the full PostRead view and for fields=summary, includes
+the SQL work, and the two bodies are checked to decode to the same JSON.
+
+Usage:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --page-size 100 --iterations 200
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+sys.path.append(BENCH_DIR)
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlmodel import Session, select
+
+from bench_list_queries import build_database
+from app.models.post import Post
+from app.services.post_fields import PostFieldsService
+
+VIEWS = {"full": None, "summary": "summary"}
+
+
+def pydantic_body(session: Session, fields, page_size: int) -> bytes:
+    statement = PostFieldsService.apply(select(Post), fields).order_by(Post.created_at.desc(), Post.id.desc())
+    posts = session.exec(statement.limit(page_size)).all()
+    return JSONResponse(content={"data": PostFieldsService.serialize(session, posts, fields)}).body
+
+
+def rows_body(session: Session, fields, page_size: int) -> bytes:
+    statement = PostFieldsService.select_rows(fields).order_by(Post.created_at.desc(), Post.id.desc())
+    rows = session.exec(statement.limit(page_size)).all()
+    return ORJSONResponse(content={"data": PostFieldsService.serialize_rows(session, rows, fields)}).body
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run(engine, build, fields, page_size: int, iterations: int, warmup: int) -> dict:
+    latencies = []
+    for i in range(warmup + iterations):
+        # a fresh session per request, as in the API, so the identity map does not carry over
+        with Session(engine) as session:
+            started = time.perf_counter()
+            body = build(session, fields, page_size)
+            elapsed = (time.perf_counter() - started) * 1000
+        if i >= warmup:
+            latencies.append(elapsed)
+    latencies.sort()
+    return {
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "kib": len(body) / 1024,
+        "body": body,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark post list serialization paths")
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_database(os.path.join(tmp, "serialization.db"), args.posts, args.seed)
+        print(f"{args.page_size}-post pages, {args.iterations} iterations")
+        print(f"{'view':<10}{'path':<14}{'p50 ms':>9}{'p95 ms':>9}{'KiB':>8}{'speedup':>9}")
+        mismatched = []
+        for view, raw_fields in VIEWS.items():
+            fields = PostFieldsService.parse(raw_fields)
+            baseline = run(engine, pydantic_body, fields, args.page_size, args.iterations, args.warmup)
+            fast = run(engine, rows_body, fields, args.page_size, args.iterations, args.warmup)
+            for name, result in (("pydantic", baseline), ("rows+orjson", fast)):
+                speedup = baseline["p50_ms"] / result["p50_ms"]
+                print(f"{view:<10}{name:<14}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['kib']:>8.1f}{speedup:>8.1f}x")
+            if json.loads(baseline["body"]) != json.loads(fast["body"]):
+                mismatched.append(view)
+        engine.dispose()
+
+    if mismatched:
+        print("Response bodies differ between the paths for: " + ", ".join(mismatched))
+        sys.exit(1)
+    print("Both paths produce identical JSON.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Compare matching engines on the same labelled query set.
+
+Uses the synthetic corpora of bench_matching.py. For each sampled query post
+a counterpart of the opposite type is published through the normal write path
+(same category and location, item time a few hours later, text reworded:
+sentences dropped and shuffled, one unrelated sentence added; created_at is
+backdated to the item time like the rest of the corpus), so every query has
+exactly one known correct match. Everything runs inside a transaction that
+is rolled back, leaving the cached corpus unchanged.
+
+For each engine it reports:
+
+    text      rank of the counterpart in the engine's own candidate list
+              (recall@1, recall@10, MRR over the top 100) and search latency
+    matches   recall@10 of GET /posts/{id}/matches?mode=rerank&engine=<name>
+              (full scoring with category/location/time) and its latency
+
+Usage:
+    python benchmarks/compare_engines.py --size 10000 --queries 200
+    python benchmarks/compare_engines.py --engines tfidf bm25 --json results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+
+# Add the backend directory to the Python path
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+sys.path.append(BENCH_DIR)
+
+from sqlmodel import Session, select
+
+import bench_matching
+import generate_large_test_data as datagen
+from app.api.posts import create_post, get_matching_posts
+from app.core.config import settings
+from app.models.post import Post
+from app.models.user import User
+from app.schemas.post import PostCreate
+from app.services.matching_engines import available_engines, get_matching_engine
+
+SEARCH_LIMIT = 100
+
+
+def reworded(text: str, rng: random.Random, keep: float) -> str:
+    """Keep a fraction of the sentences, shuffle them and add an unrelated one"""
+    sentences = [sentence for sentence in text.replace("。", ".").split(".") if sentence.strip()]
+    kept = [sentence for sentence in sentences if rng.random() < keep] or sentences[:1]
+    rng.shuffle(kept)
+    kept.append(datagen.fake.sentence(nb_words=6).rstrip("."))
+    return ".".join(kept) + "."
+
+
+def counterpart(post: Post, rng: random.Random, keep: float) -> PostCreate:
+    target_type = "found" if post.item_type == "lost" else "lost"
+    category, _, sentence = post.title.partition(": ")
+    category = category.replace("丢失了", "").replace("捡到了", "")
+    offset = timedelta(hours=rng.randint(1, 48))
+    return PostCreate(
+        title=f"{'丢失' if target_type == 'lost' else '捡到'}了{category}: {reworded(sentence, rng, keep)}",
+        content=reworded(post.content, rng, keep),
+        item_type=target_type,
+        location=post.location,
+        item_time=post.item_time + offset if target_type == "found" else post.item_time - offset,
+        contact_info="Tel: 10000000000",
+        category_id=post.category_id,
+    )
+
+
+def percentile_ms(latencies: list, pct: float) -> float:
+    return round(bench_matching.percentile(sorted(latencies), pct) * 1000, 3)
+
+
+def evaluate(session: Session, engine_name: str, pairs: list) -> dict:
+    engine = get_matching_engine(engine_name)
+    hits_at_1 = hits_at_10 = 0
+    reciprocal_ranks = []
+    search_latencies, match_latencies = [], []
+    match_hits = 0
+
+    for query, expected_id in pairs:
+        start = time.perf_counter()
+        ranked = engine.search(session, query, limit=SEARCH_LIMIT)
+        search_latencies.append(time.perf_counter() - start)
+        ids = [post.id for post, _ in ranked]
+        rank = ids.index(expected_id) + 1 if expected_id in ids else None
+        hits_at_1 += rank == 1
+        hits_at_10 += rank is not None and rank <= 10
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+
+        start = time.perf_counter()
+        matches = get_matching_posts(
+            query.id, limit=10, time_range_days=7, mode="rerank", engine=engine_name, session=session
+        )
+        match_latencies.append(time.perf_counter() - start)
+        match_hits += expected_id in [post.id for post in matches]
+
+    count = len(pairs)
+    return {
+        "text_recall_at_1": round(hits_at_1 / count, 3),
+        "text_recall_at_10": round(hits_at_10 / count, 3),
+        "text_mrr": round(sum(reciprocal_ranks) / count, 3),
+        "search_p50_ms": percentile_ms(search_latencies, 50),
+        "search_p95_ms": percentile_ms(search_latencies, 95),
+        "matches_recall_at_10": round(match_hits / count, 3),
+        "matches_p50_ms": percentile_ms(match_latencies, 50),
+        "matches_p95_ms": percentile_ms(match_latencies, 95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare matching engines on quality and latency")
+    parser.add_argument("--size", type=int, default=10000, choices=bench_matching.CORPUS_SIZES, help="corpus size (posts)")
+    parser.add_argument("--queries", type=int, default=200, help="labelled query posts")
+    parser.add_argument("--engines", nargs="+", default=available_engines(), choices=available_engines())
+    parser.add_argument("--keep", type=float, default=0.3, help="fraction of sentences kept when rewording")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    # Every request must reach the ranking code
+    settings.MATCH_CACHE_ENABLED = False
+    path = bench_matching.build_corpus(args.size, args.seed)
+    engine = bench_matching.make_engine(path)
+    rng = random.Random(args.seed + 2)
+    datagen.fake.seed_instance(args.seed + 2)
+    loop = asyncio.new_event_loop()
+
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    results = {}
+    try:
+        query_ids = rng.sample(range(1, args.size + 1), min(args.size, args.queries))
+        author = session.get(User, 1)
+        pairs = []
+        for query in session.exec(select(Post).where(Post.id.in_(query_ids)).order_by(Post.id)).all():
+            post_in = counterpart(query, rng, args.keep)
+            created = loop.run_until_complete(create_post(post_in, current_user=author, session=session))
+            created.created_at = post_in.item_time
+            session.add(created)
+            pairs.append((query, created.id))
+        session.commit()
+
+        # Warm the statement caches once per engine before timing
+        for name in args.engines:
+            get_matching_engine(name).search(session, pairs[0][0], limit=SEARCH_LIMIT)
+
+        print(f"{args.size} posts, {len(pairs)} labelled queries")
+        print(f"{'engine':>8} {'R@1':>6} {'R@10':>6} {'MRR':>6} {'search p50':>11} {'p95':>8}  "
+              f"{'matches R@10':>12} {'p50':>8} {'p95':>8}")
+        for name in args.engines:
+            stats = evaluate(session, name, pairs)
+            results[name] = stats
+            print(f"{name:>8} {stats['text_recall_at_1']:>6.3f} {stats['text_recall_at_10']:>6.3f} "
+                  f"{stats['text_mrr']:>6.3f} {stats['search_p50_ms']:>9.2f}ms {stats['search_p95_ms']:>6.2f}ms  "
+                  f"{stats['matches_recall_at_10']:>12.3f} {stats['matches_p50_ms']:>6.2f}ms {stats['matches_p95_ms']:>6.2f}ms")
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+        engine.dispose()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"size": args.size, "queries": args.queries, "seed": args.seed, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,24 @@ DATABASE_URL = "sqlite+aiosqlite:///../lostandfound.db"
 
 fake = Faker('zh_CN')
 
+CATEGORIES_DATA = [
+    {"name": "电子产品", "name_en": "Electronics", "icon": "laptop"},
+    {"name": "证件", "name_en": "Documents", "icon": "card"},
+    {"name": "衣物", "name_en": "Clothing", "icon": "shirt"},
+    {"name": "书籍", "name_en": "Books", "icon": "book"},
+    {"name": "钥匙", "name_en": "Keys", "icon": "key"},
+    {"name": "钱包", "name_en": "Wallets", "icon": "wallet"},
+    {"name": "雨伞", "name_en": "Umbrellas", "icon": "umbrella"},
+    {"name": "水杯", "name_en": "Bottles", "icon": "bottle"},
+    {"name": "其他", "name_en": "Other", "icon": "other"},
+]
+
+def fake_post_text(category_name: str, post_type: str) -> tuple[str, str]:
+    """Generate the (title, content) pair used for synthetic lost/found posts."""
+    title = f"{'丢失' if post_type == 'lost' else '捡到'}了{category_name}: {fake.sentence(nb_words=4)}"
+    content = fake.paragraph(nb_sentences=5)
+    return title, content
+
 async def get_or_create_admin(session: AsyncSession) -> User:
     result = await session.execute(select(User).where(User.email == "admin@example.com"))
     admin = result.scalars().first()
@@ -61,19 +79,8 @@ async def generate_users(session: AsyncSession, count: int) -> list[User]:
     return users
 
 async def generate_categories(session: AsyncSession) -> list[Category]:
-    categories_data = [
-        {"name": "电子产品", "name_en": "Electronics", "icon": "laptop"},
-        {"name": "证件", "name_en": "Documents", "icon": "card"},
-        {"name": "衣物", "name_en": "Clothing", "icon": "shirt"},
-        {"name": "书籍", "name_en": "Books", "icon": "book"},
-        {"name": "钥匙", "name_en": "Keys", "icon": "key"},
-        {"name": "钱包", "name_en": "Wallets", "icon": "wallet"},
-        {"name": "雨伞", "name_en": "Umbrellas", "icon": "umbrella"},
-        {"name": "水杯", "name_en": "Bottles", "icon": "bottle"},
-        {"name": "其他", "name_en": "Other", "icon": "other"},
-    ]
     categories = []
-    for cat_data in categories_data:
+    for cat_data in CATEGORIES_DATA:
         result = await session.execute(select(Category).where(Category.name == cat_data["name"]))
         if not result.scalars().first():
             category = Category(**cat_data, description=f"{cat_data['name']} related items.")
@@ -91,10 +98,11 @@ async def generate_posts(session: AsyncSession, users: list[User], categories: l
         category = random.choice(categories)
         post_type = random.choice(["lost", "found"])
         item_time = fake.date_time_between(start_date="-1y", end_date="now")
+        title, content = fake_post_text(category.name, post_type)
         
         post = Post(
-            title=f"{'丢失' if post_type == 'lost' else '捡到'}了{category.name}: {fake.sentence(nb_words=4)}",
-            content=fake.paragraph(nb_sentences=5),
+            title=title,
+            content=content,
             item_type=post_type,
             location=fake.address(),
             item_time=item_time,
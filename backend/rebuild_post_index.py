@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Rebuild the inverted index used by smart matching (post_terms table).
+Also recomputes MinHash signatures and duplicate clusters, rebuilds
+the location trigram index (location_trigrams table), recomputes
+semantic embeddings and retrains the ANN index file used by mode=semantic,
+computes perceptual image hashes for posts whose photos have none,
+rebuilds the full-text search index (post_search FTS5 table on SQLite),
+recounts the per-filter post counters (post_counters table) and repairs the
+comment/claim counter columns on posts.
+Run after bulk data imports or tokenizer changes (CHINESE_SEGMENTER);
+stored text features are recomputed with the current tokenizer.
+"""
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from sqlmodel import Session
+from app.database import engine, init_db
+from app.services.post_index import PostIndexService
+from app.services.duplicate_detection import DuplicateDetectionService
+from app.services.location_index import LocationIndexService
+from app.services.embedding import EmbeddingService
+from app.services.ann_index import get_semantic_index
+from app.services.image_hash import ImageHashService
+from app.services.post_search import PostSearchService
+from app.services.post_counts import PostCounterService
+from app.services.post_stats import PostStatsService
+
+def rebuild_index():
+    """Rebuild the post inverted index"""
+    print("Rebuilding post inverted index...")
+    init_db()
+    with Session(engine) as session:
+        indexed = PostIndexService.rebuild(session, refresh_features=True)
+        signed = DuplicateDetectionService.backfill(session, only_missing=False)
+        located = LocationIndexService.backfill(session, only_missing=False)
+        embedded = EmbeddingService.backfill(session, only_missing=False)
+        semantic_index = get_semantic_index()
+        semantic_index.rebuild(session)
+        hashed = ImageHashService.backfill(session)
+        PostSearchService.ensure_built(session)
+        searchable = PostSearchService.rebuild(session) if PostSearchService.backend(session) == "fts5" else 0
+        counter_groups = PostCounterService.rebuild(session)
+        recounted = PostStatsService.recount(session)
+    print(f"Indexed {indexed} open lost/found posts.")
+    print(f"Computed duplicate-detection signatures for {signed} posts.")
+    print(f"Rebuilt location trigrams for {located} posts.")
+    print(f"Computed semantic embeddings for {embedded} posts; ANN index saved to {semantic_index.path or '(memory)'}.")
+    print(f"Computed image hashes for {hashed} posts with photos.")
+    print(f"Rebuilt the full-text search index for {searchable} posts.")
+    print(f"Recounted {counter_groups} post counter groups.")
+    print(f"Repaired comment/claim counts on {recounted} posts.")
+
+if __name__ == "__main__":
+    rebuild_index()
@@ -0,0 +1,92 @@
+"""
+Shared pytest fixtures.
+
+The application reads DATABASE_URL when app.database is first imported, so it
+is pointed at a throwaway SQLite file here, before any test module imports the
+app. Every test starts from freshly created tables and empty in-process caches.
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+_DB_DIR = tempfile.mkdtemp(prefix="lostandfound-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ["SEMANTIC_INDEX_PATH"] = ""
+os.environ["MATCH_CACHE_SQLITE_PATH"] = ""
+os.environ["MATCH_WORKER_ENABLED"] = "false"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlmodel import Session, SQLModel
+
+import app.main  # noqa: F401  import the API package first, in the same order as the server
+from app.database import engine as app_engine
+from app.models.category import Category
+from app.models.post import Post
+from app.models.user import User
+from app.services import ann_index, match_cache, post_counts, post_search
+
+ANCHOR = datetime(2024, 6, 1)
+
+# manual_api_test.py drives a running server over HTTP; it is not part of the pytest suite
+collect_ignore = ["manual_api_test.py"]
+
+
+@pytest.fixture
+def engine():
+    """The application engine on an empty schema"""
+    SQLModel.metadata.drop_all(app_engine)
+    with app_engine.begin() as connection:
+        # the FTS5 table is created outside the metadata
+        connection.exec_driver_sql("DROP TABLE IF EXISTS post_search")
+    SQLModel.metadata.create_all(app_engine)
+    post_search._backends.clear()
+    post_counts.invalidate_post_counts()
+    if match_cache.get_match_cache() is not None:
+        match_cache.get_match_cache().clear()
+    ann_index._semantic_index = None
+    yield app_engine
+    app_engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
+
+
+def add_user(session: Session, user_id: int, is_admin: bool = False) -> User:
+    user = User(
+        id=user_id, name=f"user{user_id}", username=f"user{user_id}",
+        email=f"user{user_id}@example.com", password_hash="x", is_admin=is_admin
+    )
+    session.add(user)
+    return user
+
+
+def add_category(session: Session, category_id: int) -> Category:
+    category = Category(id=category_id, name=f"分类{category_id}", name_en=f"category-{category_id}")
+    session.add(category)
+    return category
+
+
+def add_post(session: Session, post_id: int, **fields) -> Post:
+    """A published post created post_id minutes before ANCHOR; fields override the defaults"""
+    values = {
+        "id": post_id,
+        "title": f"帖子{post_id}",
+        "content": "在图书馆捡到一个黑色钱包",
+        "item_type": "lost",
+        "author_id": 1,
+        "status": "published",
+        "created_at": ANCHOR - timedelta(minutes=post_id),
+    }
+    values.update(fields)
+    post = Post(**values)
+    session.add(post)
+    return post
@@ -0,0 +1,105 @@
+"""
+Saved item alerts (percolator): the reverse index returns exactly the alerts a
+new post satisfies, as a scan over every alert would, and each alert is
+notified at most once per post.
+"""
+import random
+from datetime import timedelta
+
+import pytest
+
+from app.models.alert import SavedAlert
+from app.services.alert_service import AlertService
+from app.services.location_index import LOCATION_MATCH_THRESHOLD, LocationIndexService
+from app.services.post_features import PostFeatureService
+from conftest import ANCHOR, add_category, add_post, add_user
+
+KEYWORDS = ["黑色", "钱包", "手机", "校园卡", "雨伞", "iPhone"]
+LOCATIONS = [None, "图书馆", "图书馆3楼", "第二食堂", "体育馆"]
+
+
+def _satisfies(session, alert: SavedAlert, post) -> bool:
+    """Reference predicate, evaluated without the reverse index"""
+    post_time = post.item_time or post.created_at
+    return (
+        alert.is_active
+        and alert.item_type == post.item_type
+        and alert.user_id != post.author_id
+        and AlertService.keyword_terms(alert.keywords) <= set(PostFeatureService.get(session, post).tokens)
+        and (not alert.category_id or alert.category_id == post.category_id)
+        and (not alert.start_time or post_time >= alert.start_time)
+        and (not alert.end_time or post_time <= alert.end_time)
+        and (not alert.location or LocationIndexService.similarity(alert.location, post.location) >= LOCATION_MATCH_THRESHOLD)
+    )
+
+
+@pytest.fixture
+def users(session):
+    for user_id in (1, 2, 3):
+        add_user(session, user_id)
+    add_category(session, 1)
+    add_category(session, 2)
+    session.commit()
+
+
+def _save_alert(session, **fields) -> SavedAlert:
+    alert = SavedAlert(**fields)
+    session.add(alert)
+    session.flush()
+    AlertService.index_alert(session, alert)
+    return alert
+
+
+def _publish(session, post_id: int, **fields):
+    post = add_post(session, post_id, **fields)
+    session.flush()
+    PostFeatureService.refresh(session, post)
+    LocationIndexService.sync_post(session, post)
+    session.commit()
+    return post
+
+
+def test_percolate_matches_a_scan_over_all_alerts(session, users):
+    rng = random.Random(5)
+    alerts = []
+    for _ in range(60):
+        start = ANCHOR - timedelta(days=rng.randint(0, 10)) if rng.random() < 0.3 else None
+        alerts.append(_save_alert(
+            session,
+            user_id=rng.choice([1, 2, 3]),
+            keywords=" ".join(rng.sample(KEYWORDS, rng.randint(1, 2))),
+            item_type=rng.choice(["lost", "found"]),
+            category_id=rng.choice([None, 1, 2]),
+            location=rng.choice(LOCATIONS),
+            start_time=start,
+            end_time=start + timedelta(days=3) if start else None,
+        ))
+        if rng.random() < 0.1:
+            AlertService.deactivate(session, alerts[-1])
+    session.commit()
+
+    for post_id in range(1, 41):
+        post = _publish(
+            session, post_id,
+            title=" ".join(rng.sample(KEYWORDS, 3)),
+            item_type=rng.choice(["lost", "found", "general"]),
+            author_id=rng.choice([1, 2, 3]),
+            category_id=rng.choice([None, 1, 2]),
+            location=rng.choice(LOCATIONS),
+            item_time=ANCHOR - timedelta(days=rng.randint(0, 12)),
+        )
+        expected = {alert.id for alert in alerts if post.item_type != "general" and _satisfies(session, alert, post)}
+        assert {alert.id for alert in AlertService.percolate(session, post)} == expected, post_id
+
+
+def test_each_alert_is_notified_once_per_post(session, users):
+    alert = _save_alert(session, user_id=2, keywords="黑色 钱包", item_type="found")
+    _save_alert(session, user_id=1, keywords="钱包", item_type="found")  # the author's own alert
+    session.commit()
+    post = _publish(session, 1, title="捡到黑色钱包", item_type="found", author_id=1)
+
+    notifications = AlertService.notify_matches(session, post)
+
+    assert [notification.user_id for notification in notifications] == [2]
+    assert AlertService.notify_matches(session, post) == []
+    assert [matched.id for matched in AlertService.matched_posts(session, alert)] == [1]
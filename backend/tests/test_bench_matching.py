@@ -0,0 +1,65 @@
+"""
+Matching benchmark suite: the baseline comparison flags exactly the metrics
+that grew past the allowed regression, and every benchmarked path runs end to
+end on a small synthetic corpus.
+"""
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import ann_index
+from benchmarks import bench_matching
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert bench_matching.percentile(values, 50) == 50
+    assert bench_matching.percentile(values, 95) == 95
+    assert bench_matching.percentile(list(range(1, 21)), 95) == 19
+    assert bench_matching.percentile([7], 95) == 7
+
+
+def test_regressions_compare_against_the_baseline():
+    baseline = {"p50_ms": 10.0, "p95_ms": 20.0, "peak_kib": 100.0}
+    current = {"p50_ms": 12.4, "p95_ms": 26.0, "peak_kib": 90.0, "throughput_ops": 1.0}
+
+    found = bench_matching.regressions(current, baseline, max_regression=25)
+
+    assert len(found) == 1 and found[0].startswith("p95_ms 20.0 -> 26.0")
+    assert bench_matching.regressions(current, {}, max_regression=25) == []
+
+
+def test_saved_baselines_merge_per_corpus_size(tmp_path):
+    path = os.path.join(tmp_path, "baseline.json")
+    args = SimpleNamespace(seed=42, iterations=5)
+    bench_matching.save_baseline(path, {"1000": {"create-post": {"p50_ms": 1.0}}}, args)
+    bench_matching.save_baseline(path, {"1000": {"match-job": {"p50_ms": 2.0}}, "10000": {}}, args)
+
+    assert bench_matching.load_baseline(path) == {
+        "1000": {"create-post": {"p50_ms": 1.0}, "match-job": {"p50_ms": 2.0}},
+        "10000": {},
+    }
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["meta"]["seed"] == 42
+    assert bench_matching.load_baseline(os.path.join(tmp_path, "missing.json")) == {}
+
+
+def test_every_path_runs_on_a_small_corpus(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench_matching, "CORPUS_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "MATCH_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "SEMANTIC_INDEX_PATH", os.path.join(tmp_path, "semantic.npz"))
+    monkeypatch.setattr(ann_index, "_semantic_index", None)
+
+    path = bench_matching.build_corpus(300, seed=7)
+    engine = bench_matching.make_engine(path)
+    try:
+        operations = bench_matching.build_operations(engine, 300, 7, iterations=3)
+        for name in bench_matching.PATHS:
+            stats = bench_matching.run_path(operations[name], iterations=3, warmup=1, memory_iterations=1)
+            assert stats["iterations"] == 3
+            assert 0 < stats["p50_ms"] <= stats["p95_ms"], name
+    finally:
+        engine.dispose()
@@ -0,0 +1,116 @@
+"""
+Incrementally maintained corpus statistics: document count, per-term document
+frequencies and the total term count, updated atomically as documents enter,
+change or leave the corpus.
+"""
+import math
+import threading
+from types import SimpleNamespace
+
+import pytest
+from sqlmodel import Session, select
+
+from app.core.upsert import increment
+from app.models.post_index import CorpusStat, TermStat
+from app.services.corpus_stats import CorpusStatsService, DOC_COUNT_KEY
+
+
+def _doc_freqs(session) -> dict:
+    return dict(session.exec(select(TermStat.term, TermStat.doc_freq)).all())
+
+
+def test_documents_entering_changing_and_leaving(session):
+    CorpusStatsService.reset(session, 0, {})
+    CorpusStatsService.update_document(session, [], ["钱包", "黑色"])
+    CorpusStatsService.update_document(session, [], ["钱包", "手机"])
+    session.commit()
+    assert CorpusStatsService.get_doc_count(session) == 2
+    assert _doc_freqs(session) == {"钱包": 2, "黑色": 1, "手机": 1}
+    assert CorpusStatsService.get_term_count(session) == 4
+
+    # edited: 黑色 -> 红色
+    CorpusStatsService.update_document(session, ["钱包", "黑色"], ["钱包", "红色"])
+    session.commit()
+    assert CorpusStatsService.get_doc_count(session) == 2
+    assert _doc_freqs(session) == {"钱包": 2, "红色": 1, "手机": 1}
+
+    # removed: terms whose frequency drops to zero are deleted
+    CorpusStatsService.update_document(session, ["钱包", "手机"], [])
+    session.commit()
+    assert CorpusStatsService.get_doc_count(session) == 1
+    assert _doc_freqs(session) == {"钱包": 1, "红色": 1}
+    assert CorpusStatsService.get_term_count(session) == 2
+    assert CorpusStatsService.get_average_doc_length(session) == 2
+
+
+def test_idf_is_smoothed_like_sklearn(session):
+    CorpusStatsService.update_document(session, [], ["钱包"])
+    CorpusStatsService.update_document(session, [], ["钱包", "手机"])
+    session.commit()
+
+    idf = CorpusStatsService.get_idf(session, ["钱包", "手机", "雨伞"])
+
+    assert idf["钱包"] == pytest.approx(math.log(3 / 3) + 1)
+    assert idf["手机"] == pytest.approx(math.log(3 / 2) + 1)
+    assert idf["雨伞"] == pytest.approx(math.log(3 / 1) + 1)  # unseen term
+
+
+def test_term_count_falls_back_to_the_sum_of_frequencies(session):
+    CorpusStatsService.update_document(session, [], ["钱包", "手机"])
+    session.commit()
+    assert session.get(CorpusStat, "term_count") is None
+    assert CorpusStatsService.get_term_count(session) == 2
+
+    CorpusStatsService.ensure_term_count(session)
+    CorpusStatsService.update_document(session, [], ["雨伞"])
+    session.commit()
+    assert session.get(CorpusStat, "term_count").value == 3
+
+
+def test_concurrent_documents_introduce_the_same_new_term(engine, session):
+    writers = 8
+    barrier = threading.Barrier(writers)
+    errors = []
+
+    def add_document(index: int):
+        try:
+            with Session(engine) as writer:
+                barrier.wait(timeout=10)
+                CorpusStatsService.update_document(writer, [], ["雨伞", f"词{index}"])
+                writer.commit()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=add_document, args=(index,)) for index in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert CorpusStatsService.get_doc_count(session) == writers
+    assert _doc_freqs(session)["雨伞"] == writers
+
+
+def test_increment_inserts_or_adds_in_one_statement(session):
+    increment(session, CorpusStat, [{"key": DOC_COUNT_KEY}], "value", 2)
+    increment(session, TermStat, [{"term": "钱包"}, {"term": "手机"}], "doc_freq", 1)
+    session.commit()
+    # rows written by another session are updated in place, not re-inserted
+    with Session(session.get_bind()) as other:
+        increment(other, CorpusStat, [{"key": DOC_COUNT_KEY}], "value", 3)
+        increment(other, TermStat, [{"term": "钱包"}], "doc_freq", 1)
+        other.commit()
+
+    session.expire_all()
+    assert session.get(CorpusStat, DOC_COUNT_KEY).value == 5
+    assert _doc_freqs(session) == {"钱包": 2, "手机": 1}
+
+    increment(session, TermStat, [{"term": "雨伞"}], "doc_freq", 0)
+    assert "雨伞" not in _doc_freqs(session)
+
+
+def test_increment_rejects_unsupported_dialects():
+    session = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="mssql")))
+    with pytest.raises(NotImplementedError):
+        increment(session, TermStat, [{"term": "钱包"}], "doc_freq", 1)
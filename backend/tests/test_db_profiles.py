@@ -0,0 +1,64 @@
+"""
+Database engine profiles: every new SQLite connection gets the profile's
+PRAGMAs, so readers are not blocked by an open write transaction, and pool
+settings only reach non-SQLite engines.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.db_profiles import PROFILES, apply_sqlite_pragmas, engine_options, get_profile
+
+
+def _engine(tmp_path, profile_name: str):
+    url = f"sqlite:///{os.path.join(tmp_path, 'profile.db')}"
+    profile = get_profile(profile_name)
+    engine = create_engine(url, **engine_options(profile, url))
+    apply_sqlite_pragmas(engine, profile)
+    return engine
+
+
+@pytest.mark.parametrize("profile_name", ["dev", "prod-sqlite"])
+def test_pragmas_are_applied_to_new_connections(tmp_path, profile_name):
+    engine = _engine(tmp_path, profile_name)
+    expected = {"journal_mode": "wal", "busy_timeout": 5000, "synchronous": 2, "temp_store": 0}
+    if profile_name == "prod-sqlite":
+        expected.update(synchronous=1, temp_store=2, cache_size=-64 * 1024)
+    try:
+        with engine.connect() as connection:
+            for name, value in expected.items():
+                assert connection.exec_driver_sql(f"PRAGMA {name}").scalar() == value, name
+    finally:
+        engine.dispose()
+
+
+def test_readers_are_not_blocked_by_a_writer(tmp_path):
+    engine = _engine(tmp_path, "dev")
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+            connection.execute(text("INSERT INTO items VALUES (1)"))
+
+        with engine.connect() as writer, engine.connect() as reader:
+            writer.execute(text("BEGIN IMMEDIATE"))
+            writer.execute(text("INSERT INTO items VALUES (2)"))
+            # the reader sees the last committed state instead of waiting for the write lock
+            assert reader.execute(text("SELECT count(*) FROM items")).scalar() == 1
+            writer.execute(text("COMMIT"))
+            assert reader.execute(text("SELECT count(*) FROM items")).scalar() == 2
+    finally:
+        engine.dispose()
+
+
+def test_pool_options_only_apply_to_server_databases():
+    profile = get_profile("prod-postgres")
+    options = engine_options(profile, "postgresql://user@localhost/lostandfound", echo=True, pool_size=4)
+    assert options == {"echo": True, **PROFILES["prod-postgres"].pool, "pool_size": 4}
+
+    sqlite_options = engine_options(profile, "sqlite:///./lostandfound.db")
+    assert "pool_size" not in sqlite_options
+    assert sqlite_options["connect_args"] == {"check_same_thread": False}
+
+    with pytest.raises(ValueError):
+        get_profile("prod")
@@ -0,0 +1,90 @@
+"""
+MinHash/LSH near-duplicate detection: signatures estimate shingle Jaccard
+similarity, LSH finds reposts of open posts of the same type, and duplicate
+clusters stay one level deep as posts are edited.
+"""
+import pytest
+
+from app.models.post import Post
+from app.services.duplicate_detection import DuplicateDetectionService
+from conftest import add_post, add_user
+
+TEXT = "今天下午在图书馆三楼自习室丢了一个黑色钱包，里面有校园卡和身份证，捡到请联系"
+REPOST = "今天下午在图书馆三楼自习室丢了一个黑色钱包，里面有校园卡和身份证，捡到请联系我"
+OTHER = "食堂二楼捡到一把蓝色雨伞，伞柄上贴着名字，失主请到宿管处领取"
+
+
+def _jaccard(first: str, second: str) -> float:
+    a, b = DuplicateDetectionService.shingles(first), DuplicateDetectionService.shingles(second)
+    return len(a & b) / len(a | b)
+
+
+def _publish(session, post_id: int, text: str, **fields):
+    post = add_post(session, post_id, title=text, content="", **fields)
+    session.flush()
+    record = DuplicateDetectionService.sync_post(session, post)
+    session.commit()
+    return record
+
+
+@pytest.fixture
+def author(session):
+    add_user(session, 1)
+    session.commit()
+
+
+def test_signature_estimates_jaccard_similarity():
+    for first, second in [(TEXT, REPOST), (TEXT, TEXT[:30] + OTHER[:20]), (TEXT, OTHER)]:
+        estimate = DuplicateDetectionService.estimate_similarity(
+            DuplicateDetectionService.compute_signature(first),
+            DuplicateDetectionService.compute_signature(second),
+        )
+        assert estimate == pytest.approx(_jaccard(first, second), abs=0.2)
+
+
+def test_normalization_ignores_width_case_and_punctuation():
+    assert DuplicateDetectionService.compute_signature("ＩＰＨＯＮＥ 13，黑色！") == \
+        DuplicateDetectionService.compute_signature("iphone13黑色")
+    assert DuplicateDetectionService.compute_signature("，。！") == []
+
+
+def test_reposts_of_open_posts_of_the_same_type_are_marked(session, author):
+    _publish(session, 1, TEXT)
+    _publish(session, 2, TEXT, item_type="found")
+    _publish(session, 3, TEXT, is_claimed=True)
+    _publish(session, 4, OTHER)
+
+    record = _publish(session, 5, REPOST)
+
+    assert record.duplicate_of_id == 1  # the found post and the claimed post are not duplicates of a lost report
+    assert record.similarity >= 0.8
+    assert DuplicateDetectionService.canonical_ids(session, [1, 4, 5]) == {1: 1, 4: 4, 5: 1}
+
+
+def test_clusters_stay_one_level_deep(session, author):
+    _publish(session, 1, TEXT)
+    assert _publish(session, 2, REPOST).duplicate_of_id == 1
+    _publish(session, 3, OTHER)
+
+    # the original of the cluster is edited into a repost of another post: its duplicates follow it
+    post = session.get(Post, 1)
+    post.title = OTHER
+    DuplicateDetectionService.sync_post(session, post)
+    session.commit()
+
+    assert DuplicateDetectionService.canonical_ids(session, [1, 2, 3]) == {1: 3, 2: 3, 3: 3}
+    clusters, total = DuplicateDetectionService.list_clusters(session)
+    assert total == 1
+    assert clusters[0]["post"]["id"] == 3
+    assert sorted(item["id"] for item in clusters[0]["duplicates"]) == [1, 2]
+
+
+def test_backfill_recomputes_clusters_in_publishing_order(session, author):
+    for post_id, text in [(1, TEXT), (2, OTHER), (3, REPOST)]:
+        add_post(session, post_id, title=text, content="")
+    session.commit()
+
+    assert DuplicateDetectionService.backfill(session) == 3
+    assert DuplicateDetectionService.backfill(session) == 0
+    assert DuplicateDetectionService.canonical_ids(session, [1, 2, 3]) == {1: 1, 2: 2, 3: 1}
+    assert DuplicateDetectionService.backfill(session, only_missing=False) == 3
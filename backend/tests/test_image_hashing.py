@@ -0,0 +1,89 @@
+"""
+Perceptual image hashing: dHash is stable under resizing and re-compression,
+the multi-index hash finds exactly the hashes within a Hamming radius, and the
+image index never returns a hash a post no longer has.
+"""
+import random
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.models.post import Post
+from app.services.image_hash import IMAGE_MATCH_RADIUS, ImageHashService
+from app.services.image_index import ImageIndex, MultiIndexHash
+from conftest import add_post, add_user
+
+
+def _photo(seed: int, size=(320, 240), quality: int = 90) -> bytes:
+    rng = np.random.default_rng(seed)
+    # smooth random texture, like a photo rather than noise
+    small = rng.integers(0, 256, (6, 8, 3), dtype=np.uint8)
+    image = Image.fromarray(small).resize((320, 240), Image.Resampling.BICUBIC).resize(size)
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def test_hash_survives_resizing_and_recompression():
+    original = ImageHashService.compute_hash(_photo(1))
+    variant = ImageHashService.compute_hash(_photo(1, size=(160, 120), quality=40))
+    other = ImageHashService.compute_hash(_photo(2))
+
+    assert ImageHashService.hamming(original, variant) <= IMAGE_MATCH_RADIUS
+    assert ImageHashService.hamming(original, other) > IMAGE_MATCH_RADIUS
+    assert ImageHashService.compute_hash(b"not an image") is None
+    assert -(1 << 63) <= original < 1 << 63
+
+
+def test_similarity_falls_with_distance():
+    assert ImageHashService.similarity(0) == 1.0
+    assert 0 < ImageHashService.similarity(IMAGE_MATCH_RADIUS) < ImageHashService.similarity(3) < 1
+    assert ImageHashService.similarity(IMAGE_MATCH_RADIUS + 1) == 0.0
+
+
+@pytest.mark.parametrize("radius", [0, 3, 4, 10, 12])
+def test_multi_index_hash_equals_a_linear_scan(radius):
+    rng = random.Random(radius)
+    bases = [rng.getrandbits(64) for _ in range(20)]
+    index, stored = MultiIndexHash(), []
+    for post_id in range(1, 601):
+        value = rng.choice(bases)
+        for bit in rng.sample(range(64), rng.randint(0, 16)):
+            value ^= 1 << bit
+        value = ImageHashService.to_signed(value)
+        index.add(value, post_id)
+        stored.append((value, post_id))
+
+    for query in bases:
+        expected = {}
+        for value, post_id in stored:
+            distance = ImageHashService.hamming(query, value)
+            if distance <= radius:
+                expected[post_id] = min(distance, expected.get(post_id, 64))
+        assert index.search(query, radius) == expected
+
+
+def test_index_drops_replaced_images(session):
+    add_user(session, 1)
+    for url, seed in [("/uploads/images/a.jpg", 1), ("/uploads/images/b.jpg", 2)]:
+        ImageHashService.store_upload(session, url, _photo(seed))
+    post = add_post(session, 1, item_type="found", images=["/uploads/images/a.jpg"])
+    add_post(session, 2, item_type="lost", images=["/uploads/images/a.jpg"])
+    session.flush()
+    ImageHashService.sync_post(session, post)
+    ImageHashService.sync_post(session, session.get(Post, 2))
+    session.commit()
+
+    index = ImageIndex()
+    query = [ImageHashService.compute_hash(_photo(1, size=(200, 150)))]
+    assert [post_id for post_id, _ in index.search(session, query, "found", IMAGE_MATCH_RADIUS)] == [1]
+
+    post.images = ["/uploads/images/b.jpg"]
+    ImageHashService.sync_post(session, post)
+    session.commit()
+    index._last_sync = 0.0
+
+    assert index.search(session, query, "found", IMAGE_MATCH_RADIUS) == []
+    assert [post_id for post_id, _ in index.search(session, query, "lost", IMAGE_MATCH_RADIUS)] == [2]
@@ -0,0 +1,88 @@
+"""
+The post list endpoints load relationships in batches, so the number of SQL
+statements a request executes must not depend on the page size (no N+1).
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.deps import get_current_admin_user
+from app.core.eager_loading import count_queries
+from app.database import get_session
+from app.main import app
+from app.models.comment import Comment
+from app.models.user import User
+from app.services.post_counts import invalidate_post_counts
+from conftest import add_category, add_post, add_user
+
+POSTS = 240
+USERS = 12
+CATEGORIES = 6
+PAGE_SIZES = (10, 100)
+
+ENDPOINTS = {
+    "list_posts": ("/api/posts/", {}),
+    "list_posts summary": ("/api/posts/", {"fields": "summary"}),
+    "list_posts search": ("/api/posts/", {"search": "钱包"}),
+    "advanced_search": ("/api/posts/search/advanced", {"item_type": "lost"}),
+    "get_user_posts": ("/api/users/1/posts", {}),
+    "admin_list_posts": ("/api/admin/posts", {}),
+}
+
+
+@pytest.fixture
+def client(engine):
+    with Session(engine) as session:
+        for user_id in range(1, USERS + 1):
+            add_user(session, user_id, is_admin=user_id == 1)
+        for category_id in range(1, CATEGORIES + 1):
+            add_category(session, category_id)
+        session.flush()
+        for post_id in range(1, POSTS + 1):
+            # user 1 writes two thirds of the posts; every author, category and comment writer varies
+            add_post(
+                session, post_id,
+                item_type="lost" if post_id % 2 else "found",
+                author_id=1 if post_id % 3 else post_id % USERS + 1,
+                category_id=post_id % CATEGORIES + 1,
+                comment_count=2,
+            )
+            session.add_all([
+                Comment(content="是我的", post_id=post_id, author_id=(post_id + offset) % USERS + 1)
+                for offset in range(2)
+            ])
+        session.commit()
+
+    def _session():
+        with Session(engine) as session:
+            yield session
+
+    def _admin():
+        with Session(engine) as session:
+            return session.get(User, 1)
+
+    app.dependency_overrides[get_session] = _session
+    app.dependency_overrides[get_current_admin_user] = _admin
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def _statements(client: TestClient, engine, url: str, params: dict, page_size: int) -> int:
+    # the exact total is cached per filter; start every request from the same (cold) state
+    invalidate_post_counts()
+    with count_queries(engine) as queries:
+        response = client.get(url, params={**params, "limit": page_size})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    rows = body if isinstance(body, list) else body["data"]
+    assert len(rows) == page_size
+    return queries.count
+
+
+@pytest.mark.parametrize("name", list(ENDPOINTS))
+def test_statement_count_does_not_depend_on_page_size(client, engine, name):
+    url, params = ENDPOINTS[name]
+    # one-time work (e.g. detecting the search backend) is cached per process, not per page
+    _statements(client, engine, url, params, PAGE_SIZES[0])
+    counts = {page_size: _statements(client, engine, url, params, page_size) for page_size in PAGE_SIZES}
+    assert len(set(counts.values())) == 1, f"{name} runs {counts} statements per page size"
@@ -0,0 +1,79 @@
+"""
+Location trigram index: indexed similarities equal the in-memory Jaccard
+similarity of the normalized locations, and threshold pruning in the database
+drops exactly the posts below the threshold.
+"""
+import pytest
+from sqlmodel import select
+
+from app.models.location_index import LocationTrigram
+from app.models.post import Post
+from app.services.location_index import LocationIndexService
+from conftest import add_post, add_user
+
+LOCATIONS = [
+    "图书馆3楼", "图书馆 3楼", "图书馆三楼", "图书馆", "第二食堂", "二食堂", "食堂",
+    "3号教学楼", "三号教学楼", "体育馆", "Gym", "ＧＹＭ 北门", None,
+]
+
+
+@pytest.fixture
+def located(session):
+    add_user(session, 1)
+    for post_id, location in enumerate(LOCATIONS, start=1):
+        post = add_post(session, post_id, location=location)
+        session.flush()
+        LocationIndexService.sync_post(session, post)
+    session.commit()
+
+
+def test_normalize():
+    assert LocationIndexService.normalize("ＧＹＭ 北门!") == "gym北门"
+    assert LocationIndexService.normalize("图书馆 3楼") == LocationIndexService.normalize("图书馆3楼")
+    assert LocationIndexService.normalize(None) == ""
+    assert LocationIndexService.trigrams("食堂") == {"^食堂", "食堂$"}
+
+
+@pytest.mark.parametrize("query", ["图书馆3楼", "食堂", "gym", "三号教学楼"])
+@pytest.mark.parametrize("threshold", [0.0, 0.2, 0.5])
+def test_indexed_similarity_equals_in_memory_similarity(session, located, query, threshold):
+    expected = {
+        post_id: LocationIndexService.similarity(query, location)
+        for post_id, location in enumerate(LOCATIONS, start=1)
+    }
+    expected = {
+        post_id: similarity for post_id, similarity in expected.items()
+        if similarity > 0 and similarity >= threshold
+    }
+
+    result = LocationIndexService.similarities(session, LocationIndexService.normalize(query), min_similarity=threshold)
+
+    assert result == pytest.approx(expected)
+
+
+def test_similarities_are_limited_to_the_given_posts(session, located):
+    result = LocationIndexService.similarities(session, "图书馆3楼", post_ids=[2, 5])
+    assert set(result) == {2}
+    assert result[2] == 1.0
+    assert LocationIndexService.similarities(session, "图书馆3楼", post_ids=[]) == {}
+
+
+def test_location_changes_replace_trigrams(session, located):
+    post = session.get(Post, 1)
+    post.location = None
+    LocationIndexService.sync_post(session, post)
+    session.commit()
+
+    assert post.location_normalized is None
+    assert session.exec(select(LocationTrigram).where(LocationTrigram.post_id == 1)).all() == []
+
+
+def test_backfill_fills_missing_normalized_locations(session):
+    add_user(session, 1)
+    add_post(session, 1, location="图书馆 3楼")
+    add_post(session, 2)
+    session.commit()
+
+    assert LocationIndexService.backfill(session) == 1
+    assert LocationIndexService.backfill(session) == 0
+    assert LocationIndexService.similarities(session, "图书馆3楼") == {1: 1.0}
@@ -0,0 +1,111 @@
+"""
+Match result cache: entries are invalidated through the posts they depend on,
+results computed across an invalidation of one of their own dependencies are
+not stored, and the shared tier propagates invalidations between processes.
+"""
+import os
+
+import pytest
+
+from app.services import match_cache
+from app.services.match_cache import MatchCache
+
+
+def _cache(**options) -> MatchCache:
+    return MatchCache(**{"max_entries": 16, "ttl_seconds": 60, **options})
+
+
+def test_hit_after_set():
+    cache = _cache()
+    assert cache.get(1, 10, 7, "topk") is None
+    cache.set(1, 10, 7, "topk", [5, 6])
+    assert cache.get(1, 10, 7, "topk") == [5, 6]
+    # every parameter is part of the key
+    assert cache.get(1, 5, 7, "topk") is None
+    assert cache.get(1, 10, 7, "semantic") is None
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("post_id,dropped", [(1, True), (6, True), (9, False)])
+def test_invalidation_follows_dependencies(post_id, dropped):
+    cache = _cache()
+    cache.set(1, 10, 7, "topk", [5, 6])
+    cache.set(2, 10, 7, "topk", [9])
+
+    cache.invalidate([post_id])
+
+    assert (cache.get(1, 10, 7, "topk") is None) == dropped
+    # the entry for post 2 only depends on posts 2 and 9
+    assert (cache.get(2, 10, 7, "topk") is None) == (post_id == 9)
+
+
+def test_fill_is_discarded_when_its_dependency_changed_meanwhile():
+    cache = _cache()
+    generation = cache.generation()
+    cache.invalidate([6])  # a result post was edited while the matches were being computed
+    cache.set(1, 10, 7, "topk", [5, 6], generation)
+
+    assert cache.get(1, 10, 7, "topk") is None
+    assert cache.stats()["stale_writes_skipped"] == 1
+
+
+def test_fill_survives_unrelated_invalidations():
+    cache = _cache()
+    generation = cache.generation()
+    cache.invalidate([40])
+    cache.invalidate([41, 42])
+    cache.set(1, 10, 7, "topk", [5, 6], generation)
+
+    assert cache.get(1, 10, 7, "topk") == [5, 6]
+
+
+def test_fill_is_discarded_once_invalidation_history_is_evicted():
+    cache = _cache(max_entries=1)
+    cache._max_tracked_invalidations = 4
+    generation = cache.generation()
+    for post_id in range(100, 110):
+        cache.invalidate([post_id])
+    # the history no longer reaches back to the generation, so the result cannot be proven fresh
+    cache.set(1, 10, 7, "topk", [5], generation)
+
+    assert cache.get(1, 10, 7, "topk") is None
+    assert len(cache._invalidated_at) == 4
+
+
+def test_expired_and_evicted_entries_miss():
+    cache = _cache(max_entries=2)
+    for post_id in (1, 2, 3):
+        cache.set(post_id, 10, 7, "topk", [post_id + 10])
+    assert cache.get(1, 10, 7, "topk") is None
+    assert cache.get(3, 10, 7, "topk") == [13]
+    assert cache.stats()["evictions"] == 1
+
+    expired = _cache(ttl_seconds=0)
+    expired.set(1, 10, 7, "topk", [11])
+    assert expired.get(1, 10, 7, "topk") is None
+
+
+def test_evicted_entries_stop_tracking_their_dependencies():
+    cache = _cache(max_entries=1)
+    cache.set(1, 10, 7, "topk", [11])
+    cache.set(2, 10, 7, "topk", [12])
+
+    assert 11 not in cache._dependents and 1 not in cache._dependents
+    cache.invalidate([11])
+    assert cache.get(2, 10, 7, "topk") == [12]
+
+
+def test_shared_tier_propagates_fills_and_invalidations(tmp_path, monkeypatch):
+    monkeypatch.setattr(match_cache, "EVENT_SYNC_INTERVAL_SECONDS", 0)
+    path = os.path.join(tmp_path, "match_cache.db")
+    first, second = _cache(shared_path=path), _cache(shared_path=path)
+
+    first.set(1, 10, 7, "topk", [5, 6])
+    assert second.get(1, 10, 7, "topk") == [5, 6]
+    assert second.stats()["shared_hits"] == 1
+
+    # another process edits post 6: both the shared entry and the first process's local copy go away
+    second.invalidate([6])
+    assert first.get(1, 10, 7, "topk") is None
+    assert second.get(1, 10, 7, "topk") is None
+    assert second.stats()["shared_invalidations"] == 1
@@ -0,0 +1,140 @@
+"""
+Match job queue: claiming, retry with exponential backoff, permanent failure
+and requeueing of jobs abandoned by a dead worker.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session
+
+from app.models.match_job import MatchJob, MatchJobStatus
+from app.services.match_job_service import MatchJobService, RETRY_BASE_SECONDS, STALE_RUNNING_MINUTES
+from app.services.post_match_service import PostMatchService
+from conftest import add_post, add_user
+
+
+@pytest.fixture
+def job_id(session):
+    add_user(session, 1)
+    session.flush()
+    add_post(session, 1, item_type="lost")
+    session.flush()
+    job = MatchJobService.enqueue(session, 1)
+    session.commit()
+    return job.id
+
+
+def _job(engine, job_id: int) -> MatchJob:
+    with Session(engine) as session:
+        return session.get(MatchJob, job_id)
+
+
+def _make_due(engine, job_id: int):
+    with Session(engine) as session:
+        job = session.get(MatchJob, job_id)
+        job.run_after = datetime.utcnow() - timedelta(seconds=1)
+        session.add(job)
+        session.commit()
+
+
+def _fail_run_job(monkeypatch):
+    def run_job(session, job):
+        raise RuntimeError("scoring failed")
+    monkeypatch.setattr(MatchJobService, "run_job", staticmethod(run_job))
+
+
+def test_claim_next_marks_job_running_once(engine, job_id):
+    with Session(engine) as session:
+        job = MatchJobService.claim_next(session)
+        assert job.id == job_id
+        assert job.status == MatchJobStatus.RUNNING
+        assert job.attempts == 1
+        assert job.started_at is not None
+        # a claimed job is no longer pending, so a second worker gets nothing
+        assert MatchJobService.claim_next(session) is None
+
+
+def test_claim_next_skips_jobs_waiting_for_retry(engine, job_id):
+    with Session(engine) as session:
+        job = session.get(MatchJob, job_id)
+        job.run_after = datetime.utcnow() + timedelta(minutes=1)
+        session.add(job)
+        session.commit()
+        assert MatchJobService.claim_next(session) is None
+
+
+def test_execute_next_completes_job(engine, job_id):
+    processed, pushes = MatchJobService.execute_next()
+
+    job = _job(engine, job_id)
+    assert processed and pushes == []
+    assert job.status == MatchJobStatus.COMPLETED
+    assert job.result["skipped"] is False
+    assert job.last_error is None and job.finished_at is not None
+
+
+def test_execute_next_without_jobs(engine):
+    assert MatchJobService.execute_next() == (False, [])
+
+
+def test_failed_attempts_back_off_exponentially(engine, job_id, monkeypatch):
+    _fail_run_job(monkeypatch)
+
+    for attempt in range(1, 3):
+        before = datetime.utcnow()
+        assert MatchJobService.execute_next() == (True, [])
+        job = _job(engine, job_id)
+        assert job.status == MatchJobStatus.PENDING
+        assert job.attempts == attempt
+        assert job.last_error == "scoring failed"
+        delay = (job.run_after - before).total_seconds()
+        expected = RETRY_BASE_SECONDS * 2 ** (attempt - 1)
+        assert expected - 1 <= delay <= expected + 1
+        # not due yet: the worker finds nothing until the backoff has elapsed
+        assert MatchJobService.execute_next() == (False, [])
+        _make_due(engine, job_id)
+
+
+def test_job_fails_permanently_after_max_attempts(engine, job_id, monkeypatch):
+    _fail_run_job(monkeypatch)
+    max_attempts = _job(engine, job_id).max_attempts
+
+    for _ in range(max_attempts):
+        _make_due(engine, job_id)
+        MatchJobService.execute_next()
+
+    job = _job(engine, job_id)
+    assert job.status == MatchJobStatus.FAILED
+    assert job.attempts == max_attempts
+    assert job.finished_at is not None
+    _make_due(engine, job_id)
+    assert MatchJobService.execute_next() == (False, [])
+
+
+def test_refresh_failure_retries_the_job(engine, job_id, monkeypatch):
+    def refresh_new_post(session, post):
+        raise RuntimeError("refresh failed")
+    monkeypatch.setattr(PostMatchService, "refresh_new_post", staticmethod(refresh_new_post))
+
+    MatchJobService.execute_next()
+
+    job = _job(engine, job_id)
+    assert job.status == MatchJobStatus.PENDING
+    assert job.last_error == "refresh failed"
+    assert job.result is None
+
+
+def test_requeue_stale_jobs(engine, job_id):
+    with Session(engine) as session:
+        job = session.get(MatchJob, job_id)
+        job.status = MatchJobStatus.RUNNING
+        job.started_at = datetime.utcnow() - timedelta(minutes=STALE_RUNNING_MINUTES + 1)
+        session.add(job)
+        fresh = MatchJob(post_id=1, status=MatchJobStatus.RUNNING, started_at=datetime.utcnow())
+        session.add(fresh)
+        session.commit()
+        fresh_id = fresh.id
+
+    assert MatchJobService.requeue_stale_jobs() == 1
+    assert _job(engine, job_id).status == MatchJobStatus.PENDING
+    assert _job(engine, fresh_id).status == MatchJobStatus.RUNNING
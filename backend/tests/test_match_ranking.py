@@ -0,0 +1,164 @@
+"""
+Threshold-Algorithm top-k matching: MatchRankingService.top_k stops reading
+the sorted sources early, but must return exactly the k best posts an
+exhaustive scoring of every open candidate would return.
+"""
+import random
+from datetime import timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.models.post import Post
+from app.models.post_signature import PostSignature
+from app.services import match_ranking
+from app.services.location_index import LocationIndexService
+from app.services.match_ranking import MIN_MATCH_SCORE, MatchRankingService, _ClusterTopK
+from app.services.post_features import PostFeatureService
+from app.services.post_index import PostIndexService
+from app.services.text_similarity import TextSimilarityService
+from conftest import ANCHOR, add_category, add_post, add_user
+
+POSTS = 300
+ITEMS = ["黑色钱包", "苹果手机", "宿舍钥匙", "校园卡", "蓝牙耳机", "雨伞", "笔记本电脑", "水杯"]
+PLACES = ["图书馆", "图书馆二楼", "第一食堂", "第二食堂", "体育馆", "教学楼A座", "教学楼B座", "学生宿舍"]
+DETAILS = ["在{place}丢失", "在{place}捡到", "{place}附近", "可能落在{place}", "请联系我"]
+
+
+@pytest.fixture
+def corpus(session):
+    rng = random.Random(7)
+    add_user(session, 1)
+    for category_id in range(1, 5):
+        add_category(session, category_id)
+    session.flush()
+    for post_id in range(1, POSTS + 1):
+        item, place = rng.choice(ITEMS), rng.choice(PLACES)
+        post = add_post(
+            session, post_id,
+            title=f"{rng.choice(['', '一个', '我的'])}{item}",
+            content=rng.choice(DETAILS).format(place=place) + f"，{rng.choice(ITEMS)}",
+            item_type=rng.choice(["lost", "found"]),
+            category_id=rng.choice([None, 1, 2, 3, 4]),
+            location=place if rng.random() < 0.8 else None,
+            item_time=ANCHOR + timedelta(days=rng.randint(-10, 10)) if rng.random() < 0.8 else None,
+            status="deleted" if post_id % 17 == 0 else "published",
+            is_claimed=post_id % 13 == 0,
+        )
+        _index(session, post)
+    session.commit()
+    return session
+
+
+def _index(session, post: Post):
+    session.flush()
+    PostFeatureService.refresh(session, post)
+    LocationIndexService.sync_post(session, post)
+    PostIndexService.sync_post(session, post)
+
+
+def _exhaustive(session, original: Post, time_range_days: int = 7):
+    """Score every open candidate and sort the same way top_k does"""
+    candidates = session.exec(select(Post).where(MatchRankingService.candidate_filter(original))).all()
+    feature = PostFeatureService.get(session, original)
+    query_weights = PostIndexService.query_weights(
+        session, TextSimilarityService.term_frequencies_from_tokens(feature.tokens)
+    )
+    components = MatchRankingService.score_components(
+        session, original, candidates, query_weights, time_range_days
+    )
+    scored = [(MatchRankingService.final_score(*components[post.id]), post.id) for post in candidates]
+    return sorted(((score, post_id) for score, post_id in scored if score > MIN_MATCH_SCORE),
+                  key=lambda item: (-item[0], item[1]))
+
+
+def _originals(session, count: int):
+    return session.exec(
+        select(Post).where(Post.status == "published", Post.is_claimed == False).order_by(Post.id).limit(count)
+    ).all()
+
+
+@pytest.mark.parametrize("limit", [1, 5, 20])
+def test_top_k_returns_the_exhaustive_top_k(corpus, limit, monkeypatch):
+    # small pages so that termination is decided by the score bounds, not by exhausting the sources
+    monkeypatch.setattr(match_ranking, "PAGE_SIZE", 4)
+    for original in _originals(corpus, 12):
+        exhaustive = _exhaustive(corpus, original)
+        ranked = MatchRankingService.top_k(corpus, original, limit=limit)
+
+        # ties at the k-th score may resolve to different posts, so compare the scores
+        assert [round(score, 6) for score, _ in ranked] == [round(score, 6) for score, _ in exhaustive[:limit]]
+        exact = {post_id: score for score, post_id in exhaustive}
+        for score, post in ranked:
+            assert post.id != original.id
+            assert post.item_type != original.item_type
+            assert post.status == "published" and not post.is_claimed
+            assert score == pytest.approx(exact[post.id])
+
+
+def test_top_k_stops_before_scoring_every_candidate(session, monkeypatch):
+    add_user(session, 1)
+    add_category(session, 1)
+    add_category(session, 2)
+    session.flush()
+    original = add_post(session, 1, title="黑色钱包", content="在图书馆丢失黑色钱包", item_type="lost",
+                        category_id=1, location="图书馆", item_time=ANCHOR)
+    _index(session, original)
+    for post_id in range(2, 5):
+        _index(session, add_post(session, post_id, title="捡到黑色钱包", content="在图书馆捡到黑色钱包",
+                                 item_type="found", category_id=1, location="图书馆", item_time=ANCHOR))
+    for post_id in range(5, 205):
+        _index(session, add_post(session, post_id, title=f"雨伞{post_id}", content="在体育馆捡到钱包",
+                                 item_type="found", category_id=2, location="体育馆"))
+    session.commit()
+
+    monkeypatch.setattr(match_ranking, "PAGE_SIZE", 5)
+    scored = []
+    score_batch = MatchRankingService._score_batch
+
+    def counting_score_batch(session, original_post, post_ids, *args, **kwargs):
+        scored.extend(post_ids)
+        return score_batch(session, original_post, post_ids, *args, **kwargs)
+
+    monkeypatch.setattr(MatchRankingService, "_score_batch", staticmethod(counting_score_batch))
+
+    ranked = MatchRankingService.top_k(session, original, limit=3)
+
+    assert sorted(post.id for _, post in ranked) == [2, 3, 4]
+    assert [round(score, 6) for score, _ in ranked] == [round(score, 6) for score, _ in _exhaustive(session, original)[:3]]
+    # the three strong matches push the k-th score above the bound of every unread post
+    assert len(set(scored)) < 50
+
+
+def test_top_k_keeps_one_post_per_duplicate_cluster(corpus):
+    original = _originals(corpus, 1)[0]
+    best = MatchRankingService.top_k(corpus, original, limit=5)
+    first, second = best[0][1], best[1][1]
+    # mark the runner-up as a duplicate of the best match
+    corpus.add(PostSignature(post_id=first.id, signature=[]))
+    corpus.add(PostSignature(post_id=second.id, signature=[], duplicate_of_id=first.id, similarity=0.9))
+    corpus.commit()
+
+    ranked = MatchRankingService.top_k(corpus, original, limit=5)
+
+    ids = [post.id for _, post in ranked]
+    assert first.id in ids and second.id not in ids
+    assert len(ranked) == min(5, len(_exhaustive(corpus, original)) - 1)
+
+
+def test_cluster_top_k_bounds():
+    heap = _ClusterTopK(2)
+    posts = {post_id: Post(id=post_id, title="", content="", item_type="lost", author_id=1) for post_id in range(1, 6)}
+    assert heap.threshold() == MIN_MATCH_SCORE
+
+    heap.push(50, posts[1], cluster=1)
+    heap.push(40, posts[2], cluster=2)
+    assert heap.threshold() == 40
+    # below the k-th score: rejected
+    heap.push(30, posts[3], cluster=3)
+    # a better post of an existing cluster replaces it instead of taking a new slot
+    heap.push(60, posts[4], cluster=2)
+    assert heap.threshold() == 50
+    heap.push(55, posts[5], cluster=5)
+
+    assert [(score, post.id) for score, post in heap.ranked()] == [(60, 4), (55, 5)]
@@ -0,0 +1,103 @@
+"""
+Pluggable matching engines: BM25 ranks the open candidates of the opposite
+type by exactly the BM25 score computed from corpus statistics, and engines
+are selected by name from the registry (also per request via ?engine=).
+"""
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import select
+
+from app.main import app
+from app.models.post import Post
+from app.services import matching_engines
+from app.services.corpus_stats import CorpusStatsService
+from app.services.matching_engines import Bm25Engine, MatchingEngine, get_matching_engine, register_engine
+from app.services.post_features import PostFeatureService
+from app.services.post_index import PostIndexService
+from app.services.text_similarity import TextSimilarityService
+from conftest import add_post, add_user
+
+WORDS = ["黑色", "钱包", "手机", "图书馆", "食堂", "钥匙", "校园卡", "雨伞", "耳机", "红色"]
+
+
+@pytest.fixture
+def corpus(session):
+    rng = random.Random(4)
+    add_user(session, 1)
+    session.flush()
+    for post_id in range(1, 81):
+        post = add_post(
+            session, post_id,
+            title=" ".join(rng.choices(WORDS, k=rng.randint(2, 5))), content="请联系我",
+            item_type=rng.choice(["lost", "found"]),
+            is_claimed=post_id % 10 == 0,
+        )
+        session.flush()
+        PostFeatureService.refresh(session, post)
+        PostIndexService.sync_post(session, post)
+    session.commit()
+    return session
+
+
+def _brute_force_bm25(session, original: Post) -> list:
+    engine = Bm25Engine()
+    tokens = PostFeatureService.get(session, original).tokens
+    query = TextSimilarityService.term_frequencies_from_tokens(tokens)
+    doc_count = CorpusStatsService.get_doc_count(session)
+    doc_freqs = CorpusStatsService.get_doc_freqs(session, query)
+    idf = {term: engine.idf(doc_count, doc_freqs.get(term, 0)) for term in query}
+    avg_length = CorpusStatsService.get_average_doc_length(session)
+    self_score = engine.score(query, idf, avg_length)
+
+    scored = []
+    candidates = session.exec(select(Post).where(
+        Post.item_type == engine.target_type(original), Post.is_claimed == False, Post.id != original.id
+    )).all()
+    for post in candidates:
+        freqs = TextSimilarityService.term_frequencies_from_tokens(PostFeatureService.get(session, post).tokens)
+        score = engine.score(freqs, idf, avg_length)
+        if score > 0:
+            scored.append((post.id, min(1.0, score / self_score)))
+    return sorted(scored, key=lambda item: (-item[1], item[0]))
+
+
+def test_bm25_ranks_by_the_bm25_score(corpus):
+    for original in corpus.exec(select(Post).where(Post.is_claimed == False).limit(10)).all():
+        ranked = Bm25Engine().search(corpus, original, limit=20)
+        expected = _brute_force_bm25(corpus, original)[:20]
+
+        assert [post.id for post, _ in ranked] == [post_id for post_id, _ in expected]
+        assert [score for _, score in ranked] == pytest.approx([score for _, score in expected])
+
+
+@pytest.mark.parametrize("name", ["tfidf", "simple", "bm25"])
+def test_engines_return_open_posts_of_the_opposite_type(corpus, name):
+    original = corpus.get(Post, 1)
+    ranked = get_matching_engine(name).search(corpus, original, limit=10)
+
+    assert ranked
+    assert [score for _, score in ranked] == sorted((score for _, score in ranked), reverse=True)
+    for post, score in ranked:
+        assert post.item_type != original.item_type and not post.is_claimed
+        assert 0 <= score <= 1
+
+
+def test_registry_and_per_request_selection(corpus, monkeypatch):
+    class EmptyEngine(MatchingEngine):
+        name = "empty"
+
+        def search(self, session, original_post, limit):
+            return []
+
+    monkeypatch.setattr(matching_engines, "_engines", dict(matching_engines._engines))
+    register_engine(EmptyEngine())
+    assert get_matching_engine("empty").name == "empty"
+    with pytest.raises(ValueError):
+        get_matching_engine("word2vec")
+
+    client = TestClient(app)
+    assert client.get("/api/posts/1/matches", params={"mode": "rerank", "engine": "empty"}).json() == []
+    assert client.get("/api/posts/1/matches", params={"mode": "rerank", "engine": "bm25"}).json()
+    assert client.get("/api/posts/1/matches", params={"engine": "word2vec"}).status_code == 422
@@ -0,0 +1,106 @@
+"""
+Keyset (cursor) pagination: pages follow (created_at, id) descending without
+gaps or repeats, even with equal timestamps and posts inserted between pages.
+"""
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlmodel import select
+
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, paginate
+from app.main import app
+from app.models.post import Post
+from conftest import ANCHOR, add_post, add_user
+
+POSTS = 23
+
+
+@pytest.fixture
+def posts(session):
+    add_user(session, 1)
+    session.flush()
+    for post_id in range(1, POSTS + 1):
+        # groups of three posts share a timestamp, so the id breaks the ties
+        add_post(session, post_id, created_at=ANCHOR - timedelta(minutes=post_id // 3))
+    session.commit()
+    return session
+
+
+def _walk(session, limit: int, between_pages=None) -> list:
+    ids, cursor = [], None
+    while True:
+        rows, cursor = paginate(session, select(Post), Post, cursor, limit)
+        ids.extend(row.id for row in rows)
+        if cursor is None:
+            return ids
+        if between_pages:
+            between_pages()
+
+
+def _expected(session) -> list:
+    return [post.id for post in session.exec(select(Post).order_by(Post.created_at.desc(), Post.id.desc())).all()]
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(ANCHOR, 42)) == (ANCHOR, 42)
+
+
+@pytest.mark.parametrize("cursor", ["garbage!", "", encode_cursor(ANCHOR, 1)[:-3]])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, POSTS, POSTS + 1])
+def test_pages_cover_every_row_once_in_order(posts, limit):
+    assert _walk(posts, limit) == _expected(posts)
+
+
+def test_last_page_has_no_cursor(posts):
+    rows, cursor = paginate(posts, select(Post), Post, None, POSTS)
+    assert len(rows) == POSTS and cursor is None
+
+
+def test_new_rows_do_not_shift_later_pages(posts):
+    before = _expected(posts)
+    next_id = iter(range(POSTS + 1, POSTS + 100))
+
+    def publish():
+        add_post(posts, next(next_id), created_at=ANCHOR + timedelta(minutes=1))
+        posts.commit()
+
+    assert _walk(posts, 4, between_pages=publish) == before
+
+
+def test_list_posts_cursor_walk(posts):
+    client = TestClient(app)
+    ids, cursor = [], None
+    while True:
+        body = client.get("/api/posts/", params={"limit": 4, **({"cursor": cursor} if cursor else {})}).json()
+        ids.extend(post["id"] for post in body["data"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == _expected(posts)
+
+
+def test_user_posts_cursor_header(posts):
+    client = TestClient(app)
+    first = client.get("/api/users/1/posts", params={"limit": 10})
+    second = client.get("/api/users/1/posts", params={"limit": 10, "cursor": first.headers[NEXT_CURSOR_HEADER]})
+    assert [post["id"] for post in first.json() + second.json()] == _expected(posts)[:20]
+
+
+def test_cursor_cannot_be_combined_with_search(posts):
+    client = TestClient(app)
+    cursor = client.get("/api/posts/", params={"limit": 4}).json()["next_cursor"]
+
+    response = client.get("/api/posts/", params={"limit": 4, "search": "钱包", "cursor": cursor})
+    assert response.status_code == 400
+
+    # relevance-ordered search results page with skip/limit and never hand out a cursor
+    body = client.get("/api/posts/", params={"limit": 4, "search": "钱包"}).json()
+    assert len(body["data"]) == 4 and body["next_cursor"] is None
@@ -0,0 +1,147 @@
+"""
+Approximate post totals: post_counters, maintained on every write, must sum to
+what an exact count over posts returns for each list filter.
+"""
+import random
+import threading
+
+import pytest
+from sqlmodel import Session, func, select
+
+from app.models.post import Post
+from app.models.post_counter import PostCounter
+from app.services.post_counts import LISTED_STATUSES, PostCountCache, PostCounterService
+from conftest import add_category, add_post, add_user
+
+FILTERS = [
+    (item_type, category_id, is_claimed)
+    for item_type in (None, "lost", "found", "general")
+    for category_id in (None, 1, 2)
+    for is_claimed in (None, True, False)
+]
+
+
+def _exact(session, item_type, category_id, is_claimed) -> int:
+    statement = select(func.count()).select_from(Post).where(Post.status.in_(LISTED_STATUSES))
+    if item_type:
+        statement = statement.where(Post.item_type == item_type)
+    if category_id:
+        statement = statement.where(Post.category_id == category_id)
+    if is_claimed is not None:
+        statement = statement.where(Post.is_claimed == is_claimed)
+    return session.exec(statement).one()
+
+
+def _assert_estimates_exact(session):
+    for filters in FILTERS:
+        assert PostCounterService.estimate(session, *filters) == _exact(session, *filters), filters
+
+
+@pytest.fixture
+def author(session):
+    add_user(session, 1)
+    add_category(session, 1)
+    add_category(session, 2)
+    session.commit()
+
+
+def test_counters_follow_every_write(session, author):
+    rng = random.Random(3)
+    posts = []
+    for post_id in range(1, 121):
+        action = rng.random()
+        if posts and action < 0.5:
+            # edit the fields that move a post between counter groups, as the API endpoints do
+            post = rng.choice(posts)
+            previous_key = PostCounterService.key(post)
+            field = rng.choice(["status", "item_type", "category_id", "is_claimed"])
+            if field == "status":
+                post.status = rng.choice(["published", "active", "deleted", "draft"])
+            elif field == "item_type":
+                post.item_type = rng.choice(["lost", "found", "general"])
+            elif field == "category_id":
+                post.category_id = rng.choice([None, 1, 2])
+            else:
+                post.is_claimed = not post.is_claimed
+            session.add(post)
+            PostCounterService.sync_post(session, post, previous_key)
+        else:
+            post = add_post(
+                session, post_id,
+                item_type=rng.choice(["lost", "found", "general"]),
+                category_id=rng.choice([None, 1, 2]),
+                is_claimed=rng.random() < 0.2,
+            )
+            session.flush()
+            PostCounterService.sync_post(session, post)
+            posts.append(post)
+        session.commit()
+
+    _assert_estimates_exact(session)
+
+
+def test_unchanged_group_does_not_touch_counters(session, author):
+    post = add_post(session, 1)
+    session.flush()
+    PostCounterService.sync_post(session, post)
+    session.commit()
+
+    post.title = "新标题"
+    PostCounterService.sync_post(session, post, PostCounterService.key(post))
+    session.commit()
+
+    assert session.exec(select(PostCounter.count)).all() == [1]
+
+
+def test_ensure_built_rebuilds_counters_after_bulk_import(session, author):
+    for post_id in range(1, 11):
+        add_post(session, post_id, category_id=post_id % 3 or None, is_claimed=post_id % 4 == 0)
+    session.commit()
+
+    assert PostCounterService.ensure_built(session) is True
+    _assert_estimates_exact(session)
+    assert PostCounterService.ensure_built(session) is False
+
+
+def test_concurrent_writers_introduce_the_same_group(engine, session, author):
+    """Every writer adds a post to a counter group that does not exist yet; none may fail"""
+    writers = 8
+    barrier = threading.Barrier(writers)
+    errors = []
+
+    def publish(post_id: int):
+        try:
+            with Session(engine) as writer:
+                barrier.wait(timeout=10)
+                post = add_post(writer, post_id, item_type="found", category_id=2)
+                writer.flush()
+                PostCounterService.sync_post(writer, post)
+                writer.commit()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=publish, args=(post_id,)) for post_id in range(1, writers + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert PostCounterService.estimate(session, "found", 2) == writers
+
+
+def test_count_cache_drops_totals_computed_across_an_invalidation():
+    cache = PostCountCache(max_entries=2, ttl_seconds=60)
+    key = PostCountCache.make_key("lost", 0, None, "")
+    assert key == PostCountCache.make_key("lost", None, None, None)
+
+    generation = cache.generation()
+    cache.clear()  # a write committed while the count query was running
+    cache.set(key, 5, generation)
+    assert cache.get(key) is None
+
+    cache.set(key, 6, cache.generation())
+    assert cache.get(key) == 6
+    for other in ("a", "b"):
+        cache.set(other, 1)
+    assert cache.get(key) is None  # least recently used entry evicted
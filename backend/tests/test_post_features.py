@@ -0,0 +1,78 @@
+"""
+Precomputed text features: tokens and term frequencies are computed once when a
+post is written, kept in sync by the edit endpoint and read back without
+tokenizing again.
+"""
+from collections import Counter
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.deps import get_current_user
+from app.core.eager_loading import count_queries
+from app.main import app
+from app.models.post import Post
+from app.models.post_feature import PostTextFeature
+from app.models.user import User
+from app.services.post_features import PostFeatureService
+from app.services.text_similarity import TextSimilarityService
+from conftest import add_post, add_user
+
+
+def test_stored_features_are_read_without_tokenizing(session, engine, monkeypatch):
+    add_user(session, 1)
+    posts = [add_post(session, post_id, title="黑色钱包", content="在图书馆丢的") for post_id in (1, 2, 3)]
+    session.flush()
+    for post in posts:
+        PostFeatureService.refresh(session, post)
+    session.commit()
+    for post in posts:
+        session.refresh(post)
+
+    expected = TextSimilarityService.simple_tokenize("黑色钱包 在图书馆丢的")
+    monkeypatch.setattr(TextSimilarityService, "simple_tokenize", staticmethod(lambda text: pytest.fail(text)))
+    with count_queries(engine) as queries:
+        features = PostFeatureService.get_many(session, posts)
+
+    assert queries.count == 1
+    assert [features[post.id].tokens for post in posts] == [expected] * 3
+    assert features[1].token_count == len(expected)
+    assert features[1].term_freqs == dict(Counter(expected))
+
+
+def test_missing_features_are_computed_on_read(session):
+    add_user(session, 1)
+    stored, legacy = add_post(session, 1, title="雨伞"), add_post(session, 2, title="校园卡")
+    session.flush()
+    PostFeatureService.refresh(session, stored)
+    session.commit()
+
+    features = PostFeatureService.get_many(session, [stored, legacy])
+
+    assert features[2].tokens == TextSimilarityService.simple_tokenize(f"{legacy.title} {legacy.content}")
+    assert session.get(PostTextFeature, 2) is None  # computing on read does not write
+
+
+def test_edit_endpoint_refreshes_features(engine, session):
+    add_user(session, 1)
+    session.commit()
+
+    def current_user():
+        with Session(engine) as user_session:
+            return user_session.get(User, 1)
+
+    app.dependency_overrides[get_current_user] = current_user
+    client = TestClient(app)
+    try:
+        response = client.post("/api/posts/", json={"title": "黑色钱包", "content": "图书馆", "item_type": "general"})
+        assert response.status_code == 200, response.text
+        post_id = response.json()["id"]
+        assert client.put(f"/api/posts/{post_id}", json={"title": "红色雨伞"}).status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+
+    with Session(engine) as check:
+        post = check.get(Post, post_id)
+        assert check.get(PostTextFeature, post_id).tokens == PostFeatureService.compute(post).tokens
+        assert "雨伞" in check.get(PostTextFeature, post_id).term_freqs
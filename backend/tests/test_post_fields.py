@@ -0,0 +1,66 @@
+"""
+Sparse fieldsets: fields= returns exactly the selected PostRead fields (plus
+id), summary expands to the PostSummary view, and both list endpoints agree.
+"""
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.comment import Comment
+from app.schemas.post import PostRead, PostSummary
+from app.services.post_fields import PostFieldsService
+from app.services.post_stats import PostStatsService
+from conftest import add_category, add_post, add_user
+
+
+@pytest.fixture
+def client(session):
+    add_user(session, 1)
+    add_category(session, 1)
+    session.flush()
+    add_post(session, 1, item_type="found", category_id=1, images=["/uploads/images/a.jpg", "/uploads/images/b.jpg"],
+             location="图书馆")
+    add_post(session, 2, item_type="found")
+    session.flush()
+    session.add(Comment(content="是我的", post_id=1, author_id=1))
+    PostStatsService.adjust(session, 1, comments=1)
+    session.commit()
+    return TestClient(app)
+
+
+def test_parse_orders_fields_and_always_includes_id():
+    assert PostFieldsService.parse("title, item_type") == ("title", "item_type", "id")
+    assert PostFieldsService.parse(" ") is None
+    assert set(PostFieldsService.parse("summary")) == set(PostSummary.model_fields)
+    with pytest.raises(HTTPException) as error:
+        PostFieldsService.parse("title,password_hash")
+    assert error.value.status_code == 400
+
+
+def test_summary_view(client):
+    data = client.get("/api/posts/", params={"fields": "summary", "item_type": "found"}).json()["data"]
+
+    assert [set(item) for item in data] == [set(PostSummary.model_fields)] * 2
+    first = data[0]
+    assert first["id"] == 1
+    assert first["thumbnail"] == "/uploads/images/a.jpg"
+    assert first["comment_count"] == 1
+    assert data[1]["thumbnail"] is None
+
+
+def test_selected_fields_only(client):
+    first = client.get("/api/posts/", params={"fields": "title,category", "item_type": "found"}).json()["data"][0]
+    assert set(first) == {"id", "title", "category"}
+    assert (first["id"], first["title"], first["category"]["name"]) == (1, "帖子1", "分类1")
+
+    assert client.get("/api/posts/", params={"fields": "nope"}).status_code == 400
+    # without fields: the full PostRead
+    assert set(client.get("/api/posts/").json()["data"][0]) == set(PostRead.model_fields)
+
+
+@pytest.mark.parametrize("fields", ["summary", "title,author,comments,thumbnail", "content,images,updated_at"])
+def test_list_and_advanced_search_agree(client, fields):
+    listed = client.get("/api/posts/", params={"fields": fields, "item_type": "found"}).json()["data"]
+    searched = client.get("/api/posts/search/advanced", params={"fields": fields, "item_type": "found"}).json()
+    assert listed == searched
@@ -0,0 +1,103 @@
+"""
+Materialized matches: post_matches serves the stored top-k while it is fresh,
+and edits, closed candidates and new posts that would enter a stored result
+make it stale.
+"""
+from datetime import timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.models.post import Post
+from app.models.post_match import PostMatch, PostMatchState
+from app.services.location_index import LocationIndexService
+from app.services.match_ranking import MatchRankingService
+from app.services.post_features import PostFeatureService
+from app.services.post_index import PostIndexService
+from app.services.post_match_service import PostMatchService
+from conftest import ANCHOR, add_category, add_post, add_user
+
+
+def _publish(session, post_id: int, title: str, item_type: str, **fields) -> Post:
+    post = add_post(session, post_id, title=title, content=f"在图书馆{title}", item_type=item_type,
+                    category_id=1, location="图书馆", item_time=ANCHOR, **fields)
+    session.flush()
+    PostFeatureService.refresh(session, post)
+    LocationIndexService.sync_post(session, post)
+    PostIndexService.sync_post(session, post)
+    session.commit()
+    return post
+
+
+@pytest.fixture
+def lost(session):
+    add_user(session, 1)
+    add_category(session, 1)
+    session.flush()
+    lost = _publish(session, 1, "黑色钱包", "lost")
+    for post_id, title in [(2, "黑色钱包"), (3, "钱包"), (4, "黑色雨伞")]:
+        _publish(session, post_id, title, "found")
+    ranked = MatchRankingService.top_k(session, lost, limit=5)
+    PostMatchService.store(session, lost, ranked, 5, 7)
+    session.commit()
+    return lost
+
+
+def _fresh_ids(session, post: Post, limit: int = 5, time_range_days: int = 7):
+    ranked = PostMatchService.get_fresh(session, post, limit, time_range_days)
+    return None if ranked is None else [candidate.id for _, candidate in ranked]
+
+
+def test_fresh_results_equal_top_k_with_components(session, lost):
+    ranked = MatchRankingService.top_k(session, lost, limit=5)
+    assert _fresh_ids(session, lost) == [post.id for _, post in ranked]
+    assert _fresh_ids(session, lost, limit=2) == [post.id for _, post in ranked[:2]]
+
+    best = session.exec(select(PostMatch).where(PostMatch.post_id == 1, PostMatch.candidate_id == 2)).one()
+    # the stored components reproduce the stored score (each is rounded to 4 places)
+    assert best.score == pytest.approx(MatchRankingService.final_score(
+        best.text_score, best.category_score, best.location_score, best.time_score, best.image_score
+    ), abs=1e-3)
+
+
+def test_results_computed_for_other_parameters_are_not_served(session, lost):
+    assert _fresh_ids(session, lost, limit=6) is None
+    assert _fresh_ids(session, lost, time_range_days=30) is None
+
+    lost.updated_at = session.get(PostMatchState, 1).computed_at + timedelta(seconds=1)
+    assert _fresh_ids(session, lost) is None
+
+
+def test_changed_candidates_invalidate_the_results_they_appear_in(session, lost):
+    candidate = session.get(Post, 2)
+    candidate.is_claimed = True
+    session.add(candidate)
+    session.commit()
+    # closed candidates are filtered out even before the state is dropped
+    assert 2 not in _fresh_ids(session, lost)
+
+    PostMatchService.invalidate(session, 2)
+    session.commit()
+    assert _fresh_ids(session, lost) is None
+
+
+def test_new_posts_invalidate_only_results_they_would_enter(session, lost):
+    umbrella = session.get(Post, 4)
+    PostMatchService.store(session, umbrella, MatchRankingService.top_k(session, umbrella, limit=1), 1, 7)
+    session.commit()
+    lowest = session.exec(select(PostMatch.score).where(PostMatch.post_id == 4)).one()
+
+    # scores below the umbrella post's only stored match: its result stays
+    weak = _publish(session, 5, "校园卡", "lost")
+    assert all(score <= lowest for score, candidate in MatchRankingService.top_k(session, weak) if candidate.id == 4)
+    PostMatchService.refresh_new_post(session, weak)
+    session.commit()
+    assert session.get(PostMatchState, 4) is not None
+    assert session.get(PostMatchState, 5) is not None
+
+    # a better match for the umbrella than the one it stores: its result must be recomputed
+    strong = _publish(session, 6, "黑色雨伞", "lost")
+    assert PostMatchService.refresh_new_post(session, strong) == 1
+    session.commit()
+    assert session.get(PostMatchState, 4) is None
+    assert session.get(PostMatchState, 1) is not None  # the lost post is not a candidate of a lost post
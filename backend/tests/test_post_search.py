@@ -0,0 +1,76 @@
+"""
+Full-text post search: FTS5 finds exactly the posts a LIKE substring scan
+finds for Chinese queries, English words match by prefix with a LIKE fallback
+for in-word substrings, and the index follows edits.
+"""
+import random
+
+import pytest
+from sqlmodel import select
+
+from app.models.post import Post
+from app.services.post_search import PostSearchService
+from conftest import add_post, add_user
+
+WORDS = ["黑色", "钱包", "校园", "园卡", "校园卡", "图书馆", "书馆", "雨伞", "食堂", "丢了"]
+SEPARATORS = ["", "", "，", " ", "。"]
+
+
+def _search(session, search: str) -> list:
+    statement, order = PostSearchService.apply(session, select(Post.id), search)
+    return sorted(session.exec(statement).all())
+
+
+def _like(session, search: str) -> list:
+    pattern = f"%{search}%"
+    return sorted(session.exec(
+        select(Post.id).where((Post.title.like(pattern)) | (Post.content.like(pattern)))
+    ).all())
+
+
+def _text(rng: random.Random) -> str:
+    return "".join(rng.choice(WORDS) + rng.choice(SEPARATORS) for _ in range(rng.randint(1, 5)))
+
+
+@pytest.fixture
+def indexed(session):
+    rng = random.Random(8)
+    add_user(session, 1)
+    for post_id in range(1, 151):
+        add_post(session, post_id, title=_text(rng), content=_text(rng))
+    add_post(session, 151, title="捡到 iPhone 13", content="Phones and AirPods")
+    session.commit()
+    assert PostSearchService.ensure_built(session) == 151
+    assert PostSearchService.backend(session) == "fts5"
+    return session
+
+
+@pytest.mark.parametrize("search", ["校园卡", "园卡", "黑色钱包", "图书馆", "书馆丢了", "钱包校园", "卡食"])
+def test_chinese_queries_find_exactly_the_substring_matches(indexed, search):
+    assert _search(indexed, search) == _like(indexed, search)
+
+
+def test_english_words_match_by_prefix_with_substring_fallback(indexed):
+    assert _search(indexed, "phone") == [151]  # prefix of "phones"
+    assert _search(indexed, "IPHONE") == [151]
+    assert _search(indexed, "pods") == [151]  # only inside "AirPods": LIKE fallback
+    assert _search(indexed, "ipad") == []
+
+
+def test_single_characters_fall_back_to_like(indexed):
+    assert PostSearchService.match_query("伞") is None
+    assert _search(indexed, "伞") == _like(indexed, "伞")
+
+
+def test_index_follows_edits_and_rebuilds_when_out_of_sync(indexed):
+    post = indexed.get(Post, 151)
+    post.title = "捡到红色雨伞"
+    PostSearchService.sync_post(indexed, post)
+    indexed.commit()
+    assert 151 in _search(indexed, "红色雨伞")
+    assert _search(indexed, "iphone") == []
+
+    add_post(indexed, 152, title="红色雨伞")  # written without syncing the index
+    indexed.commit()
+    assert PostSearchService.ensure_built(indexed) == 152
+    assert _search(indexed, "红色雨伞") == [151, 152]
@@ -0,0 +1,126 @@
+"""
+Comment and claim counters on posts: adjusted atomically in the writing
+transaction (no lost updates between concurrent writers) and repairable by
+a full recount.
+"""
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.deps import get_current_user
+from app.core.eager_loading import count_queries
+from app.main import app
+from app.models.comment import Comment
+from app.models.post import Post
+from app.models.user import User
+from app.services.post_stats import PostStatsService
+from conftest import add_post, add_user
+
+
+@pytest.fixture
+def post_id(session):
+    for user_id in range(1, 5):
+        add_user(session, user_id)
+    session.flush()
+    add_post(session, 1, item_type="found", author_id=1)
+    session.commit()
+    return 1
+
+
+def _counts(engine, post_id: int):
+    with Session(engine) as session:
+        post = session.get(Post, post_id)
+        return post.comment_count, post.claim_count, post.pending_claim_count
+
+
+def test_adjust_does_not_lose_updates_from_stale_sessions(engine, post_id):
+    first, second = Session(engine), Session(engine)
+    # both sessions have read the post before either writes
+    assert first.get(Post, post_id).comment_count == second.get(Post, post_id).comment_count == 0
+
+    PostStatsService.adjust(first, post_id, comments=1, claims=1, pending_claims=1)
+    first.commit()
+    PostStatsService.adjust(second, post_id, comments=1)
+    second.commit()
+    first.close()
+    second.close()
+
+    assert _counts(engine, post_id) == (2, 1, 1)
+
+
+def test_concurrent_adjustments_all_apply(engine, post_id):
+    writers = 8
+    barrier = threading.Barrier(writers)
+    errors = []
+
+    def comment():
+        try:
+            with Session(engine) as session:
+                barrier.wait(timeout=10)
+                PostStatsService.adjust(session, post_id, comments=1)
+                session.commit()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=comment) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert _counts(engine, post_id) == (writers, 0, 0)
+
+
+def test_adjust_without_changes_runs_no_statement(session, post_id, engine):
+    with count_queries(engine) as queries:
+        PostStatsService.adjust(session, post_id)
+    assert queries.count == 0
+
+
+def test_recount_repairs_drifted_counters(session, engine, post_id):
+    session.add_all([Comment(content="是我的", post_id=post_id, author_id=2) for _ in range(3)])
+    PostStatsService.adjust(session, post_id, claims=5)
+    add_post(session, 2, author_id=1)  # consistent post: not touched by the recount
+    session.commit()
+
+    assert PostStatsService.recount(session) == 1
+    assert _counts(engine, post_id) == (3, 0, 0)
+    assert PostStatsService.recount(session) == 0
+
+
+def test_comment_and_claim_endpoints_keep_counters_exact(engine, post_id):
+    acting = {}
+
+    def current_user():
+        with Session(engine) as session:
+            return session.get(User, acting["id"])
+
+    app.dependency_overrides[get_current_user] = current_user
+    client = TestClient(app)
+    try:
+        claims = {}
+        for user_id in (2, 3, 4):
+            acting["id"] = user_id
+            assert client.post(f"/api/posts/{post_id}/comments", json={"content": "是我的"}).status_code == 200
+            response = client.post("/api/claims/", json={"post_id": post_id, "message": "我丢的"})
+            assert response.status_code == 200, response.text
+            claims[user_id] = response.json()["id"]
+        assert _counts(engine, post_id) == (3, 3, 3)
+
+        comment_id = client.get(f"/api/posts/{post_id}/comments").json()[-1]["id"]
+        assert client.delete(f"/api/posts/comments/{comment_id}").status_code == 200
+        acting["id"] = 3
+        assert client.delete(f"/api/claims/{claims[3]}").status_code == 200
+        acting["id"] = 1
+        assert client.post(f"/api/claims/{claims[4]}/reject", json={}).status_code == 200
+        assert client.post(f"/api/claims/{claims[2]}/approve", json={}).status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+
+    # one comment deleted; the cancelled claim no longer counts; nothing is pending
+    assert _counts(engine, post_id) == (2, 2, 0)
+    with Session(engine) as session:
+        assert PostStatsService.recount(session) == 0
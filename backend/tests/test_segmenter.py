@@ -0,0 +1,55 @@
+"""
+Dictionary max-match segmentation: the compact trie finds the longest word,
+forward/backward disagreements resolve to fewer (and longer) words, and
+dictionary entries the tokenizer can never hand over are skipped.
+"""
+import pytest
+
+from app.services.segmenter import CharTrie, MaxMatchSegmenter, get_segmenter
+
+
+@pytest.fixture
+def segmenter(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text(
+        "# test dictionary\n"
+        "研究 研究生 生命 命 起源\n"
+        "校园卡 校园 图书馆\n"
+        "U盘 iPhone\n",
+        encoding="utf-8",
+    )
+    return MaxMatchSegmenter(path)
+
+
+def test_trie_longest_match():
+    trie = CharTrie(["校园", "校园卡", "图书馆"])
+    assert trie.longest_match("校园卡丢了", 0) == 3
+    assert trie.longest_match("校园里", 0) == 2
+    assert trie.longest_match("在图书馆", 0) == 0
+    assert trie.longest_match("在图书馆", 1) == 3
+    assert trie.max_word_len == 3
+
+
+def test_bidirectional_match_prefers_fewer_words(segmenter):
+    assert segmenter.forward("研究生命起源") == ["研究生", "命", "起源"]
+    assert segmenter.backward("研究生命起源") == ["研究", "生命", "起源"]
+    # same word count: fewer single characters wins
+    assert segmenter.segment("研究生命起源") == ["研究", "生命", "起源"]
+    assert segmenter.segment("在图书馆丢了校园卡") == ["在", "图书馆", "丢", "了", "校园卡"]
+    assert segmenter.segment("") == []
+
+
+def test_non_chinese_entries_are_skipped(segmenter, caplog):
+    with caplog.at_level("WARNING"):
+        words = MaxMatchSegmenter.load_words(segmenter.dict_path)
+
+    assert "U盘" not in words and "iPhone" not in words
+    assert "校园卡" in words
+    assert "U盘" in caplog.text
+
+
+def test_segmenter_registry():
+    assert get_segmenter("char")("钱包") == ["钱", "包"]
+    assert get_segmenter("mm")("黑色钱包")  # bundled dictionary loads
+    with pytest.raises(ValueError):
+        get_segmenter("jieba")
@@ -0,0 +1,86 @@
+"""
+Hashed-embedding semantic matching: synonyms land close together, the IVF
+index returns the exact top k when every list is probed, and the persisted
+index follows posts being closed and is only rewritten when it changed.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from app.models.post import Post
+from app.services.ann_index import DIM, IvfIndex, SemanticIndex
+from app.services.embedding import EmbeddingService
+from conftest import add_post, add_user
+
+
+def _similarity(first: str, second: str) -> float:
+    return float(EmbeddingService.embed(first) @ EmbeddingService.embed(second))
+
+
+def test_synonyms_embed_close_together():
+    assert _similarity("黑色钱包", "黑色皮夹") > _similarity("黑色钱包", "黑色雨伞")
+    assert _similarity("在图书馆丢了钱包", "在图书馆丢了 wallet") > _similarity("在图书馆丢了钱包", "在图书馆丢了雨伞")
+    assert _similarity("AirPods", "耳机") > _similarity("AirPods", "校园卡")
+    # English synonyms only match whole words
+    assert "syn:钥匙" not in EmbeddingService.features("mechanical keyboard")
+    assert np.linalg.norm(EmbeddingService.embed("！？")) == 0
+
+
+def _unit_vectors(rng, count: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_probing_every_list_is_exact():
+    rng = np.random.default_rng(0)
+    post_ids, vectors = np.arange(1, 1001, dtype=np.int64), _unit_vectors(rng, 1000)
+    index = IvfIndex.train(post_ids, vectors)
+    assert len(index.centroids) > 1
+
+    stored = vectors.astype(np.float16).astype(np.float32)
+    for query in _unit_vectors(rng, 5):
+        expected = post_ids[np.argsort(-(stored @ query))[:10]].tolist()
+        assert [post_id for post_id, _ in index.search(query, 10, nprobe=len(index.centroids))] == expected
+
+    index.remove([expected[0]])
+    assert expected[0] not in [post_id for post_id, _ in index.search(query, 10, nprobe=len(index.centroids))]
+    restored = IvfIndex.from_arrays(index.arrays("found"), "found")
+    assert restored.assignment == index.assignment
+    assert restored.search(query, 10, 4) == index.search(query, 10, 4)
+
+
+@pytest.fixture
+def posts(session):
+    add_user(session, 1)
+    for post_id, title in enumerate(["黑色钱包", "黑色皮夹", "蓝色雨伞", "校园卡"], start=1):
+        post = add_post(session, post_id, title=title, content="", item_type="found")
+        session.flush()
+        EmbeddingService.refresh(session, post)
+    session.commit()
+
+
+def _search(session, index: SemanticIndex, text: str) -> list:
+    index._last_sync = 0.0  # sync the latest changes before searching
+    return [post_id for post_id, _ in index.search(session, EmbeddingService.embed(text), "found", 2)]
+
+
+def test_index_follows_posts_and_persists_only_changes(session, posts, tmp_path):
+    path = os.path.join(tmp_path, "semantic.npz")
+    index = SemanticIndex(path=path)
+    assert index.maintain(session) is True
+    assert index.maintain(session) is False  # nothing changed since the last write
+
+    assert _search(session, index, "钱包") == [1, 2]
+
+    post = session.get(Post, 1)
+    post.is_claimed = True
+    EmbeddingService.touch(session, post)
+    session.commit()
+    assert _search(session, index, "钱包")[0] == 2
+
+    assert index.maintain(session) is True
+    reloaded = SemanticIndex(path=path)
+    assert reloaded.maintain(session) is False  # the file already has every change
+    assert _search(session, reloaded, "钱包")[0] == 2
+    assert reloaded.size() == 3
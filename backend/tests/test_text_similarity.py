@@ -0,0 +1,40 @@
+"""
+One-against-many scoring: calculate_batch_similarity returns, for every
+candidate, exactly what the pairwise cosine, Jaccard and combined methods do.
+"""
+import random
+
+import pytest
+
+from app.services.text_similarity import TextSimilarityService
+
+WORDS = ["黑色", "钱包", "手机", "图书馆", "食堂", "钥匙", "校园卡", "雨伞", "iPhone", "AirPods", "3号楼"]
+
+
+def _texts(rng: random.Random, count: int) -> list:
+    return [" ".join(rng.choices(WORDS, k=rng.randint(0, 6))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_pairwise(seed):
+    rng = random.Random(seed)
+    query, *candidates = _texts(rng, 41)
+    query = query or "黑色钱包"
+
+    scores = TextSimilarityService.calculate_batch_similarity(query, candidates)
+
+    for index, text in enumerate(candidates):
+        assert scores["cosine"][index] == TextSimilarityService.calculate_cosine_similarity(query, text)
+        assert scores["jaccard"][index] == TextSimilarityService.calculate_jaccard_similarity(query, text)
+        assert scores["combined"][index] == TextSimilarityService.calculate_combined_similarity(query, text)
+
+
+def test_empty_inputs_score_zero():
+    assert len(TextSimilarityService.calculate_batch_similarity("黑色钱包", [])["combined"]) == 0
+
+    scores = TextSimilarityService.calculate_batch_similarity("", ["黑色钱包", ""])
+    for values in scores.values():
+        assert values.tolist() == [0.0, 0.0]
+
+    scores = TextSimilarityService.calculate_batch_similarity("黑色钱包", ["", "黑色钱包"])
+    assert scores["combined"].tolist() == [0.0, 1.0]